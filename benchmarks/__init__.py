@@ -0,0 +1,7 @@
+"""Benchmarks for the schema generation of drf-spectacular-jsonapi.
+
+The benchmarks are not part of the test suite. They run against the test project by default::
+
+    python -m benchmarks.bench_resource_object_mapping
+
+"""
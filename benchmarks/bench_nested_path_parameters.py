@@ -0,0 +1,85 @@
+"""Compares the legacy `fix_nested_path_parameters` hook with the indexed implementation.
+
+The legacy hook resolves the parent path of every nested lookup with the url conf and instantiates the parent view
+again for every endpoint. The indexed hook looks up the parent paths in an index of the endpoints and resolves every
+parent path only once.
+
+    python -m benchmarks.bench_nested_path_parameters --resources 1000
+"""
+import argparse
+import re
+from warnings import warn
+
+from benchmarks.utils import best_of, setup_django
+
+
+def legacy_fix_nested_path_parameters(endpoints):
+    from django.urls import Resolver404, resolve
+    from rest_framework_extensions.settings import extensions_api_settings
+    from rest_framework_json_api.utils import get_resource_name
+
+    fixed_enpoints = []
+    for (path, path_regex, method, callback) in endpoints:
+        if extensions_api_settings.DEFAULT_PARENT_LOOKUP_KWARG_NAME_PREFIX in path:
+            nested_lookups = re.findall(
+                r"(?<=\{)(parent_lookup.*)(?=\})", path)
+
+            new_path = path
+            for lookup in nested_lookups:
+                parent_path = path.split(lookup)[0].replace('{', '')
+                if parent_path.endswith("/") and not path.endswith("/"):
+                    parent_path = parent_path[:-1]
+
+                try:
+                    match = resolve(parent_path)
+                    func = match.func
+                    if hasattr(func, "cls"):
+                        func = func.cls(action='list')
+
+                        new_path = new_path.replace(
+                            lookup, f"{get_resource_name(context={'view': func})}Id")
+
+                except Resolver404:
+                    warn(
+                        message=f"Can't find path {parent_path} to fix nested path parameters")
+
+            fixed_enpoints.append((new_path, path_regex, method, callback))
+        else:
+            fixed_enpoints.append((path, path_regex, method, callback))
+
+    return fixed_enpoints
+
+
+def run(resources, number):
+    from django.urls import set_urlconf
+    from drf_spectacular.generators import EndpointEnumerator
+
+    from benchmarks.synthetic import build_synthetic_project
+    from drf_spectacular_jsonapi.hooks import fix_nested_path_parameters
+
+    urlconf = build_synthetic_project(resources=resources)
+    # the legacy hook resolves the parent paths with the active url conf
+    set_urlconf(urlconf)
+    endpoints = EndpointEnumerator(urlconf=urlconf)._get_api_endpoints(patterns=None, prefix="")
+    nested = sum(1 for endpoint in endpoints if "{parent_lookup_" in endpoint[0])
+
+    assert legacy_fix_nested_path_parameters(endpoints) == fix_nested_path_parameters(endpoints)
+
+    legacy = best_of(lambda: legacy_fix_nested_path_parameters(endpoints), number=number)
+    indexed = best_of(lambda: fix_nested_path_parameters(endpoints), number=number)
+    print(f"endpoints:                  {len(endpoints):10d}")
+    print(f"nested endpoints:           {nested:10d}")
+    print(f"legacy hook:                {legacy / 1000:10.1f} ms")
+    print(f"indexed hook:               {indexed / 1000:10.1f} ms")
+    print(f"speedup:                    {legacy / indexed:10.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resources", type=int, default=1000,
+                        help="number of synthetic resources, each one adds 10 endpoints")
+    parser.add_argument("--number", type=int, default=3)
+    args = parser.parse_args()
+    setup_django()
+    run(resources=args.resources, number=args.number)
@@ -0,0 +1,67 @@
+"""Measures how the parallel schema generation scales with the number of worker processes.
+
+Every run generates the schema of a synthetic project (see `benchmarks.synthetic`) with cold caches. The output of
+every worker count is compared byte by byte with the serial output.
+
+    python -m benchmarks.bench_parallel_generation --resources 200 --workers 1 2 4 8
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from benchmarks.utils import setup_django
+
+
+def generate(urlconf, workers):
+    from drf_spectacular_jsonapi.generators import JsonApiSchemaGenerator
+    from drf_spectacular_jsonapi.schemas.cache import clear_caches
+
+    clear_caches()
+    start = time.perf_counter()
+    schema = JsonApiSchemaGenerator(urlconf=urlconf, workers=workers).get_schema(request=None, public=True)
+    return time.perf_counter() - start, json.dumps(schema, default=str)
+
+
+def run(resources, workers, repeat):
+    from drf_spectacular.drainage import GENERATOR_STATS
+
+    from benchmarks.synthetic import build_synthetic_project
+
+    urlconf = build_synthetic_project(resources=resources)
+    results = []
+    with GENERATOR_STATS.silence():
+        serial_duration, serial_output = generate(urlconf, workers=1)
+        for worker_count in workers:
+            durations = []
+            for _ in range(repeat):
+                duration, output = generate(urlconf, workers=worker_count)
+                durations.append(duration)
+                if output != serial_output:
+                    raise AssertionError(f"output of {worker_count} workers differs from the serial output")
+            results.append({"workers": worker_count, "duration": min(durations)})
+
+    baseline = next((result["duration"] for result in results if result["workers"] == 1), serial_duration)
+    print(f"cpus: {os.cpu_count()}  resources: {resources}", file=sys.stderr)
+    for result in results:
+        result["speedup"] = baseline / result["duration"]
+        print(f"{result['workers']:>4} workers {result['duration']:8.3f} s  speedup {result['speedup']:6.2f}x",
+              file=sys.stderr)
+    return {
+        "benchmark": "parallel_generation",
+        "cpus": os.cpu_count(),
+        "resources": resources,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resources", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    setup_django()
+    json.dump(run(resources=args.resources, workers=args.workers, repeat=args.repeat), sys.stdout, indent=2)
@@ -0,0 +1,64 @@
+"""Compares the legacy double conversion of serializers with the native single pass resource object mapping.
+
+The legacy path runs the complete drf_spectacular `_map_basic_serializer` first and converts the flat object
+schema afterwards. The native path maps every serializer field only once. It is measured cold (the resource object
+cache is cleared before every mapping, so every mapping is a miss) and warm (every mapping is a memoized hit).
+"""
+import argparse
+
+from benchmarks.utils import best_of, get_auto_schemas, setup_django
+
+
+def legacy_mapping(auto_schema, serializer, direction):
+    from drf_spectacular.openapi import AutoSchema
+
+    from drf_spectacular_jsonapi.schemas.converters import \
+        JsonApiResourceObject
+
+    object_schema = AutoSchema._map_basic_serializer(
+        auto_schema, serializer=serializer, direction=direction)
+    return JsonApiResourceObject(
+        serializer=serializer,
+        drf_spectactular_schema=object_schema,
+        method=auto_schema.method,
+    ).__dict__()
+
+
+def native_mapping(auto_schema, serializer, direction, cold=True):
+    from drf_spectacular_jsonapi.schemas.cache import resource_object_cache
+
+    if cold:
+        resource_object_cache.clear()
+    return auto_schema._map_basic_serializer(serializer=serializer, direction=direction)
+
+
+def run(number):
+    prepared = get_auto_schemas()
+
+    def run_legacy():
+        for auto_schema, serializer in prepared:
+            for direction in ("request", "response"):
+                legacy_mapping(auto_schema, serializer, direction)
+
+    def run_native(cold):
+        for auto_schema, serializer in prepared:
+            for direction in ("request", "response"):
+                native_mapping(auto_schema, serializer, direction, cold=cold)
+
+    legacy = best_of(run_legacy, number=number)
+    cold = best_of(lambda: run_native(cold=True), number=number)
+    warm = best_of(lambda: run_native(cold=False), number=number)
+    print(f"mapped serializers per run: {len(prepared) * 2}")
+    print(f"legacy double conversion:   {legacy:10.1f} us")
+    print(f"native single pass (cold):  {cold:10.1f} us")
+    print(f"native single pass (warm):  {warm:10.1f} us")
+    print(f"speedup (cold):             {legacy / cold:10.2f}x")
+    print(f"speedup (warm):             {legacy / warm:10.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+    setup_django()
+    run(number=args.number)
@@ -0,0 +1,162 @@
+"""Measures how the schema generation scales with the size of the project.
+
+For every size a synthetic project is generated (see `benchmarks.synthetic`). The time of `get_schema` is measured
+with cold caches (all schema caches of this package are cleared before every run) and with warm caches. The peak
+memory of a cold run is measured with tracemalloc. The results are written as json, so they can be compared with
+the results of a previous release by passing them with `--compare`.
+
+    python -m benchmarks.bench_schema_generation --sizes 10 100 --output results.json
+    python -m benchmarks.bench_schema_generation --sizes 10 100 --compare results.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from benchmarks.utils import setup_django
+
+
+def get_versions():
+    import django
+    import drf_spectacular
+    import rest_framework
+    import rest_framework_json_api
+
+    import drf_spectacular_jsonapi
+
+    return {
+        "python": platform.python_version(),
+        "django": django.__version__,
+        "djangorestframework": rest_framework.VERSION,
+        "djangorestframework-jsonapi": rest_framework_json_api.VERSION,
+        "drf-spectacular": drf_spectacular.__version__,
+        "drf-spectacular-jsonapi": drf_spectacular_jsonapi.__version__,
+    }
+
+
+def generate(urlconf):
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS(urlconf=urlconf)
+    return generator.get_schema(request=None, public=True)
+
+
+def measure(urlconf, repeat):
+    from drf_spectacular_jsonapi.schemas.cache import clear_caches
+
+    cold = []
+    for _ in range(repeat):
+        clear_caches()
+        start = time.perf_counter()
+        schema = generate(urlconf)
+        cold.append(time.perf_counter() - start)
+
+    warm = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        generate(urlconf)
+        warm.append(time.perf_counter() - start)
+
+    clear_caches()
+    tracemalloc.start()
+    try:
+        generate(urlconf)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return schema, {
+        "cold_min": min(cold),
+        "cold_median": statistics.median(cold),
+        "warm_min": min(warm),
+        "warm_median": statistics.median(warm),
+        "peak_memory": peak_memory,
+    }
+
+
+def run(sizes, relations, filter_fields, repeat):
+    from drf_spectacular.drainage import GENERATOR_STATS
+
+    from benchmarks.synthetic import build_synthetic_project
+
+    results = []
+    for resources in sizes:
+        urlconf = build_synthetic_project(
+            resources=resources, relations=relations, filter_fields=filter_fields)
+        # the warnings of drf_spectacular are emitted once per run and would flood the output otherwise
+        with GENERATOR_STATS.silence():
+            schema, measurements = measure(urlconf=urlconf, repeat=repeat)
+        result = {
+            "resources": resources,
+            "paths": len(schema["paths"]),
+            "operations": sum(len(operations) for operations in schema["paths"].values()),
+            "components": len(schema.get("components", {}).get("schemas", {})),
+            "schema_bytes": len(json.dumps(schema, default=str)),
+            **measurements,
+        }
+        results.append(result)
+        print(
+            f"{resources:>6} resources {result['operations']:>7} operations "
+            f"cold {result['cold_min']:8.3f} s  warm {result['warm_min']:8.3f} s  "
+            f"peak {result['peak_memory'] / 1024 / 1024:8.1f} MiB",
+            file=sys.stderr,
+        )
+    return {
+        "benchmark": "schema_generation",
+        "versions": get_versions(),
+        "parameters": {"relations": relations, "filter_fields": filter_fields, "repeat": repeat},
+        "results": results,
+    }
+
+
+def compare(report, baseline, threshold):
+    """Returns a message for every size whose cold time or peak memory exceeds the baseline by the threshold factor"""
+    baseline_results = {result["resources"]: result for result in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        previous = baseline_results.get(result["resources"])
+        if not previous:
+            continue
+        for key in ("cold_min", "peak_memory"):
+            if result[key] > previous[key] * threshold:
+                regressions.append(
+                    f"{result['resources']} resources: {key} {result[key]:.3f} > {previous[key]:.3f} * {threshold}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10, 100, 1000])
+    parser.add_argument("--relations", type=int, default=3)
+    parser.add_argument("--filter-fields", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=str, default=None,
+                        help="write the json results to this file instead of stdout")
+    parser.add_argument("--compare", type=str, default=None,
+                        help="json results of a previous run. Exits with 1 if a size regressed.")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="allowed factor between the current and the compared results")
+    args = parser.parse_args()
+
+    setup_django()
+    report = run(sizes=args.sizes, relations=args.relations,
+                 filter_fields=args.filter_fields, repeat=args.repeat)
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(
+                report, json.load(baseline_file), args.threshold)
+        for regression in regressions:
+            print(f"regression: {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
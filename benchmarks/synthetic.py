@@ -0,0 +1,141 @@
+"""Generates synthetic json:api projects of arbitrary size for the benchmarks.
+
+Every resource consists of a model, a json:api model serializer with `included_serializers`, a filterset, a model
+viewset, a `RelationshipView` and a nested drf-extensions route below the resource of its first relation. The models
+are registered inside the `tests` app, so the benchmarks can run with the test settings.
+"""
+import itertools
+from types import ModuleType
+
+# every generated project gets its own model names, cause model names have to be unique inside an app
+_project_counter = itertools.count()
+
+
+def build_synthetic_project(resources: int, relations: int = 3, filter_fields: int = 3,
+                            app_label: str = "tests") -> ModuleType:
+    """Returns an url conf module with `resources` generated resources.
+
+    Each model has `filter_fields` char attributes which are all part of the filterset and `relations` relations to
+    the following models. Even relations are foreign keys, odd relations are many to many fields.
+    """
+    from django.db import models
+    from django.urls import re_path
+    from django.utils.translation import gettext_lazy as _
+    from django_filters import rest_framework as filters
+    from rest_framework import mixins
+    from rest_framework.viewsets import GenericViewSet
+    from rest_framework_extensions.mixins import NestedViewSetMixin
+    from rest_framework_extensions.routers import ExtendedSimpleRouter
+    from rest_framework_json_api.serializers import (LazySerializersDict,
+                                                     ModelSerializer)
+    from rest_framework_json_api.views import ModelViewSet, RelationshipView
+
+    project = next(_project_counter)
+    prefix = f"Synthetic{project}x{resources}"
+    module = ModuleType(f"{prefix}Urls")
+
+    model_names = [f"{prefix}Resource{index}" for index in range(resources)]
+    url_prefixes = [f"resources-{index}" for index in range(resources)]
+
+    def get_targets(index):
+        return [(index + offset) % resources for offset in range(1, relations + 1)]
+
+    # models are created in reverse order, so foreign keys to following models can reference the classes directly.
+    # relations to not yet created models (wrap around at the end) are referenced lazily by name.
+    model_classes = {}
+    for index in reversed(range(resources)):
+        attrs = {
+            "__module__": module.__name__,
+            "Meta": type("Meta", (), {"app_label": app_label}),
+            "count": models.IntegerField(verbose_name=_("Count"), help_text=_("Some integer attribute")),
+            "active": models.BooleanField(verbose_name=_("Active"), help_text=_("Some boolean attribute")),
+            "kind": models.CharField(max_length=10, choices=(("A", "a"), ("B", "b")), verbose_name=_("Kind")),
+        }
+        for field_index in range(filter_fields):
+            attrs[f"attribute_{field_index}"] = models.CharField(
+                max_length=100,
+                verbose_name=_("Attribute"),
+                help_text=_("Some filterable char attribute"),
+            )
+        for relation_index, target in enumerate(get_targets(index)):
+            to = model_classes.get(
+                target, f"{app_label}.{model_names[target]}")
+            related_name = f"{model_names[index].lower()}_relation_{relation_index}"
+            if relation_index % 2:
+                attrs[f"relation_{relation_index}"] = models.ManyToManyField(
+                    to=to, related_name=related_name, symmetrical=False, blank=True)
+            else:
+                attrs[f"relation_{relation_index}"] = models.ForeignKey(
+                    to=to, related_name=related_name, on_delete=models.CASCADE, null=True)
+        model_classes[index] = type(
+            model_names[index], (models.Model,), attrs)
+
+    serializer_classes = {}
+    for index in range(resources):
+        model = model_classes[index]
+        serializer_classes[index] = type(f"{model_names[index]}Serializer", (ModelSerializer,), {
+            "__module__": module.__name__,
+            "Meta": type("Meta", (), {"model": model, "fields": "__all__"}),
+        })
+    # the serializers reference each other in cycles, so the included serializers can only be added afterwards
+    for index, serializer_class in serializer_classes.items():
+        serializer_class.included_serializers = LazySerializersDict(serializer_class, {
+            f"relation_{relation_index}": serializer_classes[target]
+            for relation_index, target in enumerate(get_targets(index))
+        })
+
+    filterset_fields = {
+        f"attribute_{field_index}": ["exact", "icontains", "in"] for field_index in range(filter_fields)
+    }
+    filterset_fields["count"] = ["exact", "gte", "lte"]
+
+    router = ExtendedSimpleRouter()
+    registrations = {}
+    urlpatterns = []
+    for index in range(resources):
+        model = model_classes[index]
+        filterset_class = type(f"{model_names[index]}FilterSet", (filters.FilterSet,), {
+            "__module__": module.__name__,
+            "Meta": type("Meta", (), {"model": model, "fields": filterset_fields}),
+        })
+        viewset = type(f"{model_names[index]}ViewSet", (ModelViewSet,), {
+            "__module__": module.__name__,
+            "__doc__": f"Endpoints of the synthetic resource {index}",
+            "queryset": model.objects.none(),
+            "serializer_class": serializer_classes[index],
+            "filterset_class": filterset_class,
+            "ordering_fields": ["id", "count"],
+            "search_fields": ["attribute_0"] if filter_fields else [],
+        })
+        registrations[index] = router.register(
+            url_prefixes[index], viewset, basename=url_prefixes[index])
+
+        relationship_view = type(f"{model_names[index]}RelationshipView", (RelationshipView,), {
+            "__module__": module.__name__,
+            "queryset": model.objects,
+        })
+        urlpatterns.append(re_path(
+            rf"^{url_prefixes[index]}/(?P<pk>[^/.]+)/relationships/(?P<related_field>[-\w]+)$",
+            relationship_view.as_view(),
+            name=f"{url_prefixes[index]}-relationships",
+        ))
+
+    if relations:
+        for index in range(resources):
+            # list the resources below the resource of their first relation
+            parent = get_targets(index)[0]
+            nested_viewset = type(f"{model_names[index]}NestedViewSet",
+                                  (NestedViewSetMixin, mixins.ListModelMixin, GenericViewSet), {
+                                      "__module__": module.__name__,
+                                      "queryset": model_classes[index].objects.none(),
+                                      "serializer_class": serializer_classes[index],
+                                  })
+            registrations[parent].register(
+                url_prefixes[index],
+                nested_viewset,
+                basename=f"{url_prefixes[parent]}-{url_prefixes[index]}",
+                parents_query_lookups=["relation_0"],
+            )
+
+    module.urlpatterns = urlpatterns + router.urls
+    return module
@@ -0,0 +1,44 @@
+import os
+import timeit
+
+import django
+
+
+def setup_django(settings_module="tests.settings"):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    django.setup()
+
+
+def get_auto_schemas(generator=None):
+    """Returns all prepared (auto_schema, serializer) tuples of the current url conf, like
+    drf_spectacular does it before calling `get_operation`"""
+    from drf_spectacular.generators import SchemaGenerator
+    from drf_spectacular.plumbing import ComponentRegistry
+    from drf_spectacular.settings import spectacular_settings
+    from rest_framework_json_api.serializers import \
+        ResourceIdentifierObjectSerializer
+
+    generator = generator or SchemaGenerator()
+    generator._initialise_endpoints()
+    registry = ComponentRegistry()
+    prepared = []
+    for path, path_regex, method, view in generator._get_paths_and_endpoints():
+        view.request = spectacular_settings.GET_MOCK_REQUEST(
+            method, path, view, None)
+        auto_schema = view.schema
+        auto_schema.registry = registry
+        auto_schema.path = path
+        auto_schema.path_regex = path_regex
+        auto_schema.path_prefix = ""
+        auto_schema.method = method.upper()
+        serializer = auto_schema._get_serializer()
+        if not hasattr(serializer, "fields") or isinstance(serializer, ResourceIdentifierObjectSerializer):
+            # relationship views are not mapped as resource objects
+            continue
+        prepared.append((auto_schema, serializer))
+    return prepared
+
+
+def best_of(func, number, repeat=5):
+    """Returns the best time per call in micro seconds"""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1_000_000
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class DRFSpectacularJsonApiConfig(AppConfig):
     name = 'drf_spectacular_jsonapi'
     verbose_name = "drf-spectacular-jsonapi"
+
+    def ready(self):
+        from drf_spectacular_jsonapi.settings import jsonapi_settings
+
+        if jsonapi_settings.SCHEMA_WARMUP:
+            from drf_spectacular_jsonapi.warmup import (is_warmup_process,
+                                                        start_schema_warmup)
+            if is_warmup_process():
+                start_schema_warmup()
@@ -0,0 +1,86 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict
+
+from drf_spectacular.renderers import OpenApiYamlRenderer
+
+from drf_spectacular_jsonapi.renderers import get_schema_hash
+
+MANIFEST_FILE_NAME = "manifest.json"
+
+ARTIFACT_MEDIA_TYPES = {
+    "json": "application/vnd.oai.openapi+json",
+    "yaml": "application/vnd.oai.openapi",
+}
+
+
+def render_minified_json(schema: Dict) -> bytes:
+    return json.dumps(schema, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def render_yaml(schema: Dict) -> bytes:
+    return OpenApiYamlRenderer().render(schema)
+
+
+ARTIFACT_RENDERERS = {
+    "json": render_minified_json,
+    "yaml": render_yaml,
+}
+
+
+def _write_atomic(path: str, content: bytes) -> None:
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "wb") as artifact_file:
+            artifact_file.write(content)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+def _describe_file(file_name: str, content: bytes) -> Dict:
+    return {
+        "file": file_name,
+        "size": len(content),
+        "sha256": hashlib.sha256(content).hexdigest(),
+    }
+
+
+def build_schema_artifacts(schema: Dict, directory: str, file_name: str = "schema") -> Dict:
+    """Writes the schema as minified json and yaml, both also gzip precompressed, together with a manifest.
+
+    The gzip files are written without timestamp, so equal schemas always produce byte identical artifacts. The
+    manifest is written last, so readers of the manifest always find complete artifacts.
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest = {
+        "hash": get_schema_hash(schema),
+        "formats": {},
+    }
+    for schema_format, render in ARTIFACT_RENDERERS.items():
+        content = render(schema)
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+        plain_name = f"{file_name}.{schema_format}"
+        compressed_name = f"{plain_name}.gz"
+        _write_atomic(os.path.join(directory, plain_name), content)
+        _write_atomic(os.path.join(directory, compressed_name), compressed)
+        manifest["formats"][schema_format] = {
+            "media_type": ARTIFACT_MEDIA_TYPES[schema_format],
+            "identity": _describe_file(plain_name, content),
+            "gzip": _describe_file(compressed_name, compressed),
+        }
+    _write_atomic(
+        os.path.join(directory, MANIFEST_FILE_NAME),
+        json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8")
+    )
+    return manifest
+
+
+def read_manifest(directory: str) -> Dict:
+    with open(os.path.join(directory, MANIFEST_FILE_NAME), "rb") as manifest_file:
+        return json.load(manifest_file)
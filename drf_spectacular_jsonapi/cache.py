@@ -0,0 +1,347 @@
+import hashlib
+import json
+import logging
+import mmap
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from threading import Lock, Thread
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import translation
+from django.utils.translation import get_language
+
+from drf_spectacular_jsonapi.fingerprint import get_schema_fingerprint
+from drf_spectacular_jsonapi.renderers import get_schema_hash
+from drf_spectacular_jsonapi.settings import jsonapi_settings
+from drf_spectacular_jsonapi.streaming import STREAMING_RENDERERS
+
+logger = logging.getLogger(__name__)
+
+
+class FileSchemaCache:
+    """Stores generated schemas on the local disk.
+
+    Every cached schema is stored together with the fingerprint of the code it was generated from. If the fingerprint
+    changed, the stale schema is served right away and a fresh one is generated inside a background thread
+    (stale-while-revalidate). Only if there is no cached schema at all, the schema is generated in the calling thread.
+
+    The cache is only meant for public schemas, cause the generated schema does not depend on the requesting user then.
+    """
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self.directory = directory or os.path.join(
+            tempfile.gettempdir(), "drf_spectacular_jsonapi")
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.regenerations = 0
+        self.regeneration_duration_total = 0.0
+        self.regeneration_duration_last = None
+        self._lock = Lock()
+        self._regenerating = {}
+
+    def get_slot(self, generator, public: bool) -> str:
+        """The slot identifies the cache file. Each api version, language, urlconf and resource subset gets its own
+        slot"""
+        slot = json.dumps([generator.api_version, get_language(),
+                          repr(generator.urlconf), public,
+                          sorted(getattr(generator, "resources", None) or ())])
+        return hashlib.sha256(slot.encode("utf-8")).hexdigest()[:32]
+
+    def get_path(self, slot: str) -> str:
+        return os.path.join(self.directory, f"{slot}.json")
+
+    def read(self, slot: str) -> Optional[Dict]:
+        try:
+            with open(self.get_path(slot), "rb") as cache_file:
+                return json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+
+    def write(self, slot: str, fingerprint: str, schema: Dict) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        # write to a temporary file first and replace the cache file atomically,
+        # so concurrent readers never see partial files.
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as cache_file:
+                json.dump({"fingerprint": fingerprint, "schema": schema},
+                          cache_file, ensure_ascii=False, default=str)
+            os.replace(temporary_path, self.get_path(slot))
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    def regenerate(self, slot: str, fingerprint: str, generator, request, public: bool) -> Dict:
+        start = time.perf_counter()
+        schema = generator.get_schema(request=request, public=public)
+        duration = time.perf_counter() - start
+        self.write(slot=slot, fingerprint=fingerprint, schema=schema)
+        with self._lock:
+            self.regenerations += 1
+            self.regeneration_duration_total += duration
+            self.regeneration_duration_last = duration
+        logger.info("regenerated schema %s in %.3f seconds", slot, duration)
+        return schema
+
+    def revalidate(self, slot: str, fingerprint: str, generator, request, public: bool) -> None:
+        """Replaces a stale schema. Called by the background regeneration."""
+        self.regenerate(slot=slot, fingerprint=fingerprint, generator=generator, request=request, public=public)
+
+    def _regenerate_in_background(self, slot: str, fingerprint: str, generator, public: bool) -> None:
+        """Regenerates the schema inside a background thread. The response to the request, which found the stale
+        schema, is returned already, so the public schema is generated without a request."""
+        with self._lock:
+            if self._regenerating.get(slot) == fingerprint:
+                # there is already a running regeneration for the same code
+                return
+            self._regenerating[slot] = fingerprint
+
+        language = get_language()
+
+        def run():
+            try:
+                with translation.override(language):
+                    self.revalidate(slot=slot, fingerprint=fingerprint,
+                                    generator=generator, request=None, public=public)
+            except Exception:
+                logger.exception("regeneration of schema %s failed", slot)
+            finally:
+                with self._lock:
+                    self._regenerating.pop(slot, None)
+
+        Thread(target=run, name=f"schema-regeneration-{slot}", daemon=True).start()
+
+    def get_schema(self, generator, request=None, public: bool = True) -> Dict:
+        slot = self.get_slot(generator=generator, public=public)
+        fingerprint = get_schema_fingerprint(generator=generator, public=public)
+        cached = self.read(slot)
+
+        if cached and cached.get("fingerprint") == fingerprint:
+            with self._lock:
+                self.hits += 1
+            return cached["schema"]
+
+        if cached:
+            with self._lock:
+                self.stale_hits += 1
+            self._regenerate_in_background(
+                slot=slot, fingerprint=fingerprint, generator=generator, public=public)
+            return cached["schema"]
+
+        with self._lock:
+            self.misses += 1
+        return self.regenerate(slot=slot, fingerprint=fingerprint, generator=generator, request=request, public=public)
+
+    def wait_for_regenerations(self, timeout: Optional[float] = None) -> None:
+        """Blocks until all running background regenerations are done"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._regenerating:
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            time.sleep(0.01)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "regenerations": self.regenerations,
+                "regeneration_duration_total": self.regeneration_duration_total,
+                "regeneration_duration_last": self.regeneration_duration_last,
+            }
+
+
+class SharedSchema:
+    """Serialized schema inside a memory mapped cache file.
+
+    The content of every format is a `memoryview` into the mapping, so all processes, which map the same file, share
+    the same pages of the page cache and nothing is copied into the process memory.
+    """
+
+    def __init__(self, header: Dict, mapping: Union[mmap.mmap, bytes], offset: int) -> None:
+        self.fingerprint = header["fingerprint"]
+        self.hash = header["hash"]
+        self.formats = header["formats"]
+        self._view = memoryview(mapping)
+        self._offset = offset
+
+    def get_content(self, schema_format: str) -> memoryview:
+        start, length = self.formats[schema_format]
+        start += self._offset
+        return self._view[start:start + length]
+
+
+class SharedSchemaCache(FileSchemaCache):
+    """Shares the rendered schema between all worker processes of a host with a memory mapped cache file.
+
+    The cache file of a slot contains a json header line with the fingerprint, the schema hash and the offsets of the
+    rendered json and yaml schema, followed by the rendered schemas. The first process, which finds no up to date
+    cache file, generates the schema while holding an exclusive file lock on the slot. All other processes wait for
+    the lock and map the written file afterwards. Every process keeps the mapping of the current file, so the schema
+    is neither generated nor copied again.
+
+    If the fingerprint changes, the stale schema is served right away like by the `FileSchemaCache`. The background
+    regeneration takes the file lock, so only one process regenerates the schema, and replaces the cache file
+    atomically. Old mappings stay valid until they are released.
+
+    `JsonApiSpectacularAPIView` serves the rendered schema directly from the mapping. Needs `fcntl`, so it is only
+    available on posix systems.
+    """
+
+    # same renderings as the json and yaml renderers of drf-spectacular without media type parameters
+    renderers = {
+        "json": STREAMING_RENDERERS["json"],
+        "yaml": STREAMING_RENDERERS["yaml"],
+    }
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        if fcntl is None:
+            raise ImproperlyConfigured(
+                "SharedSchemaCache needs file locks of the fcntl module")
+        super().__init__(directory=directory)
+        self.mapped = 0
+        self._shared: Dict[str, SharedSchema] = {}
+
+    def get_path(self, slot: str) -> str:
+        return os.path.join(self.directory, f"{slot}.schema")
+
+    @contextmanager
+    def lock(self, slot: str) -> Iterator[None]:
+        """Exclusive lock of the slot across all processes of the host"""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, f"{slot}.lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def read_shared(self, slot: str) -> Optional[SharedSchema]:
+        try:
+            with open(self.get_path(slot), "rb") as cache_file:
+                header_line = cache_file.readline()
+                header = json.loads(header_line)
+                mapping = mmap.mmap(cache_file.fileno(), 0,
+                                    access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        return SharedSchema(header=header, mapping=mapping, offset=len(header_line))
+
+    def read(self, slot: str) -> Optional[Dict]:
+        shared = self.read_shared(slot)
+        if shared is None:
+            return None
+        return {"fingerprint": shared.fingerprint, "schema": json.loads(bytes(shared.get_content("json")))}
+
+    def render(self, fingerprint: str, schema: Dict) -> Tuple[bytes, List[bytes]]:
+        """Returns the header line and the rendered schemas of a cache file"""
+        contents = {schema_format: renderer().render(schema)
+                    for schema_format, renderer in self.renderers.items()}
+        formats = {}
+        offset = 0
+        for schema_format, content in contents.items():
+            formats[schema_format] = [offset, len(content)]
+            offset += len(content)
+        header = json.dumps({"fingerprint": fingerprint, "hash": get_schema_hash(schema),
+                             "formats": formats}).encode("utf-8") + b"\n"
+        return header, list(contents.values())
+
+    def write(self, slot: str, fingerprint: str, schema: Dict) -> None:
+        header, contents = self.render(fingerprint=fingerprint, schema=schema)
+
+        os.makedirs(self.directory, exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as cache_file:
+                cache_file.write(header)
+                cache_file.writelines(contents)
+            os.replace(temporary_path, self.get_path(slot))
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    def revalidate(self, slot: str, fingerprint: str, generator, request, public: bool) -> None:
+        with self.lock(slot):
+            # another process may have replaced the stale schema while we were waiting for the lock
+            shared = self.read_shared(slot)
+            if shared is None or shared.fingerprint != fingerprint:
+                self.regenerate(slot=slot, fingerprint=fingerprint,
+                                generator=generator, request=request, public=public)
+
+    def get_shared_schema(self, generator, request=None, public: bool = True) -> SharedSchema:
+        slot = self.get_slot(generator=generator, public=public)
+        fingerprint = get_schema_fingerprint(generator=generator, public=public)
+        with self._lock:
+            mapped = self._shared.get(slot)
+        if mapped is not None and mapped.fingerprint == fingerprint:
+            with self._lock:
+                self.hits += 1
+            return mapped
+
+        shared = self.read_shared(slot)
+        if shared is not None and shared.fingerprint != fingerprint or shared is None and mapped is not None:
+            stale = shared or mapped
+            with self._lock:
+                self.stale_hits += 1
+                self._shared.setdefault(slot, stale)
+            self._regenerate_in_background(
+                slot=slot, fingerprint=fingerprint, generator=generator, public=public)
+            return stale
+
+        if shared is None:
+            with self.lock(slot):
+                # another process may have written the schema while we were waiting for the lock
+                shared = self.read_shared(slot)
+                if shared is None or shared.fingerprint != fingerprint:
+                    with self._lock:
+                        self.misses += 1
+                    schema = self.regenerate(slot=slot, fingerprint=fingerprint,
+                                             generator=generator, request=request, public=public)
+                    shared = self.read_shared(slot)
+                    if shared is None or shared.fingerprint != fingerprint:
+                        logger.warning("can't map the cache file of schema %s, serving it from process memory", slot)
+                        header, contents = self.render(fingerprint=fingerprint, schema=schema)
+                        shared = SharedSchema(header=json.loads(header), mapping=header + b"".join(contents),
+                                              offset=len(header))
+        with self._lock:
+            self.mapped += 1
+            self._shared[slot] = shared
+        return shared
+
+    def get_schema(self, generator, request=None, public: bool = True) -> Dict:
+        shared = self.get_shared_schema(
+            generator=generator, request=request, public=public)
+        return json.loads(bytes(shared.get_content("json")))
+
+    def get_stats(self) -> Dict:
+        stats = super().get_stats()
+        with self._lock:
+            stats["mapped"] = self.mapped
+        return stats
+
+
+_schema_cache = None
+
+
+def get_schema_cache() -> Optional[FileSchemaCache]:
+    """Returns the process wide schema cache configured by the `SCHEMA_CACHE_CLASS` setting"""
+    global _schema_cache
+    cache_class = jsonapi_settings.SCHEMA_CACHE_CLASS
+    if not cache_class:
+        return None
+    directory = jsonapi_settings.SCHEMA_CACHE_DIR
+    if type(_schema_cache) is not cache_class or directory and _schema_cache.directory != directory:
+        _schema_cache = cache_class(directory=directory)
+    return _schema_cache
@@ -0,0 +1,204 @@
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+import drf_spectacular
+import rest_framework
+import rest_framework_json_api
+from django.conf import settings
+from django.db.models import Manager, QuerySet
+from django.utils.translation import get_language
+from rest_framework.fields import Field
+from rest_framework.serializers import BaseSerializer, ListSerializer
+from rest_framework.utils.representation import smart_repr
+
+import drf_spectacular_jsonapi
+from drf_spectacular_jsonapi.schemas.cache import SchemaCache, register_cache
+
+# all django settings starting with one of this prefixes can change the generated schema
+FINGERPRINT_SETTING_PREFIXES = (
+    "SPECTACULAR_",
+    "REST_FRAMEWORK",
+    "JSON_API_",
+)
+
+# view attributes, which are analyzed by the schema generation
+FINGERPRINT_VIEW_ATTRIBUTES = (
+    "queryset",
+    "filterset_class",
+    "filterset_fields",
+    "filter_backends",
+    "ordering_fields",
+    "search_fields",
+    "pagination_class",
+    "parser_classes",
+    "renderer_classes",
+    "authentication_classes",
+    "permission_classes",
+    "versioning_class",
+    "lookup_field",
+    "lookup_url_kwarg",
+    "http_method_names",
+    "schema",
+)
+
+
+schema_fingerprint_cache = register_cache(
+    SchemaCache(name="schema_fingerprints"))
+
+
+def _qualname(obj) -> str:
+    obj = obj if isinstance(obj, type) else obj.__class__
+    return f"{obj.__module__}.{obj.__qualname__}"
+
+
+def describe_value(value, _seen: frozenset = frozenset()) -> Any:
+    """Returns a json serializable and stable description of the value. Querysets are never evaluated."""
+    if isinstance(value, (QuerySet, Manager)):
+        return f"{_qualname(value)}<{_qualname(value.model)}>"
+    if isinstance(value, Field):
+        return describe_field(value, _seen=_seen)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        described = [describe_value(item, _seen=_seen) for item in value]
+        return sorted(described, key=str) if isinstance(value, (set, frozenset)) else described
+    if isinstance(value, dict):
+        return {str(key): describe_value(item, _seen=_seen) for key, item in value.items()}
+    return smart_repr(value)
+
+
+def describe_field(field: Field, _seen: frozenset = frozenset()) -> Dict[str, Any]:
+    description = {
+        "class": _qualname(field),
+        "args": describe_value(getattr(field, "_args", ()), _seen=_seen),
+        "kwargs": describe_value(getattr(field, "_kwargs", {}), _seen=_seen),
+    }
+    if isinstance(field, BaseSerializer):
+        # nested serializers are described by their declared fields. Recursive serializers are described only once.
+        serializer_class = (field.child if isinstance(
+            field, ListSerializer) else field).__class__
+        if serializer_class not in _seen:
+            description["declared_fields"] = describe_value(
+                dict(getattr(serializer_class, "_declared_fields", {})), _seen=_seen | {serializer_class})
+    return description
+
+
+def describe_filterset(filterset_class) -> Dict[str, Any]:
+    """Describes all filters of the filterset class, including the ones generated from `Meta.fields`"""
+    return {
+        "class": _qualname(filterset_class),
+        "filters": {
+            name: {
+                "class": _qualname(filter_obj),
+                "field_name": filter_obj.field_name,
+                "lookup_expr": smart_repr(filter_obj.lookup_expr),
+                "extra": describe_value(filter_obj.extra),
+            }
+            for name, filter_obj in getattr(filterset_class, "base_filters", {}).items()
+        },
+    }
+
+
+def describe_serializer(serializer_class) -> Dict[str, Any]:
+    """Describes the field definitions of the serializer class"""
+    try:
+        fields = serializer_class().fields
+    except Exception:
+        # serializers which need a context or arguments, can only be described by their declared fields
+        fields = getattr(serializer_class, "_declared_fields", {})
+    description = {
+        "class": _qualname(serializer_class),
+        "fields": describe_value(dict(fields)),
+    }
+    included_serializers = getattr(
+        serializer_class, "included_serializers", None)
+    if included_serializers:
+        description["included_serializers"] = {
+            name: included if isinstance(included, str) else _qualname(included)
+            for name, included in included_serializers.items()
+        }
+    return description
+
+
+def describe_view(callback, serializer_descriptions: Optional[Dict] = None) -> Dict[str, Any]:
+    """Describes the view class of the callback. Pass the same `serializer_descriptions` dict to multiple calls to
+    describe every serializer class only once."""
+    view_cls = getattr(callback, "cls", callback)
+    description = {
+        "class": _qualname(view_cls),
+        "initkwargs": describe_value(getattr(callback, "initkwargs", {})),
+        "actions": describe_value(getattr(callback, "actions", {})),
+    }
+    for attribute in FINGERPRINT_VIEW_ATTRIBUTES:
+        description[attribute] = describe_value(
+            getattr(view_cls, attribute, None))
+
+    filterset_class = getattr(view_cls, "filterset_class", None)
+    if filterset_class:
+        description["filterset_class"] = describe_filterset(filterset_class)
+
+    serializer_class = getattr(view_cls, "serializer_class", None)
+    if serializer_class:
+        if serializer_descriptions is None:
+            serializer_descriptions = {}
+        if serializer_class not in serializer_descriptions:
+            serializer_descriptions[serializer_class] = describe_serializer(
+                serializer_class)
+        description["serializer_class"] = serializer_descriptions[serializer_class]
+    return description
+
+
+def describe_settings() -> Dict[str, Any]:
+    return {
+        name: describe_value(getattr(settings, name))
+        for name in sorted(dir(settings))
+        if name.startswith(FINGERPRINT_SETTING_PREFIXES)
+    }
+
+
+def get_schema_fingerprint(generator, public: bool = True) -> str:
+    """Returns a hash over everything the generated schema depends on.
+
+    That is the url conf with all registered views, their serializer field definitions, the relevant settings, the
+    active language and the versions of the schema generation packages. The fingerprint is much cheaper to calculate
+    than the schema itself, because no schema is mapped.
+
+    Describing all views still instantiates every serializer, so the fingerprint is memoized per process like the
+    other schema caches (cleared by `setting_changed` and `clear_caches`). Generators with explicit `patterns` are
+    not memoized.
+    """
+    if generator.patterns is not None:
+        return calculate_schema_fingerprint(generator=generator, public=public)
+    key = (
+        generator.__class__,
+        repr(generator.urlconf),
+        generator.api_version,
+        tuple(sorted(getattr(generator, "resources", None) or ())),
+        public,
+        get_language(),
+    )
+    return schema_fingerprint_cache.get_or_set(
+        key, lambda: calculate_schema_fingerprint(generator=generator, public=public))
+
+
+def calculate_schema_fingerprint(generator, public: bool = True) -> str:
+    generator._initialise_endpoints()
+    serializer_descriptions: Dict = {}
+    endpoints: List[Any] = [
+        (path, method, describe_view(
+            callback, serializer_descriptions=serializer_descriptions))
+        for path, path_regex, method, callback in generator.endpoints
+    ]
+    fingerprint = {
+        "versions": [
+            drf_spectacular_jsonapi.__version__,
+            drf_spectacular.__version__,
+            rest_framework.VERSION,
+            rest_framework_json_api.VERSION,
+        ],
+        "settings": describe_settings(),
+        "language": get_language(),
+        "api_version": generator.api_version,
+        "public": public,
+        "endpoints": endpoints,
+    }
+    return hashlib.sha256(json.dumps(fingerprint, sort_keys=True, default=smart_repr).encode("utf-8")).hexdigest()
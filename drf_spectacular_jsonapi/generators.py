@@ -0,0 +1,365 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.utils import translation
+from django.utils.translation import get_language
+from drf_spectacular.drainage import GENERATOR_STATS, reset_generator_stats
+from drf_spectacular.generators import SchemaGenerator
+from drf_spectacular.plumbing import (build_root_object,
+                                      normalize_result_object,
+                                      process_webhooks,
+                                      sanitize_result_object)
+from drf_spectacular.settings import spectacular_settings
+
+from drf_spectacular_jsonapi.fingerprint import describe_view
+from drf_spectacular_jsonapi.incremental import (EndpointState,
+                                                 IncrementalReport,
+                                                 ReplayedOperationSchema,
+                                                 copy_component,
+                                                 get_endpoint_fingerprint,
+                                                 get_global_fingerprint,
+                                                 get_incremental_state,
+                                                 record_operation)
+from drf_spectacular_jsonapi.interning import FragmentInterner
+from drf_spectacular_jsonapi.localization import (keep_lazy_strings,
+                                                  localize_schema)
+from drf_spectacular_jsonapi.parallel import (collect_chunk,
+                                              force_lazy_strings, get_chunks,
+                                              get_path_prefix,
+                                              get_unreferenced_components,
+                                              is_parallel_generation_supported,
+                                              map_chunks, merge_components,
+                                              merge_generator_stats,
+                                              merge_paths,
+                                              rename_relationship_variants)
+from drf_spectacular_jsonapi.partial import (exclude_other_resources,
+                                             parse_resources)
+from drf_spectacular_jsonapi.references import (get_references,
+                                                resolve_references)
+from drf_spectacular_jsonapi.renderers import (canonicalize_schema,
+                                               get_schema_hash)
+from drf_spectacular_jsonapi.schemas.cache import clear_caches
+from drf_spectacular_jsonapi.settings import jsonapi_settings
+
+logger = logging.getLogger(__name__)
+
+
+class JsonApiSchemaGenerator(SchemaGenerator):
+    """Schema generator with the generation features of this package.
+
+    Configure it as `DEFAULT_GENERATOR_CLASS` inside the `SPECTACULAR_SETTINGS`.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        self.workers = kwargs.pop("workers", None)
+        # only generate the operations of these resource types or tags, see `drf_spectacular_jsonapi.partial`
+        self.resources = parse_resources(kwargs.pop("resources", None))
+        super().__init__(*args, **kwargs)
+        self.schema_hash = None
+        self.parallel_fallbacks = 0
+
+    def _get_paths_and_endpoints(self):
+        endpoints = super()._get_paths_and_endpoints()
+        if self.resources:
+            exclude_other_resources(
+                endpoints, resources=self.resources, path_prefix=get_path_prefix(endpoints))
+        return endpoints
+
+    def get_workers(self) -> int:
+        workers = self.workers if self.workers is not None else jsonapi_settings.PARALLEL_WORKERS
+        if workers == 0:
+            workers = os.cpu_count() or 1
+        return workers or 1
+
+    def parse(self, input_request, public):
+        workers = self.get_workers()
+        if workers > 1 and not is_parallel_generation_supported():
+            logger.warning(
+                "parallel schema generation needs the fork start method, falling back to serial generation")
+            workers = 1
+        if workers <= 1:
+            return super().parse(input_request, public)
+        return self.parse_parallel(input_request, public, workers)
+
+    def parse_parallel(self, input_request, public, workers: int):
+        """Maps the operations of contiguous endpoint chunks in forked worker processes.
+
+        The components registered by the workers are merged in endpoint order with `register_on_missing` semantic,
+        which produces the same registry as the serial generation. Relationship components are renamed like the
+        serial generation names them before. Only if a discarded component schema referenced components, which are
+        not referenced by anything else, the result would differ from the serial generation, so the schema is
+        generated serially then. `parallel_fallbacks` counts these fallbacks.
+        """
+        self._initialise_endpoints()
+        endpoints = self._get_paths_and_endpoints()
+        self._parallel_endpoints = endpoints
+        self._parallel_path_prefix = get_path_prefix(endpoints)
+        self._parallel_request = input_request
+        self._parallel_public = public
+        self._parallel_language = get_language()
+        self._parallel_registered = registered = dict(self.registry._components)
+        try:
+            chunks = map_chunks(
+                generator=self, chunks=get_chunks(len(endpoints), workers), workers=workers)
+        finally:
+            del self._parallel_endpoints, self._parallel_request, self._parallel_registered
+
+        paths = {}
+        discarded = set()
+        for chunk in chunks:
+            chunk = rename_relationship_variants(self.registry, chunk)
+            discarded |= merge_components(self.registry, chunk.components)
+            merge_paths(paths, chunk.paths)
+
+        conflicts = get_unreferenced_components(self.registry, paths, discarded, registered)
+        if conflicts:
+            logger.warning(
+                "conflicting components %s, falling back to serial schema generation", conflicts)
+            self.registry._components = registered
+            self.parallel_fallbacks += 1
+            return super().parse(input_request, public)
+
+        for chunk in chunks:
+            merge_generator_stats(warnings=chunk.warnings, errors=chunk.errors)
+        return paths
+
+    def map_chunk(self, start: int, stop: int):
+        """Maps the endpoints `start:stop` inside a forked worker process"""
+        endpoints = self._parallel_endpoints[start:stop]
+        # the prefix depends on all endpoints, so it was estimated by the generating process. The settings can be
+        # changed here, cause every worker is a separate process.
+        spectacular_settings.SCHEMA_PATH_PREFIX = self._parallel_path_prefix
+        self._get_paths_and_endpoints = lambda: endpoints
+        # a worker process maps multiple chunks, every chunk starts with the registry of the generating process
+        self.registry._components = dict(self._parallel_registered)
+        GENERATOR_STATS.reset()
+        with GENERATOR_STATS.silence(), translation.override(self._parallel_language):
+            paths = super().parse(self._parallel_request, self._parallel_public)
+        return collect_chunk(paths=paths, registry=self.registry, registered=self._parallel_registered)
+
+    def get_structural_schema(self, request=None, public=False):
+        """Generates the schema like `SchemaGenerator.get_schema`, but without normalizing it, so lazy strings are
+        kept. `generate_localized_schemas` translates the result into every language."""
+        reset_generator_stats()
+        result = build_root_object(
+            paths=self.parse(request, public),
+            components=self.registry.build(spectacular_settings.APPEND_COMPONENTS),
+            webhooks=process_webhooks(spectacular_settings.WEBHOOKS, self.registry),
+            version=self.api_version or getattr(request, 'version', None),
+        )
+        for hook in spectacular_settings.POSTPROCESSING_HOOKS:
+            result = hook(result=result, generator=self, request=request, public=public)
+        return sanitize_result_object(result)
+
+    def get_schema(self, request=None, public=False):
+        schema = normalize_result_object(self.get_structural_schema(request=request, public=public))
+        return self.finalize_schema(schema)
+
+    def finalize_schema(self, schema: Dict) -> Dict:
+        """Canonicalizes and interns the normalized schema depending on the settings"""
+        if jsonapi_settings.DETERMINISTIC_OUTPUT:
+            # lists with set semantics may be build from unordered sources (sets, dict views of third party
+            # packages...). Sort them, so equal code always produces byte identical output.
+            schema = canonicalize_schema(schema)
+        if jsonapi_settings.INTERN_FRAGMENTS:
+            # drf-spectacular normalizes the result into new objects after the postprocessing hooks, so the fragments
+            # can only be shared afterwards
+            interner = FragmentInterner()
+            schema = interner.intern(schema)
+            logger.debug("interned schema fragments: %s", interner.get_stats())
+        self.schema_hash = get_schema_hash(schema)
+        return schema
+
+
+class IncrementalSchemaGenerator(JsonApiSchemaGenerator):
+    """Schema generator, which only maps the operations of changed endpoints again.
+
+    Every endpoint is fingerprinted by its path, method, view class, view attributes, serializer fields and filterset
+    filters (see `drf_spectacular_jsonapi.fingerprint`). Operations of unchanged endpoints and the components they
+    reference are taken from the previous generation, which is stored inside the given `state` (a process wide state
+    per url conf and api version by default). Components, which are only referenced by removed endpoints, are
+    dropped. If settings, versions, language or the path prefix change, the schema is generated completely.
+
+    What was recomputed is reported by `report` after every generation. Warnings of reused operations are not emitted
+    again. The endpoints are always mapped serially.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        state = kwargs.pop("state", None)
+        super().__init__(*args, **kwargs)
+        self.state = state or get_incremental_state(
+            (self.urlconf, self.api_version, self.resources))
+        self.report: Optional[IncrementalReport] = None
+
+    def parse(self, input_request, public):
+        with self.state.lock:
+            return self.parse_incremental(input_request, public)
+
+    def parse_incremental(self, input_request, public):
+        self._initialise_endpoints()
+        endpoints = self._get_paths_and_endpoints()
+        state = self.state
+        fingerprint = get_global_fingerprint(
+            self, public=public, path_prefix=get_path_prefix(endpoints))
+        full_regeneration = fingerprint != state.fingerprint
+        previous = {} if full_regeneration else state.endpoints
+        previous_components = {} if full_regeneration else state.components
+
+        serializer_descriptions = {}
+        view_descriptions = {}
+        fingerprints = {}
+        for path, path_regex, method, callback in self.endpoints:
+            if id(callback) not in view_descriptions:
+                view_descriptions[id(callback)] = describe_view(
+                    callback, serializer_descriptions=serializer_descriptions)
+            fingerprints[path, path_regex, method] = get_endpoint_fingerprint(
+                path, path_regex, method, callback, view_descriptions[id(callback)])
+
+        added = [key for key in fingerprints if key not in previous]
+        changed = [key for key in fingerprints
+                   if key in previous and previous[key].fingerprint != fingerprints[key]]
+        removed = [key for key in previous if key not in fingerprints]
+        reused = [key for key in fingerprints
+                  if key in previous and previous[key].fingerprint == fingerprints[key]]
+        if changed:
+            # the memoized resource objects are keyed on the classes, which may have been mutated
+            clear_caches()
+
+        # components of changed or removed endpoints have to be mapped again, cause they may depend on the changes
+        kept_components = resolve_references(
+            chain.from_iterable(previous[key].references for key in reused), state.get_component_references)
+        stale_components = resolve_references(
+            chain.from_iterable(previous[key].references for key in changed + removed),
+            state.get_component_references)
+        reused_components = set()
+        for key in kept_components - stale_components:
+            if key in previous_components and key not in self.registry._components:
+                self.registry._components[key] = copy_component(
+                    previous_components[key])
+                reused_components.add(key)
+
+        reused_keys = set(reused)
+        recorded = {}
+        replayed = set()
+        for (path, path_regex, method, callback), (_, _, _, view) in zip(self.endpoints, endpoints):
+            key = (path, path_regex, method)
+            if key in reused_keys:
+                view.schema = ReplayedOperationSchema(
+                    operation=previous[key].operation, key=key, replayed=replayed)
+            else:
+                # the schema instance is pinned to the view, cause `JsonApiAutoSchema` returns a copy on every access
+                schema = view.schema
+                record_operation(schema, recorded, key)
+                view.schema = schema
+
+        self._get_paths_and_endpoints = lambda: endpoints
+        try:
+            # parallel generation is skipped, cause the recorded operations are only known to this process
+            result = SchemaGenerator.parse(self, input_request, public)
+        finally:
+            del self._get_paths_and_endpoints
+
+        endpoint_states = {}
+        for key, endpoint_fingerprint in fingerprints.items():
+            if key in recorded:
+                endpoint_states[key] = EndpointState(
+                    fingerprint=endpoint_fingerprint, operation=recorded[key], references=get_references(recorded[key]))
+            elif key in reused_keys:
+                endpoint_states[key] = previous[key]
+
+        # components, which are shared with changed endpoints, but are not mapped again by them
+        mapped_references = {
+            key: get_references(component.schema)
+            for key, component in self.registry._components.items() if key not in reused_components
+        }
+        referenced = resolve_references(
+            chain.from_iterable(
+                endpoint_states[key].references for key in chain(recorded, replayed)),
+            lambda key: mapped_references[key] if key in mapped_references else state.get_component_references(
+                key)
+        )
+        for key in referenced:
+            if key not in self.registry._components and key in previous_components:
+                self.registry._components[key] = copy_component(
+                    previous_components[key])
+                reused_components.add(key)
+
+        # the state is taken before the postprocessing hooks run, cause they modify the components of the registry
+        state.update(fingerprint=fingerprint, endpoints=endpoint_states, components={
+            key: previous_components[key] if key in reused_components else copy_component(
+                component)
+            for key, component in self.registry._components.items()
+        })
+
+        self.report = IncrementalReport(
+            full_regeneration=full_regeneration,
+            added=tuple(added),
+            changed=tuple(changed),
+            removed=tuple(removed),
+            reused=tuple(reused),
+            recomputed_components=tuple(
+                key for key in self.registry._components if key not in reused_components),
+            removed_components=tuple(
+                key for key in previous_components if key not in self.registry._components),
+        )
+        return result
+
+
+class SchemaVariant(NamedTuple):
+    """One schema of a concurrent generation, see `generate_schemas`"""
+    api_version: Optional[str] = None
+    language: Optional[str] = None
+    urlconf: Optional[str] = None
+    public: bool = True
+    resources: Optional[Tuple[str, ...]] = None
+
+
+def generate_schema(variant: SchemaVariant, generator_class=None) -> Dict:
+    generator_class = generator_class or spectacular_settings.DEFAULT_GENERATOR_CLASS
+    kwargs = {"resources": variant.resources} if variant.resources else {}
+    generator = generator_class(
+        urlconf=variant.urlconf, api_version=variant.api_version, **kwargs)
+    with translation.override(variant.language or get_language()):
+        # lazy strings are rendered with the language, which is active while rendering. Translate them now, cause
+        # the language of this variant is only active inside this block.
+        return force_lazy_strings(generator.get_schema(request=None, public=variant.public))
+
+
+def generate_schemas(variants: Iterable[SchemaVariant], max_workers: Optional[int] = None,
+                     generator_class=None) -> List[Dict]:
+    """Generates the schemas of all variants (api versions, languages...) concurrently inside a thread pool.
+
+    Every variant is generated by its own generator, with its own component registry. The schemas are returned in the
+    order of the variants.
+    """
+    variants = list(variants)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="schema-generation") as executor:
+        return list(executor.map(lambda variant: generate_schema(variant, generator_class=generator_class), variants))
+
+
+def generate_localized_schemas(languages: Iterable[str], variant: Optional[SchemaVariant] = None,
+                               generator_class=None) -> Dict[str, Dict]:
+    """Generates the schema of the variant in all languages, but maps it only once.
+
+    The structural schema is generated without an active language, with the lazy strings kept as they are (see
+    `drf_spectacular_jsonapi.localization`). Afterwards the lazy strings are forced and the schema is normalized for
+    every language. Strings, which third party code translates right away, stay in the source language. Generators,
+    which are no `JsonApiSchemaGenerator`, generate every language completely.
+    """
+    variant = variant or SchemaVariant()
+    languages = list(languages)
+    generator_class = generator_class or spectacular_settings.DEFAULT_GENERATOR_CLASS
+    if not issubclass(generator_class, JsonApiSchemaGenerator):
+        return {language: generate_schema(variant._replace(language=language), generator_class=generator_class)
+                for language in languages}
+
+    kwargs = {"resources": variant.resources} if variant.resources else {}
+    # forked workers return translated strings, see `drf_spectacular_jsonapi.parallel.collect_chunk`
+    generator = generator_class(
+        urlconf=variant.urlconf, api_version=variant.api_version, workers=1, **kwargs)
+    with keep_lazy_strings():
+        structure = generator.get_structural_schema(request=None, public=variant.public)
+    return {language: generator.finalize_schema(localize_schema(structure, language)) for language in languages}
@@ -1,11 +1,65 @@
+import logging
 import re
+from functools import lru_cache
+from typing import Dict, Optional
 from warnings import warn
 
 from django.urls import Resolver404, resolve
 from rest_framework_extensions.settings import extensions_api_settings
 from rest_framework_json_api.utils import get_resource_name
 
+from drf_spectacular_jsonapi.postprocessing import (
+    get_schema_size, prune_unreachable_components, strip_metadata)
+from drf_spectacular_jsonapi.tracing import traced_hook
 
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def get_nested_lookup_regex(prefix: str) -> re.Pattern:
+    # matches every single `{parent_lookup_...}` path parameter, also if there are multiple nesting levels
+    return re.compile(r"\{(%s[^}]*)\}" % re.escape(prefix))
+
+
+def get_resource_name_of_callback(callback) -> Optional[str]:
+    if not hasattr(callback, "cls"):
+        return None
+    return get_resource_name(context={'view': callback.cls(action='list')})
+
+
+class NestedPathIndex:
+    """Resolves the resource names of parent paths of nested routes.
+
+    The parent paths are looked up inside the index of the endpoint paths first, cause router registrations of parent
+    resources are part of the endpoints as well. Only unknown parent paths are resolved with the url conf. Every parent
+    path is resolved only once.
+    """
+
+    def __init__(self, endpoints) -> None:
+        self.callbacks: Dict[str, object] = {}
+        for (path, path_regex, method, callback) in endpoints:
+            self.callbacks.setdefault(path, callback)
+        self.resource_names: Dict[str, Optional[str]] = {}
+
+    def get_resource_name(self, parent_path: str) -> Optional[str]:
+        if parent_path not in self.resource_names:
+            self.resource_names[parent_path] = self._get_resource_name(
+                parent_path)
+        return self.resource_names[parent_path]
+
+    def _get_resource_name(self, parent_path: str) -> Optional[str]:
+        callback = self.callbacks.get(parent_path)
+        if callback is None:
+            try:
+                callback = resolve(parent_path.replace('{', '').replace('}', '')).func
+            except Resolver404:
+                warn(
+                    message=f"Can't find path {parent_path} to fix nested path parameters")
+                return None
+        return get_resource_name_of_callback(callback)
+
+
+@traced_hook("preprocessing_hook")
 def fix_nested_path_parameters(endpoints):
     # If drf-extension package is used and there are nested routes, by default
     # the api paths will shown as /users/{parent_lookup_user_groups}/groups/ for example,
@@ -15,34 +69,53 @@ def fix_nested_path_parameters(endpoints):
     # then an openapi client can combine the parent resource type `User` by it self.
     # Otherwise it would not be possible for the client to determine the path parameter name on the fly...
     # thats why we patch it here for the schema reperesentation.
+    prefix = extensions_api_settings.DEFAULT_PARENT_LOOKUP_KWARG_NAME_PREFIX
+    nested_lookup_regex = get_nested_lookup_regex(prefix)
+    index = None
     fixed_enpoints = []
     for (path, path_regex, method, callback) in endpoints:
-        if extensions_api_settings.DEFAULT_PARENT_LOOKUP_KWARG_NAME_PREFIX in path:
-            nested_lookups = re.findall(
-                r"(?<=\{)(parent_lookup.*)(?=\})", path)
-
-            new_path = path
-            for lookup in nested_lookups:
-                parent_path = path.split(lookup)[0].replace('{', '')
-                # fix trailing slashes setting
-                if parent_path.endswith("/") and not path.endswith("/"):
-                    parent_path = parent_path[:-1]
-
-                try:
-                    match = resolve(parent_path)
-                    func = match.func
-                    if hasattr(func, "cls"):
-                        func = func.cls(action='list')
-
-                        new_path = new_path.replace(
-                            lookup, f"{get_resource_name(context={'view': func})}Id")
-
-                except Resolver404:
-                    warn(
-                        message=f"Can't find path {parent_path} to fix nested path parameters")
-
-            fixed_enpoints.append((new_path, path_regex, method, callback))
-        else:
+        if prefix not in path:
             fixed_enpoints.append((path, path_regex, method, callback))
+            continue
+
+        if index is None:
+            index = NestedPathIndex(endpoints)
+
+        new_path = path
+        for match in nested_lookup_regex.finditer(path):
+            parent_path = path[:match.start()]
+            # fix trailing slashes setting
+            if parent_path.endswith("/") and not path.endswith("/"):
+                parent_path = parent_path[:-1]
+
+            resource_name = index.get_resource_name(parent_path)
+            if resource_name:
+                new_path = new_path.replace(
+                    match.group(1), f"{resource_name}Id", 1)
+
+        fixed_enpoints.append((new_path, path_regex, method, callback))
 
     return fixed_enpoints
+
+
+def _optimize(step: str, optimize, result):
+    if not logger.isEnabledFor(logging.DEBUG):
+        return optimize(result)
+    # measuring renders the whole schema, so it is only done if the result is logged
+    bytes_before = get_schema_size(result)
+    result = optimize(result)
+    bytes_after = get_schema_size(result)
+    logger.debug("%s saved %d bytes (%d -> %d)", step,
+                 bytes_before - bytes_after, bytes_before, bytes_after)
+    return result
+
+
+def postprocess_prune_components(result, generator, **kwargs):
+    # drops all components, which are not reachable by `$ref` from any operation. Add it after the enum postprocessing
+    # hook of drf-spectacular, cause that one registers the enum components.
+    return _optimize("prune_unreachable_components", prune_unreachable_components, result)
+
+
+def postprocess_minify_schema(result, generator, **kwargs):
+    # strips titles and descriptions for machine consumers like client generators
+    return _optimize("strip_metadata", strip_metadata, result)
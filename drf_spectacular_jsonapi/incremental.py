@@ -0,0 +1,166 @@
+import hashlib
+import json
+from copy import deepcopy
+from threading import RLock
+from typing import (Any, Dict, FrozenSet, Hashable, NamedTuple, Optional,
+                    Set, Tuple)
+
+import drf_spectacular
+import rest_framework
+import rest_framework_json_api
+from django.utils.translation import get_language
+from drf_spectacular.openapi import AutoSchema
+from drf_spectacular.plumbing import ResolvedComponent
+from rest_framework.utils.representation import smart_repr
+
+import drf_spectacular_jsonapi
+from drf_spectacular_jsonapi.fingerprint import describe_settings
+from drf_spectacular_jsonapi.references import ComponentKey, get_references
+
+EndpointKey = Tuple[str, str, str]
+
+
+def _hash(description: Any) -> str:
+    return hashlib.sha256(json.dumps(description, sort_keys=True, default=smart_repr).encode("utf-8")).hexdigest()
+
+
+def get_global_fingerprint(generator, public: bool, path_prefix: str) -> str:
+    """Hash over everything all operations depend on. If it changes, nothing of the previous schema can be reused."""
+    return _hash({
+        "versions": [
+            drf_spectacular_jsonapi.__version__,
+            drf_spectacular.__version__,
+            rest_framework.VERSION,
+            rest_framework_json_api.VERSION,
+        ],
+        "settings": describe_settings(),
+        "language": get_language(),
+        "api_version": generator.api_version,
+        "public": public,
+        "path_prefix": path_prefix,
+        "resources": sorted(getattr(generator, "resources", None) or ()),
+    })
+
+
+def get_endpoint_fingerprint(path: str, path_regex: str, method: str, callback, view_description: Dict) -> str:
+    # the identity of the view class is part of the fingerprint, so replaced classes (plugins, reloaded modules) are
+    # always regenerated, also if they are described equally.
+    return _hash({
+        "path": path,
+        "path_regex": path_regex,
+        "method": method,
+        "identity": id(getattr(callback, "cls", callback)),
+        "view": view_description,
+    })
+
+
+def copy_component(component: ResolvedComponent) -> ResolvedComponent:
+    return ResolvedComponent(
+        name=component.name,
+        type=component.type,
+        schema=deepcopy(component.schema),
+        object=component.object,
+    )
+
+
+class EndpointState(NamedTuple):
+    fingerprint: str
+    # result of `get_operation` before any modification by the generator, `None` for excluded operations
+    operation: Optional[Dict]
+    references: FrozenSet[ComponentKey]
+
+
+class IncrementalReport(NamedTuple):
+    """What an incremental schema generation has recomputed.
+
+    Endpoints are identified by `(path, path_regex, method)`, components by `(name, type)`.
+    """
+    full_regeneration: bool
+    added: Tuple[EndpointKey, ...] = ()
+    changed: Tuple[EndpointKey, ...] = ()
+    removed: Tuple[EndpointKey, ...] = ()
+    reused: Tuple[EndpointKey, ...] = ()
+    recomputed_components: Tuple[ComponentKey, ...] = ()
+    removed_components: Tuple[ComponentKey, ...] = ()
+
+    @property
+    def recomputed(self) -> Tuple[EndpointKey, ...]:
+        return self.added + self.changed
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {key: list(value) if isinstance(value, tuple) else value for key, value in self._asdict().items()}
+
+
+class IncrementalSchemaState:
+    """Operations and components of the previous generation, which are reused by the next incremental generation"""
+
+    def __init__(self) -> None:
+        self.fingerprint: Optional[str] = None
+        self.endpoints: Dict[EndpointKey, EndpointState] = {}
+        self.components: Dict[ComponentKey, ResolvedComponent] = {}
+        self.component_references: Dict[ComponentKey, FrozenSet[ComponentKey]] = {}
+        self.lock = RLock()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.update(fingerprint=None, endpoints={}, components={})
+
+    def update(self, fingerprint: Optional[str], endpoints: Dict[EndpointKey, EndpointState],
+               components: Dict[ComponentKey, ResolvedComponent]) -> None:
+        """Stores the state of a generation. The stored components must not be shared with any registry."""
+        with self.lock:
+            self.fingerprint = fingerprint
+            self.endpoints = endpoints
+            self.component_references = {
+                key: self.component_references[key]
+                if self.components.get(key) is component else get_references(component.schema)
+                for key, component in components.items()
+            }
+            self.components = components
+
+    def get_component_references(self, key: ComponentKey) -> FrozenSet[ComponentKey]:
+        return self.component_references.get(key, frozenset())
+
+
+class ReplayedOperationSchema(AutoSchema):
+    """Returns the operation of the previous generation instead of mapping the view again"""
+
+    def __init__(self, operation: Optional[Dict], key: EndpointKey, replayed: Set[EndpointKey]) -> None:
+        super().__init__()
+        self.operation = operation
+        self.key = key
+        self.replayed = replayed
+
+    def get_operation(self, path, path_regex, path_prefix, method, registry):
+        self.replayed.add(self.key)
+        return deepcopy(self.operation)
+
+
+def record_operation(schema: AutoSchema, recorded: Dict[EndpointKey, Optional[Dict]], key: EndpointKey) -> None:
+    """Records the unmodified results of `get_operation`, the generator may modify the operation afterwards"""
+    get_operation = schema.get_operation
+
+    def recording_get_operation(*args, **kwargs):
+        operation = get_operation(*args, **kwargs)
+        recorded[key] = deepcopy(operation)
+        return operation
+
+    schema.get_operation = recording_get_operation
+
+
+_states: Dict[Hashable, IncrementalSchemaState] = {}
+_states_lock = RLock()
+
+
+def get_incremental_state(key: Hashable = None) -> IncrementalSchemaState:
+    """Returns the process wide state for the given key (url conf, api version and resources by default)"""
+    with _states_lock:
+        if key not in _states:
+            _states[key] = IncrementalSchemaState()
+        return _states[key]
+
+
+def clear_incremental_states() -> None:
+    with _states_lock:
+        for state in _states.values():
+            state.clear()
@@ -0,0 +1,106 @@
+from typing import Dict, Union
+
+from django.utils.functional import Promise
+from django.utils.translation import get_language
+
+from drf_spectacular_jsonapi.localization import is_keeping_lazy_strings
+from drf_spectacular_jsonapi.schemas.cache import SchemaCache, register_cache
+
+
+class TranslationCache(SchemaCache):
+    """Translated strings by the lazy string and the language.
+
+    Lazy strings are not hashable without translating them, so they are keyed by their id. The lazy string is stored
+    together with the translation, which keeps it alive and its id unique.
+    """
+
+    def translate(self, message: Union[str, Promise]) -> str:
+        if is_keeping_lazy_strings():
+            # the structural schema of `generate_localized_schemas` is translated afterwards
+            return message
+        return self.get_or_set(
+            key=(id(message), get_language()),
+            factory=lambda: (message, str(message))
+        )[1]
+
+
+translation_cache = register_cache(TranslationCache(name="translations"))
+
+
+def gettext_once(message: Union[str, Promise]) -> str:
+    """Translates the (lazy) message into the active language.
+
+    Every message is only translated once per language and the same string object is returned on every call. Use it
+    for module level lazy strings, which are part of every resource object, instead of creating a new lazy string
+    per schema.
+    """
+    return translation_cache.translate(message)
+
+
+class FragmentInterner:
+    """Hash-conses the fragments of a schema.
+
+    Equal objects, arrays and strings are replaced by one canonical instance, so the schema is a directed acyclic
+    graph instead of a tree. Fragments are only equal if they have the same keys in the same order, so the rendered
+    schema stays byte identical.
+
+    Interned schemas must not be mutated anymore, cause changing one fragment changes all places which share it.
+    """
+
+    def __init__(self) -> None:
+        self._fragments: Dict[tuple, Union[dict, list]] = {}
+        self._strings: Dict[str, str] = {}
+        self.visited = 0
+        self.shared = 0
+
+    def _get_key(self, value) -> tuple:
+        if isinstance(value, (dict, list)):
+            # children are already canonical, so their identity is their structure
+            return (id(value),)
+        if isinstance(value, float):
+            # 0.0 and -0.0 are equal, but rendered differently
+            return (float, repr(value))
+        try:
+            hash(value)
+        except TypeError:
+            return (id(value),)
+        return (type(value), value)
+
+    def _intern_fragment(self, key: tuple, fragment: Union[dict, list]) -> Union[dict, list]:
+        self.visited += 1
+        canonical = self._fragments.get(key)
+        if canonical is None:
+            canonical = self._fragments[key] = fragment
+        else:
+            self.shared += 1
+        return canonical
+
+    def intern(self, obj):
+        if type(obj) is str:
+            return self._strings.setdefault(obj, obj)
+        if isinstance(obj, Promise):
+            return self.intern(gettext_once(obj))
+        if isinstance(obj, dict):
+            items = [(self.intern(key), self.intern(value))
+                     for key, value in obj.items()]
+            key = (dict,) + tuple((item_key, self._get_key(value))
+                                  for item_key, value in items)
+            return self._intern_fragment(key, dict(items))
+        if isinstance(obj, list):
+            items = [self.intern(value) for value in obj]
+            key = (list,) + tuple(self._get_key(value) for value in items)
+            return self._intern_fragment(key, items)
+        return obj
+
+    def get_stats(self) -> Dict:
+        return {
+            "fragments": self.visited,
+            "shared": self.shared,
+            "unique": len(self._fragments),
+            "strings": len(self._strings),
+        }
+
+
+def intern_schema(schema: Dict) -> Dict:
+    """Returns the schema with all equal fragments shared, see `FragmentInterner`"""
+    return FragmentInterner().intern(schema)
@@ -0,0 +1,143 @@
+from contextlib import contextmanager
+from threading import local
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator
+
+from django.utils import translation
+from django.utils.functional import Promise, lazy
+from drf_spectacular.plumbing import (is_trivial_string_variation,
+                                      normalize_result_object)
+
+from drf_spectacular_jsonapi.schemas.cache import SchemaCache, register_cache
+
+_state = local()
+
+
+def is_keeping_lazy_strings() -> bool:
+    """`True` while the structural schema of `generate_localized_schemas` is generated by the current thread"""
+    return getattr(_state, "keep_lazy_strings", False)
+
+
+@contextmanager
+def keep_lazy_strings() -> Iterator[None]:
+    """Generates the structural schema, which is translated into every language afterwards.
+
+    No language is active, and the schema classes of this package keep lazy strings as they are, where
+    drf-spectacular and the converters would translate them right away (field titles and descriptions, path
+    parameter descriptions...). The schema caches are keyed on `get_translation_key`, so lazy schemas are never
+    shared with translated ones.
+    """
+    previous = is_keeping_lazy_strings()
+    _state.keep_lazy_strings = True
+    try:
+        with translation.override(None):
+            yield
+    finally:
+        _state.keep_lazy_strings = previous
+
+
+def get_translation_key() -> Hashable:
+    """Part of every schema cache key, which depends on the translation of the cached schema"""
+    return translation.get_language(), is_keeping_lazy_strings()
+
+
+def _format(message, arguments) -> str:
+    return str(message) % arguments
+
+
+format_lazy = lazy(_format, str)
+
+
+def format_message(message, arguments) -> str:
+    """`message % arguments`, which stays lazy while the structural schema is generated"""
+    if is_keeping_lazy_strings():
+        return format_lazy(message, arguments)
+    return message % arguments
+
+
+def restore_lazy_descriptions(parameters, source) -> None:
+    """Filter backends and paginators of django rest framework translate their lazy `*_description` attributes right
+    away. While the structural schema is generated, the translated parameter descriptions are replaced by these lazy
+    strings again."""
+    if not is_keeping_lazy_strings() or source is None:
+        return
+    descriptions = {}
+    for name in dir(source):
+        value = getattr(source, name, None) if name.endswith("_description") else None
+        if isinstance(value, Promise):
+            descriptions.setdefault(str(value), value)
+    for parameter in parameters:
+        description = parameter.get("description")
+        if isinstance(description, str) and description in descriptions:
+            parameter["description"] = descriptions[description]
+
+
+class FieldTitle(Promise):
+    """Lazy title of a serializer field.
+
+    drf-spectacular omits titles, which are a trivial variation of the field name. Whether the translated title is
+    trivial, depends on the language, so `localize_schema` decides per language if the title is kept.
+    """
+
+    def __init__(self, label: Promise, field_name: str) -> None:
+        self.label = label
+        self.field_name = field_name
+
+    def __str__(self) -> str:
+        return str(self.label)
+
+    def is_trivial(self) -> bool:
+        return is_trivial_string_variation(str(self.label), self.field_name)
+
+
+def drop_trivial_field_titles(obj):
+    """Returns a copy of the structural schema without field titles, which are trivial in the active language"""
+    if isinstance(obj, dict):
+        return {
+            key: drop_trivial_field_titles(value) for key, value in obj.items()
+            if not (isinstance(value, FieldTitle) and value.is_trivial())
+        }
+    if isinstance(obj, (list, tuple)):
+        return [drop_trivial_field_titles(value) for value in obj]
+    return obj
+
+
+def localize_schema(structure: Dict, language: str) -> Dict:
+    """Translates the structural schema into the given language. The lazy strings are forced inside the language
+    and the result is normalized like drf-spectacular normalizes a generated schema."""
+    with translation.override(language):
+        return normalize_result_object(drop_trivial_field_titles(structure))
+
+
+def select_language(request, languages: Iterable[str]) -> str:
+    """Selects the best of the given languages for the request by the `lang` query parameter or the
+    `Accept-Language` header. The first language is the fallback."""
+    languages = list(languages)
+    requested = request.GET.get("lang") or translation.get_language_from_request(request)
+    for candidate in (requested, requested.split("-")[0]):
+        for language in languages:
+            if language.lower() == candidate.lower():
+                return language
+    return languages[0]
+
+
+class LocalizedSchemaCache(SchemaCache):
+    """Localized schemas by generator and languages.
+
+    Only the schemas of the latest fingerprint are kept per key, so changed views or settings replace the outdated
+    schemas instead of adding new ones.
+    """
+
+    def get_or_generate(self, key: Hashable, fingerprint: str, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            cached = self._data.get(key)
+            if cached is not None and cached[0] == fingerprint:
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+            value = factory()
+            self._data[key] = (fingerprint, value)
+            return value
+
+
+localized_schema_cache = register_cache(
+    LocalizedSchemaCache(name="localized_schemas"))
@@ -0,0 +1,111 @@
+import json
+import os
+from contextlib import ExitStack
+from textwrap import dedent
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import translation
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.validation import validate_schema
+
+from drf_spectacular_jsonapi.artifacts import build_schema_artifacts
+from drf_spectacular_jsonapi.postprocessing import optimize_schema
+from drf_spectacular_jsonapi.profiling import profile_schema_memory
+from drf_spectacular_jsonapi.settings import jsonapi_settings
+from drf_spectacular_jsonapi.split import write_split_schema
+from drf_spectacular_jsonapi.tracing import trace_schema_generation
+
+
+class Command(BaseCommand):
+    help = dedent("""
+        Build the json:api schema at deploy time.
+
+        Writes minified json and yaml, gzip precompressed variants of both and a manifest with the content hash
+        of the schema. Serve the artifacts with `drf_spectacular_jsonapi.views.JsonApiSchemaArtifactView`.
+    """)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir', dest="output_dir", default=None, type=str,
+            help='Directory for the artifacts. Defaults to SPECTACULAR_JSONAPI_SETTINGS["SCHEMA_ARTIFACT_DIR"].',
+        )
+        parser.add_argument(
+            '--urlconf', dest="urlconf", default=None, type=str,
+            help='Python dotted path to a URLconf module. Defaults to ROOT_URLCONF.',
+        )
+        parser.add_argument(
+            '--api-version', dest="api_version", default=None, type=str,
+            help='Restrict generation to a specific API version (path/namespace versioning).',
+        )
+        parser.add_argument(
+            '--lang', dest="lang", default=None, type=str,
+            help='Language code for translating verbose name/help text in the schema.',
+        )
+        parser.add_argument(
+            '--prune', dest="prune", default=False, action='store_true',
+            help='Drop all components, which are not reachable from any operation.',
+        )
+        parser.add_argument(
+            '--minify', dest="minify", default=False, action='store_true',
+            help='Strip titles and descriptions for machine consumers.',
+        )
+        parser.add_argument(
+            '--split', dest="split", default=False, action='store_true',
+            help='Also write every schema component into its own content addressed file below OUTPUT_DIR/split.',
+        )
+        parser.add_argument(
+            '--trace', dest="trace", default=None, type=str,
+            help='Write the wall times and call counts of the generation phases as json into this file.',
+        )
+        parser.add_argument(
+            '--profile-memory', dest="profile_memory", default=None, type=str,
+            help='Profile the generation with tracemalloc and write the ranked memory report as json into this file.',
+        )
+        parser.add_argument(
+            '--validate', dest="validate", default=False, action='store_true',
+            help='Validate the generated schema against the OpenAPI JSON Schema.',
+        )
+
+    def handle(self, *args, **options):
+        output_dir = options["output_dir"] or jsonapi_settings.SCHEMA_ARTIFACT_DIR
+        if not output_dir:
+            raise CommandError(
+                'Pass --output-dir or configure SPECTACULAR_JSONAPI_SETTINGS["SCHEMA_ARTIFACT_DIR"].')
+
+        generator = spectacular_settings.DEFAULT_GENERATOR_CLASS(
+            urlconf=options["urlconf"],
+            api_version=options["api_version"],
+        )
+        with ExitStack() as stack:
+            if options["lang"]:
+                stack.enter_context(translation.override(options["lang"]))
+            # only one tracer can be active, the memory profiler also records the wall times
+            if options["profile_memory"]:
+                tracer = stack.enter_context(profile_schema_memory())
+            elif options["trace"]:
+                tracer = stack.enter_context(trace_schema_generation())
+            schema = generator.get_schema(request=None, public=True)
+
+        if options["trace"]:
+            with open(options["trace"], "w") as trace_file:
+                trace_file.write(tracer.to_json())
+        if options["profile_memory"]:
+            with open(options["profile_memory"], "w") as profile_file:
+                json.dump(tracer.get_report(schema=schema), profile_file, indent=2)
+
+        if options["prune"] or options["minify"]:
+            schema, report = optimize_schema(
+                schema, prune=options["prune"], minify=options["minify"])
+            for step in report:
+                self.stdout.write(
+                    f"{step.step}: saved {step.bytes_saved} bytes ({step.bytes_before} -> {step.bytes_after})")
+
+        if options["validate"]:
+            validate_schema(schema)
+
+        manifest = build_schema_artifacts(schema=schema, directory=output_dir)
+        if options["split"]:
+            write_split_schema(
+                schema=schema, directory=os.path.join(output_dir, "split"))
+        self.stdout.write(
+            f"schema {manifest['hash']} written to {output_dir}")
@@ -0,0 +1,253 @@
+import inspect
+import multiprocessing
+import posixpath
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, NamedTuple, Set, Tuple
+
+from django.utils.functional import Promise
+from drf_spectacular.drainage import GENERATOR_STATS, warn
+from drf_spectacular.plumbing import ComponentRegistry, ResolvedComponent
+from drf_spectacular.settings import spectacular_settings
+
+from drf_spectacular_jsonapi.references import (COMPONENT_REF_PREFIX,
+                                                ComponentKey, get_references,
+                                                resolve_references)
+from drf_spectacular_jsonapi.schemas.converters import (
+    JsonApiRelationshipObject, get_variant_component_name)
+
+# generator of the running parallel generation. The worker processes are forked from the generating process, so they
+# inherit the generator with all initialised endpoints and views instead of unpickling them.
+_generator = None
+
+
+class ComponentOrigin(NamedTuple):
+    """Picklable identity of the object a component was resolved from.
+
+    Classes are identified by their qualified name and their id. The id is the same inside all forked workers, cause
+    they share the memory layout of the generating process.
+    """
+    qualname: str
+    identity: Any
+
+
+class MappedChunk(NamedTuple):
+    paths: Dict[str, Dict[str, Any]]
+    components: List[Tuple[str, str, Any, ComponentOrigin]]
+    warnings: Dict[str, int]
+    errors: Dict[str, int]
+    relationships: List[str]
+
+
+def is_parallel_generation_supported() -> bool:
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def get_component_origin(obj) -> ComponentOrigin:
+    if isinstance(obj, ComponentOrigin):
+        return obj
+    if obj is None or isinstance(obj, (str, int, tuple)):
+        return ComponentOrigin(qualname=type(obj).__qualname__, identity=obj)
+    obj_class = obj if inspect.isclass(obj) else obj.__class__
+    return ComponentOrigin(qualname=f"{obj_class.__module__}.{obj_class.__qualname__}", identity=id(obj_class))
+
+
+def get_path_prefix(endpoints) -> str:
+    """Same path prefix estimation as `SchemaGenerator.parse`. It depends on all endpoints, so it can't be done by
+    the workers."""
+    if spectacular_settings.SCHEMA_PATH_PREFIX is None:
+        non_trivial_prefix = len(
+            set([view.__class__ for _, _, _, view in endpoints])) > 1
+        if non_trivial_prefix:
+            path_prefix = posixpath.commonpath(
+                [path for path, _, _, _ in endpoints])
+            path_prefix = re.escape(path_prefix)
+        else:
+            path_prefix = '/'
+    else:
+        path_prefix = spectacular_settings.SCHEMA_PATH_PREFIX
+    if not path_prefix.startswith('^'):
+        path_prefix = '^' + path_prefix
+    return path_prefix
+
+
+def get_chunks(count: int, workers: int) -> List[Tuple[int, int]]:
+    """Splits the endpoints into contiguous chunks. Some more chunks than workers balance uneven endpoints."""
+    chunk_count = min(count, workers * 4) or 1
+    bounds = [index * count // chunk_count
+              for index in range(chunk_count + 1)]
+    return [(start, stop) for start, stop in zip(bounds, bounds[1:]) if stop > start]
+
+
+def _map_chunk(start: int, stop: int) -> MappedChunk:
+    return _generator.map_chunk(start=start, stop=stop)
+
+
+def force_lazy_strings(obj):
+    """Returns a copy of the schema with all lazy strings translated into the active language"""
+    if isinstance(obj, dict):
+        return {key: force_lazy_strings(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [force_lazy_strings(value) for value in obj]
+    if isinstance(obj, tuple):
+        return tuple(force_lazy_strings(value) for value in obj)
+    if isinstance(obj, Promise):
+        return str(obj)
+    return obj
+
+
+def collect_chunk(paths, registry: ComponentRegistry, registered) -> MappedChunk:
+    """Collects the result of a worker in picklable form. Components, which were already registered before the
+    parallel generation started, are skipped.
+
+    Lazy strings are translated, cause every unpickled lazy string creates a new proxy class, which is expensive. The
+    workers generate inside the language of the generating process, so the translations are the same.
+    """
+    return MappedChunk(
+        paths=force_lazy_strings(paths),
+        components=[
+            (component.name, component.type, force_lazy_strings(component.schema),
+             get_component_origin(component.object))
+            for key, component in registry._components.items()
+            if key not in registered
+        ],
+        warnings=dict(GENERATOR_STATS._warn_cache),
+        errors=dict(GENERATOR_STATS._error_cache),
+        relationships=[
+            component.name
+            for key, component in registry._components.items()
+            if key not in registered and is_relationship_component(component)
+        ],
+    )
+
+
+def is_relationship_component(component: ResolvedComponent) -> bool:
+    return inspect.isclass(component.object) and issubclass(component.object, JsonApiRelationshipObject)
+
+
+def rename_references(obj, names: Dict[str, str]):
+    """Returns a copy of the object, where all references to the schema components are renamed"""
+    if isinstance(obj, dict):
+        renamed = {key: rename_references(value, names) for key, value in obj.items()}
+        ref = obj.get("$ref")
+        if isinstance(ref, str) and ref.startswith(f"{COMPONENT_REF_PREFIX}schemas/"):
+            name = ref[len(COMPONENT_REF_PREFIX) + len("schemas/"):]
+            if name in names:
+                renamed["$ref"] = f"{COMPONENT_REF_PREFIX}schemas/{names[name]}"
+        return renamed
+    if isinstance(obj, list):
+        return [rename_references(value, names) for value in obj]
+    return obj
+
+
+def rename_relationship_variants(registry: ComponentRegistry, chunk: MappedChunk) -> MappedChunk:
+    """Renames the relationship components of a worker like the serial generation would have named them.
+
+    A relationship component, which differs from the registered component of the same name, is registered under a
+    variant name (see `JsonApiRelationshipObject.patch_component_reference`). A worker only knows the components of
+    its own chunk, so it may have registered a variant under the plain name, or the other way around. The first
+    registration in endpoint order keeps the plain name, which is the registered component or the first one of the
+    chunk.
+    """
+    relationships = set(chunk.relationships)
+    first_schemas = {}
+    names = {}
+    for name, component_type, schema, _ in chunk.components:
+        if name not in relationships:
+            continue
+        base_name = name[:-6] if name == get_variant_component_name(name[:-6], schema) else name
+        registered = registry._components.get((base_name, component_type))
+        first_schema = registered.schema if registered else first_schemas.setdefault(base_name, schema)
+        if first_schema != schema:
+            names[name] = get_variant_component_name(base_name, schema)
+        else:
+            names[name] = base_name
+        if name == base_name and names[name] != base_name:
+            warn(f'relationship component "{base_name}" is already registered with a different schema. The '
+                 f'relationship is registered as "{names[name]}".')
+    names = {name: renamed for name, renamed in names.items() if name != renamed}
+    if not names:
+        return chunk
+    return chunk._replace(
+        paths=rename_references(chunk.paths, names),
+        components=[
+            (names.get(name, name) if name in relationships else name, component_type,
+             rename_references(schema, names), origin)
+            for name, component_type, schema, origin in chunk.components
+        ],
+    )
+
+
+def map_chunks(generator, chunks, workers: int) -> List[MappedChunk]:
+    """Maps the chunks in forked worker processes. The results are returned in the order of the chunks.
+
+    Only the chunk bounds are passed to the workers. Everything else, like the request, is inherited with the
+    generator, cause it may not be picklable.
+    """
+    global _generator
+    _generator = generator
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as executor:
+            futures = [
+                executor.submit(_map_chunk, start, stop)
+                for start, stop in chunks
+            ]
+            return [future.result() for future in futures]
+    finally:
+        _generator = None
+
+
+def merge_components(registry: ComponentRegistry, components) -> Set[ComponentKey]:
+    """Registers the components of a worker, if they are missing (same semantic as `register_on_missing`).
+
+    Like the serial generation, the first registration of a component wins, also if a later worker mapped another
+    schema for it (the request and response variants of a serializer for example). The later operations reference
+    the component by name only, so they are the same as in the serial generation. Components with the same name, but
+    resolved from different objects, are reported like drf-spectacular does it.
+
+    Returns the keys of the components, which are referenced by discarded schemas only. The serial generation doesn't
+    map a registered component again, so it may not have registered them (see `get_unreferenced_components`).
+    """
+    discarded = set()
+    for name, component_type, schema, origin in components:
+        key = (name, component_type)
+        registered = registry._components.get(key)
+        if registered is None:
+            registry._components[key] = ResolvedComponent(
+                name=name, type=component_type, schema=schema, object=origin)
+            continue
+        if get_component_origin(registered.object) != origin:
+            warn(f'Encountered 2 components with identical names "{name}" and different identities '
+                 f'{registered.object} and {origin.qualname}. This will very likely result in an incorrect schema. '
+                 f'Try renaming one.')
+        if registered.schema != schema:
+            discarded |= get_references(schema) - get_references(registered.schema)
+    return discarded
+
+
+def get_unreferenced_components(registry: ComponentRegistry, paths, keys: Iterable[ComponentKey],
+                                registered) -> List[ComponentKey]:
+    """Returns the given component keys, which are neither referenced by the paths nor by any referenced component
+    or a component registered before the parallel generation. Those are registered by the parallel generation
+    only."""
+    def get_component_references(key):
+        component = registry._components.get(key)
+        return get_references(component.schema) if component else frozenset()
+
+    referenced = resolve_references(get_references(paths) | set(registered), get_component_references)
+    return sorted(key for key in keys if key in registry._components and key not in referenced)
+
+
+def merge_paths(paths: Dict[str, Dict[str, Any]], chunk_paths: Dict[str, Dict[str, Any]]) -> None:
+    for path, operations in chunk_paths.items():
+        paths.setdefault(path, {}).update(operations)
+
+
+def merge_generator_stats(warnings: Dict[str, int], errors: Dict[str, int]) -> None:
+    """Replays the warnings and errors of a worker, like they would have been emitted by the generating process"""
+    for messages, cache in ((warnings, GENERATOR_STATS._warn_cache), (errors, GENERATOR_STATS._error_cache)):
+        for message, count in messages.items():
+            if not GENERATOR_STATS.silent and message not in cache:
+                print(message, file=sys.stderr)
+            cache[message] += count
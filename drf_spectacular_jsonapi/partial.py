@@ -0,0 +1,45 @@
+from typing import FrozenSet, Iterable, List, Optional, Union
+
+from drf_spectacular.openapi import AutoSchema
+
+
+class ExcludedOperationSchema(AutoSchema):
+    """Excludes the operation from the schema, like a `@extend_schema(exclude=True)` decorated view"""
+
+    def get_operation(self, path, path_regex, path_prefix, method, registry):
+        return None
+
+
+def parse_resources(resources: Optional[Union[str, Iterable[str]]]) -> Optional[FrozenSet[str]]:
+    """Returns the normalized resource types or tags of a comma separated string or an iterable. Matching is case
+    insensitive, so `album` and `Album` select the same operations."""
+    if resources is None:
+        return None
+    if isinstance(resources, str):
+        resources = resources.split(",")
+    return frozenset(resource.strip().lower() for resource in resources if resource.strip()) or None
+
+
+def get_operation_tags(path: str, path_regex: str, path_prefix: str, method: str, view) -> List[str]:
+    """Returns the tags of the operation without mapping it. The tags of `JsonApiAutoSchema` are the resource types."""
+    schema = view.schema
+    schema.path = path
+    schema.path_regex = path_regex
+    schema.path_prefix = path_prefix
+    schema.method = method.upper()
+    return schema.get_tags()
+
+
+def exclude_other_resources(endpoints, resources: FrozenSet[str], path_prefix: str):
+    """Excludes the operations of all endpoints, which are not tagged with one of the resources.
+
+    The excluded endpoints stay inside the endpoint list, so the path prefix estimation and thereby the operation ids
+    are the same as for the full schema.
+    """
+    for path, path_regex, method, view in endpoints:
+        if not isinstance(view.schema, AutoSchema):
+            continue
+        tags = get_operation_tags(path, path_regex, path_prefix, method, view)
+        if not any(str(tag).lower() in resources for tag in tags):
+            view.schema = ExcludedOperationSchema()
+    return endpoints
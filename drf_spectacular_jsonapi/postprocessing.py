@@ -0,0 +1,124 @@
+import json
+from typing import Dict, List, NamedTuple, Tuple
+
+from django.utils.functional import Promise
+
+from drf_spectacular_jsonapi.references import (ComponentKey, get_references,
+                                                resolve_references)
+
+# metadata for humans, which is not needed by machine consumers like client generators
+METADATA_KEYS = ("title", "description")
+
+# values of these keys are data (examples, defaults...) and not part of the schema structure
+DATA_KEYS = ("default", "example", "examples", "enum", "const")
+
+
+class SizeReportStep(NamedTuple):
+    """Size of the schema before and after one optimization step, as minified json in bytes"""
+    step: str
+    bytes_before: int
+    bytes_after: int
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+
+def get_schema_size(schema: Dict, indent=None) -> int:
+    separators = (",", ":") if indent is None else (",", ": ")
+    return len(json.dumps(schema, indent=indent, separators=separators, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def get_reachable_components(schema: Dict) -> set:
+    """Returns the keys of all components, which are reachable from the operations or the root security requirements"""
+    components = schema.get("components", {})
+
+    def get_component_references(key: ComponentKey):
+        name, component_type = key
+        component = components.get(component_type, {}).get(name)
+        return get_references(component) if component is not None else ()
+
+    roots = get_references({
+        "paths": schema.get("paths", {}),
+        "webhooks": schema.get("webhooks", {}),
+        "security": schema.get("security", []),
+    })
+    return resolve_references(roots, get_component_references)
+
+
+def prune_unreachable_components(schema: Dict) -> Dict:
+    """Returns the schema without components, which are not reachable by `$ref` from any operation.
+
+    Wrapper components like `...Response` or `...Request` variants and enums, which are not referenced anymore, are
+    dropped. Empty component sections are removed.
+    """
+    if "components" not in schema:
+        return schema
+    reachable = get_reachable_components(schema)
+    components = {}
+    for component_type, section in schema["components"].items():
+        kept = {name: component for name, component in section.items()
+                if (name, component_type) in reachable}
+        if kept:
+            components[component_type] = kept
+    pruned = {key: value for key, value in schema.items()
+              if key != "components"}
+    if components:
+        pruned["components"] = components
+    return pruned
+
+
+def _strip_metadata(obj, in_responses: bool = False):
+    if isinstance(obj, dict):
+        stripped = {}
+        for key, value in obj.items():
+            if key in METADATA_KEYS and isinstance(value, (str, Promise)):
+                # property names like `title` are dict valued and not stripped
+                continue
+            if key in DATA_KEYS or str(key).startswith("x-"):
+                stripped[key] = value
+            elif key == "responses":
+                stripped[key] = {code: _strip_metadata(response, in_responses=True)
+                                 for code, response in value.items()} if isinstance(value, dict) else value
+            else:
+                stripped[key] = _strip_metadata(value)
+        if in_responses and "$ref" not in stripped:
+            # the description of response objects is required by the openapi specification
+            stripped["description"] = ""
+        return stripped
+    if isinstance(obj, list):
+        return [_strip_metadata(item) for item in obj]
+    return obj
+
+
+def strip_metadata(schema: Dict) -> Dict:
+    """Returns the schema without titles and descriptions for machine consumers.
+
+    The `info` object is kept as it is, cause its title is required. Descriptions of response objects are required as
+    well, so they are emptied instead.
+    """
+    return {key: value if key == "info" else _strip_metadata(value) for key, value in schema.items()}
+
+
+def optimize_schema(schema: Dict, prune: bool = True, minify: bool = False) -> Tuple[Dict, List[SizeReportStep]]:
+    """Applies the optimization steps and reports the bytes saved by every step.
+
+    The first step is the indentation, which is saved by rendering minified json (like the `build_jsonapi_schema`
+    command does) instead of indented json.
+    """
+    size = get_schema_size(schema)
+    report = [SizeReportStep(step="indentation", bytes_before=get_schema_size(
+        schema, indent=4), bytes_after=size)]
+    steps = []
+    if prune:
+        steps.append(("prune_unreachable_components",
+                     prune_unreachable_components))
+    if minify:
+        steps.append(("strip_metadata", strip_metadata))
+    for step, optimize in steps:
+        schema = optimize(schema)
+        optimized_size = get_schema_size(schema)
+        report.append(SizeReportStep(
+            step=step, bytes_before=size, bytes_after=optimized_size))
+        size = optimized_size
+    return schema, report
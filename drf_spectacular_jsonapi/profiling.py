@@ -0,0 +1,194 @@
+import hashlib
+import json
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from threading import local
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from drf_spectacular_jsonapi.tracing import (InMemoryTracer,
+                                             trace_schema_generation)
+
+# only allocations inside of these packages are ranked as allocation sites
+PROFILED_PACKAGES = ("drf_spectacular_jsonapi", "drf_spectacular",
+                     "rest_framework_json_api", "rest_framework")
+
+
+def get_deep_size(obj, seen: Optional[set] = None) -> int:
+    """Returns the memory size of the object including all dicts, lists and values it contains"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(get_deep_size(key, seen) + get_deep_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(get_deep_size(item, seen) for item in obj)
+    return size
+
+
+def rank_components(schema: Dict, top: int = 25) -> List[Dict]:
+    """Ranks the components of the schema by their memory size"""
+    ranked = [
+        {"component": f"{component_type}/{name}", "size": get_deep_size(component)}
+        for component_type, section in schema.get("components", {}).items()
+        for name, component in section.items()
+    ]
+    return sorted(ranked, key=lambda item: item["size"], reverse=True)[:top]
+
+
+def rank_duplicated_fragments(schema: Dict, min_size: int = 256, top: int = 25) -> List[Dict]:
+    """Ranks fragments (objects and arrays), which occur multiple times inside the schema, by the bytes wasted by
+    their copies. The size of a fragment is the size of its minified json.
+
+    The fragments are identified by a digest of their minified json, which is built bottom-up from the digests of
+    their children, so every node of the schema is serialized once only.
+    """
+    fragments: Dict[bytes, Dict] = {}
+    visited = [0]
+
+    def visit(obj, pointer: str) -> Tuple[bytes, int]:
+        """Returns the digest and the minified json size of the object"""
+        if isinstance(obj, dict):
+            items = obj.items()
+        elif isinstance(obj, (list, tuple)):
+            items = enumerate(obj)
+        else:
+            content = json.dumps(obj, default=str)
+            return hashlib.sha1(content.encode("utf-8")).digest(), len(content)
+        order = visited[0]
+        visited[0] += 1
+        children = [(child_key, *visit(value, f"{pointer}/{child_key}")) for child_key, value in items]
+        size = 2 + max(len(children) - 1, 0) + sum(child_size for _, _, child_size in children)
+        if isinstance(obj, dict):
+            digest = hashlib.sha1(b"{")
+            for child_key, child_digest, _ in sorted(children, key=lambda child: child[0]):
+                name = json.dumps(child_key)
+                digest.update(name.encode("utf-8"))
+                digest.update(child_digest)
+                size += len(name) + 1
+            digest.update(b"}")
+        else:
+            digest = hashlib.sha1(b"[")
+            for _, child_digest, _ in children:
+                digest.update(child_digest)
+            digest.update(b"]")
+        key = digest.digest()
+        if size >= min_size and not isinstance(obj, tuple):
+            fragment = fragments.get(key)
+            if fragment is None:
+                fragments[key] = {"pointer": pointer, "size": size, "count": 1, "order": order}
+            else:
+                fragment["count"] += 1
+        return key, size
+
+    visit(schema, "#")
+    duplicated = [
+        {"pointer": fragment["pointer"], "size": fragment["size"], "count": fragment["count"],
+         "wasted": fragment["size"] * (fragment["count"] - 1)}
+        for fragment in sorted(fragments.values(), key=lambda item: item["order"]) if fragment["count"] > 1
+    ]
+    return sorted(duplicated, key=lambda item: item["wasted"], reverse=True)[:top]
+
+
+class MemoryProfilingTracer(InMemoryTracer):
+    """Records the memory retained by every traced phase additionally to the wall times.
+
+    The retained memory of a call is the difference of the memory traced by `tracemalloc` after and before the call.
+    Like the durations, it is inclusive and attributed to the phase, the endpoint and the serializer of the call.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._stacks = local()
+        self.allocation_sites: List[Dict] = []
+
+    def _get_stack(self) -> List[int]:
+        stack = getattr(self._stacks, "stack", None)
+        if stack is None:
+            stack = self._stacks.stack = []
+        return stack
+
+    def start(self, phase: str) -> None:
+        self._get_stack().append(tracemalloc.get_traced_memory()[0])
+
+    @staticmethod
+    def _add_retained(stats: Dict[str, Dict], phase: str, retained: int) -> None:
+        phase_stats = stats[phase]
+        phase_stats["retained"] = phase_stats.get("retained", 0) + retained
+
+    def record(self, phase: str, duration: float, endpoint: Optional[str] = None,
+               serializer: Optional[str] = None) -> None:
+        stack = self._get_stack()
+        retained = tracemalloc.get_traced_memory()[0] - stack.pop() if stack else 0
+        super().record(phase, duration, endpoint=endpoint, serializer=serializer)
+        with self._lock:
+            self._add_retained(self.phases, phase, retained)
+            if endpoint:
+                self._add_retained(self.endpoints[endpoint], phase, retained)
+            if serializer:
+                self._add_retained(
+                    self.serializers[serializer], phase, retained)
+
+    def set_allocation_sites(self, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, top: int = 25) -> None:
+        """Ranks the source lines of the profiled packages by the memory they allocated between both snapshots"""
+        filters = [tracemalloc.Filter(True, f"*/{package}/*")
+                   for package in PROFILED_PACKAGES]
+        statistics = after.filter_traces(filters).compare_to(
+            before.filter_traces(filters), "lineno")
+        self.allocation_sites = [
+            {
+                "site": f"{statistic.traceback[0].filename}:{statistic.traceback[0].lineno}",
+                "size": statistic.size_diff,
+                "count": statistic.count_diff,
+            }
+            for statistic in statistics if statistic.size_diff > 0
+        ][:top]
+
+    def get_report(self, schema: Optional[Dict] = None, top: int = 25) -> Dict:
+        """Returns the ranked report. If the generated schema is passed, its components and duplicated fragments are
+        ranked as well."""
+        recorded = self.as_dict()
+
+        def rank(stats: Dict[str, Dict[str, Dict]], name: str) -> List[Dict]:
+            ranked = [
+                {name: key, "phase": phase, "retained": phase_stats.get("retained", 0),
+                 "count": phase_stats["count"], "total": phase_stats["total"]}
+                for key, phases in stats.items() for phase, phase_stats in phases.items()
+            ]
+            return sorted(ranked, key=lambda item: item["retained"], reverse=True)[:top]
+
+        report = {
+            "phases": rank({"all": recorded["phases"]}, "scope"),
+            "endpoints": rank(recorded["endpoints"], "endpoint"),
+            "serializers": rank(recorded["serializers"], "serializer"),
+            "allocation_sites": self.allocation_sites[:top],
+        }
+        if schema is not None:
+            report["components"] = rank_components(schema, top=top)
+            report["duplicated_fragments"] = rank_duplicated_fragments(
+                schema, top=top)
+        return report
+
+
+@contextmanager
+def profile_schema_memory(frames: int = 1) -> Iterator[MemoryProfilingTracer]:
+    """Profiles the memory of all schema generations inside the block.
+
+    `tracemalloc` is started with `frames` frames per traceback, if it is not tracing already. Snapshots before and
+    after the block rank the allocating source lines. Inside the block every traced phase records its retained
+    memory, see `MemoryProfilingTracer`.
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(frames)
+    tracer = MemoryProfilingTracer()
+    try:
+        before = tracemalloc.take_snapshot()
+        with trace_schema_generation(tracer):
+            yield tracer
+        tracer.set_allocation_sites(before, tracemalloc.take_snapshot())
+    finally:
+        if started:
+            tracemalloc.stop()
@@ -0,0 +1,58 @@
+from typing import Callable, FrozenSet, Iterable, Optional, Set, Tuple
+
+COMPONENT_REF_PREFIX = "#/components/"
+
+# components are identified by `(name, type)` like inside the `ComponentRegistry` of drf-spectacular
+ComponentKey = Tuple[str, str]
+
+
+def parse_component_ref(ref) -> Optional[ComponentKey]:
+    """Returns the component key of a local component reference like `#/components/schemas/Album`"""
+    if not isinstance(ref, str) or not ref.startswith(COMPONENT_REF_PREFIX):
+        return None
+    component_type, _, name = ref[len(COMPONENT_REF_PREFIX):].partition("/")
+    return name, component_type
+
+
+def get_references(obj) -> FrozenSet[ComponentKey]:
+    """Returns the keys of all components, which are referenced by the object directly.
+
+    Security schemes are referenced by name inside the `security` requirements of the operations, discriminators
+    reference components by plain strings inside their `mapping`.
+    """
+    references = set()
+    pending = [obj]
+    while pending:
+        current = pending.pop()
+        if isinstance(current, dict):
+            refs = [current.get("$ref")]
+            discriminator = current.get("discriminator")
+            if isinstance(discriminator, dict) and isinstance(discriminator.get("mapping"), dict):
+                refs.extend(discriminator["mapping"].values())
+            for ref in refs:
+                key = parse_component_ref(ref)
+                if key:
+                    references.add(key)
+            security = current.get("security")
+            if isinstance(security, list):
+                for requirement in security:
+                    if isinstance(requirement, dict):
+                        references.update(
+                            (name, "securitySchemes") for name in requirement)
+            pending.extend(current.values())
+        elif isinstance(current, (list, tuple)):
+            pending.extend(current)
+    return frozenset(references)
+
+
+def resolve_references(references: Iterable[ComponentKey],
+                       get_component_references: Callable[[ComponentKey], FrozenSet[ComponentKey]]) -> Set[ComponentKey]:
+    """Returns the given component keys together with all keys, which are referenced by them transitively"""
+    resolved = set()
+    pending = list(references)
+    while pending:
+        key = pending.pop()
+        if key not in resolved:
+            resolved.add(key)
+            pending.extend(get_component_references(key))
+    return resolved
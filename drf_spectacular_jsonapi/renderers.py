@@ -0,0 +1,44 @@
+import hashlib
+import json
+from typing import Any, Dict
+
+# json:api keywords, which are lists with set semantics. Their order carries no meaning.
+UNORDERED_LIST_KEYWORDS = ("enum", "required", "oneOf", "anyOf")
+
+
+def _canonical_sort_key(item: Any) -> str:
+    return json.dumps(item, sort_keys=True, default=str)
+
+
+def canonicalize_schema(schema: Any) -> Any:
+    """Returns a copy of the schema, where all lists with set semantics are sorted.
+
+    Mappings keep their order, which is derived from the url conf and the declared serializer fields.
+    """
+    if isinstance(schema, dict):
+        canonical = {}
+        for key, value in schema.items():
+            value = canonicalize_schema(value)
+            if key in UNORDERED_LIST_KEYWORDS and isinstance(value, list):
+                value = sorted(value, key=_canonical_sort_key)
+            canonical[key] = value
+        return canonical
+    if isinstance(schema, (list, tuple)):
+        return [canonicalize_schema(item) for item in schema]
+    return schema
+
+
+def render_canonical_json(schema: Dict) -> bytes:
+    """Renders the schema as minified json with sorted keys, which is byte stable for equal schemas"""
+    return json.dumps(
+        schema,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str
+    ).encode("utf-8")
+
+
+def get_schema_hash(schema: Dict) -> str:
+    """Returns the sha256 content hash of the schema. It only changes if the schema content changes."""
+    return hashlib.sha256(render_canonical_json(schema)).hexdigest()
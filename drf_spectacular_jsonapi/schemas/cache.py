@@ -0,0 +1,227 @@
+from itertools import islice
+from threading import RLock
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from django.core.signals import setting_changed
+from drf_spectacular.plumbing import ComponentRegistry, ResolvedComponent
+
+from drf_spectacular_jsonapi.references import (ComponentKey,
+                                                parse_component_ref)
+
+
+class SchemaCache:
+    """Thread safe memoization store with hit and miss counters.
+
+    All schema caches of this package are process wide. They are keyed on classes and never on instances, so a new
+    or reloaded class will always result in a cache miss. Every cache is cleared if django settings are changed
+    (`setting_changed` signal) or by calling `drf_spectacular_jsonapi.schemas.cache.clear_caches`.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._data = {}
+        self._lock = RLock()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Returns the cached value for the given key. The value is calculated by the given factory on a miss."""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                value = self._data[key] = factory()
+            else:
+                self.hits += 1
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def copy_schema(schema, references: Optional[Set[ComponentKey]] = None):
+    """Copies the dicts and lists of a schema. All other values (strings, lazy strings, numbers...) are immutable and
+    shared, so it is much cheaper than `deepcopy`.
+
+    If a `references` set is given, the keys of all components referenced by `$ref` or a discriminator mapping are
+    collected into it within the same pass.
+    """
+    if isinstance(schema, dict):
+        if references is not None:
+            key = parse_component_ref(schema.get("$ref"))
+            if key:
+                references.add(key)
+            discriminator = schema.get("discriminator")
+            if isinstance(discriminator, dict) and isinstance(discriminator.get("mapping"), dict):
+                references.update(filter(None, map(parse_component_ref, discriminator["mapping"].values())))
+        return {key: copy_schema(value, references) for key, value in schema.items()}
+    if isinstance(schema, list):
+        return [copy_schema(value, references) for value in schema]
+    if isinstance(schema, tuple):
+        return tuple(copy_schema(value, references) for value in schema)
+    return schema
+
+
+class MappedSchema:
+    """Memoized result of a schema mapping together with all components, which it references."""
+
+    def __init__(self, schema: Dict, components: List[ResolvedComponent]) -> None:
+        self.schema = schema
+        self.components = components
+
+
+class ResourceObjectCache(SchemaCache):
+    """Memoizes converted json:api resource object schemas.
+
+    drf_spectacular may register components while mapping serializer fields (nested serializers for example). All
+    components, which the mapped schema references (directly or through other components), are recorded on a miss and
+    registered again in the registry of the current schema generation on every hit. That includes components, which
+    were already registered by an earlier mapping of the same generation.
+
+    The mapped schema is stored as it is and the caller gets a copy, cause postprocessing hooks mutate the schemas of
+    the generation. Components are snapshotted the same way. Copies only copy dicts and lists (`copy_schema`).
+    """
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name=name)
+        # snapshots of the recorded components by component key and schema identity. Components are shared by many
+        # mappings of the same generation, so every component is only copied and scanned for references once. The
+        # snapshot keeps the original schema, so its id is not reused.
+        self._snapshots: Dict[Tuple, Tuple[ResolvedComponent, frozenset, Dict]] = {}
+
+    def clear(self) -> None:
+        with self._lock:
+            super().clear()
+            self._snapshots.clear()
+
+    def get_snapshot(self, component: ResolvedComponent) -> Tuple[ResolvedComponent, frozenset]:
+        """Returns a copy of the registered component together with the keys of the components it references"""
+        snapshot_key = (component.key, id(component.schema))
+        snapshot = self._snapshots.get(snapshot_key)
+        if snapshot is None:
+            references = set()
+            schema = copy_schema(component.schema, references)
+            snapshot = self._snapshots[snapshot_key] = (
+                ResolvedComponent(name=component.name, type=component.type, schema=schema, object=component.object),
+                frozenset(references),
+                component.schema,
+            )
+        return snapshot[0], snapshot[1]
+
+    def get_referenced_components(self, references, registry: ComponentRegistry,
+                                  new_keys) -> Optional[List[ResolvedComponent]]:
+        """Returns snapshots of the registered components, which are referenced transitively by the given component
+        keys, together with the components registered while mapping, in registration order. Returns `None`, if a
+        component is not completely mapped yet (recursive serializers)."""
+        registered = registry._components
+        snapshots = {}
+        pending = list(references) + new_keys
+        while pending:
+            component_key = pending.pop()
+            if component_key in snapshots:
+                continue
+            component = registered.get(component_key)
+            if component is None:
+                continue
+            if component.schema is None:
+                return None
+            snapshots[component_key], references = self.get_snapshot(component)
+            pending.extend(references)
+        return [snapshots[component_key] for component_key in registered if component_key in snapshots]
+
+    def get_or_map(self, key: Hashable, registry: ComponentRegistry, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            mapped = self._data.get(key)
+            if mapped is not None:
+                self.hits += 1
+                for component in mapped.components:
+                    registry.register_on_missing(ResolvedComponent(
+                        name=component.name,
+                        type=component.type,
+                        schema=copy_schema(component.schema),
+                        object=component.object
+                    ))
+                return copy_schema(mapped.schema)
+            self.misses += 1
+
+        registered_count = len(registry._components)
+        schema = factory()
+        # the registry only grows, so the components registered while mapping are the last ones
+        new_keys = list(islice(registry._components, registered_count, None))
+        # the caller gets the copy, the references are collected while copying
+        references = set()
+        copied = copy_schema(schema, references)
+        with self._lock:
+            components = self.get_referenced_components(references=references, registry=registry, new_keys=new_keys)
+            if components is None:
+                # a snapshot of a not completely mapped component would be broken, so this result is not memoized
+                return copied
+            self._data[key] = MappedSchema(schema=schema, components=components)
+        return copied
+
+
+_caches: Dict[str, SchemaCache] = {}
+
+
+def register_cache(cache: SchemaCache) -> SchemaCache:
+    _caches[cache.name] = cache
+    return cache
+
+
+def clear_caches() -> None:
+    """Clears all schema caches of this package. Call it after mutating serializer, view or model classes at runtime.
+
+    The warmed up schema is forgotten too, a running warm-up is started again by the next schema request.
+    """
+    from drf_spectacular_jsonapi.warmup import invalidate_schema_warmup
+
+    for cache in _caches.values():
+        cache.clear()
+    invalidate_schema_warmup()
+
+
+def reset_cache_stats() -> None:
+    for cache in _caches.values():
+        cache.reset_stats()
+
+
+def get_cache_stats() -> Dict[str, Dict]:
+    """Returns the hit and miss counters of all schema caches by cache name"""
+    return {name: cache.get_stats() for name, cache in _caches.items()}
+
+
+def _clear_caches_on_setting_changed(*args, **kwargs):
+    clear_caches()
+
+
+setting_changed.connect(_clear_caches_on_setting_changed)
+
+
+resource_object_cache = register_cache(
+    ResourceObjectCache(name="resource_objects"))
+
+filter_parameter_cache = register_cache(
+    ResourceObjectCache(name="filter_parameters"))
@@ -1,26 +1,62 @@
-from typing import Dict
+import hashlib
+import json
+from typing import Callable, Dict, Optional
 
 from django.utils.translation import gettext_lazy as _
+from drf_spectacular.drainage import warn
+from drf_spectacular.plumbing import (ComponentRegistry, ResolvedComponent,
+                                      safe_ref)
 from rest_framework.fields import Field
-from rest_framework_json_api.serializers import (HiddenField,
-                                                 HyperlinkedIdentityField,
-                                                 ManyRelatedField,
-                                                 ModelSerializer, RelatedField)
-from rest_framework_json_api.utils import (format_field_name,
-                                           get_related_resource_type,
+from rest_framework_json_api.serializers import (ManyRelatedField,
+                                                 ModelSerializer)
+from rest_framework_json_api.utils import (get_related_resource_type,
                                            get_resource_type_from_serializer)
 
+from drf_spectacular_jsonapi.interning import gettext_once
+from drf_spectacular_jsonapi.localization import format_message
+from drf_spectacular_jsonapi.schemas.introspection import \
+    get_serializer_field_index
 from drf_spectacular_jsonapi.schemas.plumbing import build_json_api_data_frame
-from drf_spectacular_jsonapi.schemas.utils import get_primary_key_of_serializer
+from drf_spectacular_jsonapi.schemas.utils import is_id_required_for_method
+from drf_spectacular_jsonapi.settings import jsonapi_settings
+
+# metadata, which is part of every resource object and relationship. The strings are translated once per language by
+# `gettext_once`, so all schemas share the same string objects.
+RESOURCE_TYPE_TITLE = _("Resource Type Name")
+RESOURCE_TYPE_DESCRIPTION = _(
+    "The [type](https://jsonapi.org/format/#document-resource-object-identification) member is used to describe resource objects that share common attributes and relationships.")
+RELATED_ID_TITLE = _("Resource Identifier")
+RELATED_ID_DESCRIPTION = _("The identifier of the related object.")
+
+
+def get_variant_component_name(name: str, schema: Dict) -> str:
+    """Name of a relationship component, which differs from the registered component of the same name. The suffix
+    is derived from the schema, so the same variant always gets the same name."""
+    content = json.dumps(schema, sort_keys=True, default=str)
+    return f"{name}{hashlib.sha256(content.encode('utf-8')).hexdigest()[:6].capitalize()}"
 
 
 class JsonApiRelationshipObject:
     """Converter class to convert drf_spectacular schema of related fields as json:api specific related field schema"""
 
-    def __init__(self, field: Field, drf_spectactular_field_schema: Dict) -> None:
+    # metadata of the discovered field schema, which describes the relationship and not the `id` of the related object
+    relationship_metadata_keys = ("description", "title", "readOnly", "nullable")
+
+    def __init__(
+        self,
+        field: Field,
+        drf_spectactular_field_schema: Dict,
+        related_resource_type: Optional[str] = None,
+        many: Optional[bool] = None,
+        registry: Optional[ComponentRegistry] = None
+    ) -> None:
         self.field = field
         self.drf_spectacular_field_schema = drf_spectactular_field_schema
-        self.related_resource_type = get_related_resource_type(self.field)
+        self.registry = registry
+        self.related_resource_type = related_resource_type or get_related_resource_type(
+            self.field)
+        self.many = isinstance(
+            self.field, ManyRelatedField) if many is None else many
         self._schema = {
             "type": "object",
             "properties": {
@@ -33,44 +69,47 @@ class JsonApiRelationshipObject:
         self.patch()
 
     def get_id_title(self):
-        return _("Resource Identifier")
+        return gettext_once(RELATED_ID_TITLE)
 
     def get_id_description(self):
-        return _("The identifier of the related object.")
+        return gettext_once(RELATED_ID_DESCRIPTION)
 
     def patch_id_metadata(self):
         self._schema["properties"]["id"]["title"] = self.get_id_title()
         self._schema["properties"]["id"]["description"] = self.get_id_description()
 
     def get_default_relation_description(self):
-        return _("A related resource object from type %(type)s") % {"type": self.related_resource_type}
+        return format_message(_("A related resource object from type %(type)s"), {"type": self.related_resource_type})
 
     def get_default_relation_title(self):
         return self.related_resource_type
 
     def patch_id(self) -> None:
-        """"""
+        """Builds the `id` schema from the discovered field schema and moves the field metadata to the relationship.
+
+        The discovered field schema is never changed, cause it may be shared with other schemas.
+        """
         # drf_spectacular still discovered the related id schema, but with all information of the serializer field
         # we need to move the metadata information on a higher level to describe the relation and not the data
-        self._schema["properties"]["id"] = self.drf_spectacular_field_schema[
-            "items"] if self.drf_spectacular_field_schema["type"] == "array" else self.drf_spectacular_field_schema
+        field_schema = self.drf_spectacular_field_schema
+        if field_schema.get("type") == "array":
+            self._schema["properties"]["id"] = dict(field_schema["items"])
+        else:
+            self._schema["properties"]["id"] = {
+                key: value for key, value in field_schema.items() if key not in self.relationship_metadata_keys}
         self.patch_id_metadata()
 
-        self._schema_meta.update({"description": self.drf_spectacular_field_schema.pop(
+        self._schema_meta.update({"description": field_schema.get(
             "description", self.get_default_relation_description())})
-        self._schema_meta.update({"title": self.drf_spectacular_field_schema.pop(
+        self._schema_meta.update({"title": field_schema.get(
             "title", self.get_default_relation_title())})
 
         if self.field.label:
             self._schema_meta.update({"title": self.field.label})
 
-        if "readOnly" in self.drf_spectacular_field_schema:
-            self._schema_meta.update(
-                {"readOnly": self.drf_spectacular_field_schema.pop("readOnly")})
-
-        if "nullable" in self.drf_spectacular_field_schema:
-            self._schema_meta.update(
-                {"nullable": self.drf_spectacular_field_schema.pop("nullable")})
+        for key in ("readOnly", "nullable"):
+            if key in field_schema:
+                self._schema_meta.update({key: field_schema[key]})
 
     def patch_type_enum(self) -> None:
         """Resolve the resource type of the serializer and sets the type enum of the resource object schema"""
@@ -78,10 +117,10 @@ class JsonApiRelationshipObject:
             {"enum": [self.related_resource_type]})
 
     def get_type_title(self):
-        return _("Resource Type Name")
+        return gettext_once(RESOURCE_TYPE_TITLE)
 
     def get_type_description(self):
-        return _("The [type](https://jsonapi.org/format/#document-resource-object-identification) member is used to describe resource objects that share common attributes and relationships.")
+        return gettext_once(RESOURCE_TYPE_DESCRIPTION)
 
     def patch_type_metadata(self):
         self._schema["properties"]["type"]["title"] = self.get_type_title()
@@ -94,11 +133,43 @@ class JsonApiRelationshipObject:
     def patch_root_metadata(self) -> None:
         self._schema = self._schema | self._schema_meta
 
+    def get_component_name(self) -> str:
+        return f"{self.related_resource_type}RelationshipToMany" if self.many else f"{self.related_resource_type}RelationshipToOne"
+
+    def get_variant_component_name(self, name: str) -> str:
+        return get_variant_component_name(name, self._schema)
+
+    def patch_component_reference(self) -> None:
+        """Registers the relationship schema as shared component and references it.
+
+        The field specific metadata stays at the reference site. If a component with the same name but a different
+        schema is already registered, the relationship schema is registered under a variant name.
+        """
+        name = self.get_component_name()
+        component = ResolvedComponent(
+            name=name,
+            type=ResolvedComponent.SCHEMA,
+            schema=self._schema,
+            object=self.__class__,
+        )
+        if component in self.registry and self.registry[component].schema != self._schema:
+            component = ResolvedComponent(
+                name=self.get_variant_component_name(name),
+                type=ResolvedComponent.SCHEMA,
+                schema=self._schema,
+                object=self.__class__,
+            )
+            warn(f'relationship component "{name}" is already registered with a different schema. The relationship '
+                 f'of field "{self.field.field_name}" is registered as "{component.name}".')
+        if component not in self.registry:
+            self.registry.register(component)
+        self._schema = component.ref
+
     def patch(self) -> None:
         self.patch_id()
         self.patch_type()
 
-        if isinstance(self.field, ManyRelatedField):
+        if self.many:
             self._schema = {
                 "type": "array",
                 "items": self._schema
@@ -106,21 +177,40 @@ class JsonApiRelationshipObject:
 
         self._schema = build_json_api_data_frame(self._schema)
 
-        self.patch_root_metadata()
+        if self.registry is not None and jsonapi_settings.RELATIONSHIP_COMPONENTS:
+            self.patch_component_reference()
+            self._schema = safe_ref(self._schema | self._schema_meta)
+        else:
+            self.patch_root_metadata()
 
     def __dict__(self):
         return self._schema
 
 
 class JsonApiResourceObject:
-    """Converter class for convertig drf_spectaclar schema to specific json:api resource object schema"""
+    """Converter class for convertig drf_spectaclar schema to specific json:api resource object schema
+
+    The resource object is build in a single pass over the serializer fields. Each field schema is requested from the
+    passed `field_mapper` callable, which shall return the drf_spectacular schema of the field or `None` if the field
+    shall be skipped. For backward compatibility a complete drf_spectacular object schema can be passed as
+    `drf_spectactular_schema` instead.
+    """
 
     related_field_converter_class = JsonApiRelationshipObject
 
-    def __init__(self, serializer: ModelSerializer, drf_spectactular_schema: Dict, method: str) -> None:
+    def __init__(
+        self,
+        serializer: ModelSerializer,
+        drf_spectactular_schema: Optional[Dict] = None,
+        method: str = None,
+        field_mapper: Optional[Callable[[Field], Optional[Dict]]] = None,
+        registry: Optional[ComponentRegistry] = None
+    ) -> None:
         self.serializer = serializer
         self.drf_spectacular_schema = drf_spectactular_schema
         self.method = method
+        self.field_mapper = field_mapper
+        self.registry = registry
 
         self._schema = {
             "type": "object",
@@ -129,7 +219,7 @@ class JsonApiResourceObject:
             "properties": {
                 "type": {
                     "type": "string",
-                    "description": _("The [type](https://jsonapi.org/format/#document-resource-object-identification) member is used to describe resource objects that share common attributes and relationships."),
+                    "description": gettext_once(RESOURCE_TYPE_DESCRIPTION),
                 },
                 # TODO:
                 # "links": {
@@ -138,8 +228,9 @@ class JsonApiResourceObject:
                 # },
             },
         }
-        self.pk_name = get_primary_key_of_serializer(
+        self.field_index = get_serializer_field_index(
             serializer=self.serializer)
+        self.pk_name = self.field_index.pk_name
 
         self.patch()
 
@@ -151,6 +242,15 @@ class JsonApiResourceObject:
     def get_related_field_converter_class(self):
         return self.related_field_converter_class
 
+    def map_field(self, field: Field) -> Optional[Dict]:
+        """Returns the drf_spectacular schema of the given serializer field or `None` if the field shall be skipped."""
+        if self.field_mapper:
+            return self.field_mapper(field)
+        return self.drf_spectacular_schema["properties"].get(field.field_name)
+
+    def is_id_required(self) -> bool:
+        return is_id_required_for_method(serializer=self.serializer, method=self.method, pk_name=self.pk_name)
+
     def _patch_type_enum(self) -> None:
         """Resolve the resource type of the serializer and sets the type enum of the resource object schema"""
         self._schema["properties"]["type"]["enum"] = [
@@ -158,27 +258,19 @@ class JsonApiResourceObject:
 
     def _patch_id_for_json_api_resource_object(self) -> None:
         """Patches the `drf_spectacular_jsonapi.schemas.models.JsonApiResourceObject._resource_object_schema` with the correct `id` property."""
-        if self.method == "PATCH" or self.method == "GET" or self.pk_name and self.method == "POST" and not self.serializer.fields[self.pk_name].read_only:
-            # case 1: PATCH:
-            # The PATCH request MUST include a single resource object as primary data.
-            # The resource object MUST contain type and id members.
-
-            # case 2: "GET"
-            # If method == "GET" this resource object schema shall be build for an response body schema definition.
-            # id is required
-
-            # case 3: "POST" with client id see: https://jsonapi.org/format/#crud-creating-client-ids
+        if self.is_id_required():
             self._schema["required"].append(
                 "id") if "id" not in self._schema["required"] else None
 
             # {} is a shorthand syntax for an arbitrary-type: see https://swagger.io/docs/specification/data-models/data-types/#any
-            self._schema["properties"]["id"] = self.drf_spectacular_schema["properties"][self.pk_name] if self.pk_name else {
-            }
+            id_schema = (self.map_field(
+                self.serializer.fields[self.pk_name]) if self.pk_name else None) or {}
 
-            is_read_only = self._schema["properties"]["id"].get(
-                "readOnly", None)
-            if is_read_only:
-                del self._schema["properties"]["id"]["readOnly"]
+            if id_schema.get("readOnly", None):
+                # copy the schema, cause the mapped field schema may be shared with other schemas
+                id_schema = {key: value for key,
+                             value in id_schema.items() if key != "readOnly"}
+            self._schema["properties"]["id"] = id_schema
 
     def _split_into_attributes_and_relationships(self):
         attributes = {}
@@ -186,30 +278,33 @@ class JsonApiResourceObject:
 
         relationships = {}
         required_relationships = []
-        # sorts the serializer fields in attributes and relationships to match the json:api resource object schema
-        for field in self.serializer.fields.values():
-            # https://jsonapi.org/format/#document-resource-objects
-            if field.field_name == self.pk_name:
-                # id field shall not be part of the attributes
+        # the serializer fields are already sorted in attributes and relationships to match the json:api resource object schema
+        # https://jsonapi.org/format/#document-resource-objects
+        fields = self.serializer.fields
+        for attribute in self.field_index.attributes:
+            field_schema = self.map_field(fields[attribute.field_name])
+            if field_schema is None:
+                # there is no schema for this field in the current direction
                 continue
-            if isinstance(field, (HyperlinkedIdentityField, HiddenField)):
-                # the 'url' is not an attribute but rather a self.link, so don't map it here.
-                # TODO: shall hidden fields be part of the schema?
+            if attribute.required:
+                required_attributes.append(attribute.name)
+            attributes[attribute.name] = field_schema
+
+        for relationship in self.field_index.relationships:
+            field = fields[relationship.field_name]
+            field_schema = self.map_field(field)
+            if field_schema is None:
+                # there is no schema for this field in the current direction
                 continue
-
-            if isinstance(field, RelatedField) or isinstance(field, ManyRelatedField):
-                relationships[format_field_name(
-                    field.field_name)] = self.get_related_field_converter_class()(field=field, drf_spectactular_field_schema=self.drf_spectacular_schema["properties"][field.field_name]).__dict__()
-                if field.required:
-                    required_relationships.append(
-                        format_field_name(field.field_name))
-                continue
-
-            if field.required:
-                required_attributes.append(format_field_name(field.field_name))
-
-            attributes[format_field_name(
-                field.field_name)] = self.drf_spectacular_schema["properties"][field.field_name]
+            relationships[relationship.name] = self.get_related_field_converter_class()(
+                field=field,
+                drf_spectactular_field_schema=field_schema,
+                related_resource_type=relationship.related_resource_type,
+                many=relationship.many,
+                registry=self.registry
+            ).__dict__()
+            if relationship.required:
+                required_relationships.append(relationship.name)
 
         if attributes:
             self._schema["properties"]["attributes"] = {
@@ -0,0 +1,233 @@
+import re
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple, Union
+
+from django.db.models import DateTimeField, Field, ForeignObjectRel, Model
+from django.db.models.fields.related import (ForeignKey, ManyToManyField,
+                                             OneToOneField)
+from django.db.models.fields.reverse_related import (ManyToManyRel,
+                                                     ManyToOneRel, OneToOneRel)
+from rest_framework_json_api.serializers import (HiddenField,
+                                                 HyperlinkedIdentityField,
+                                                 ManyRelatedField,
+                                                 RelatedField)
+from rest_framework_json_api.utils import (format_field_name,
+                                           get_related_resource_type,
+                                           get_resource_type_from_model,
+                                           undo_format_field_name)
+
+from drf_spectacular_jsonapi.schemas.cache import SchemaCache, register_cache
+from drf_spectacular_jsonapi.schemas.utils import get_primary_key_of_serializer
+
+
+class AttributeField(NamedTuple):
+    field_name: str
+    name: str
+    required: bool
+
+
+class RelationshipField(NamedTuple):
+    field_name: str
+    name: str
+    required: bool
+    many: bool
+    related_resource_type: str
+
+
+class SerializerFieldIndex:
+    """Classification of all serializer fields into the json:api resource object members.
+
+    `name` is always the formatted json:api member name, `field_name` the name of the serializer field.
+    """
+
+    __slots__ = ("pk_name", "field_names", "sparse_fieldset_names", "attributes", "relationships",
+                 "required_attributes", "required_relationships")
+
+    def __init__(self, serializer) -> None:
+        self.pk_name = get_primary_key_of_serializer(serializer=serializer)
+
+        field_names = []
+        sparse_fieldset_names = []
+        attributes = []
+        relationships = []
+        for field in serializer.fields.values():
+            name = format_field_name(field.field_name)
+            field_names.append(name)
+            if field.field_name == self.pk_name:
+                # id field shall not be part of the attributes or sparse fieldsets
+                continue
+            sparse_fieldset_names.append(name)
+
+            if isinstance(field, (HyperlinkedIdentityField, HiddenField)):
+                # the 'url' is not an attribute but rather a self.link, so don't map it here.
+                # TODO: shall hidden fields be part of the schema?
+                continue
+
+            if isinstance(field, (RelatedField, ManyRelatedField)):
+                relationships.append(RelationshipField(
+                    field_name=field.field_name,
+                    name=name,
+                    required=field.required,
+                    many=isinstance(field, ManyRelatedField),
+                    related_resource_type=get_related_resource_type(field)
+                ))
+            else:
+                attributes.append(AttributeField(
+                    field_name=field.field_name,
+                    name=name,
+                    required=field.required
+                ))
+
+        self.field_names: Tuple[str, ...] = tuple(field_names)
+        self.sparse_fieldset_names: Tuple[str, ...] = tuple(
+            sparse_fieldset_names)
+        self.attributes: Tuple[AttributeField, ...] = tuple(attributes)
+        self.relationships: Tuple[RelationshipField, ...] = tuple(
+            relationships)
+        self.required_attributes: Tuple[str, ...] = tuple(
+            field.name for field in attributes if field.required)
+        self.required_relationships: Tuple[str, ...] = tuple(
+            field.name for field in relationships if field.required)
+
+
+serializer_field_index_cache = register_cache(
+    SchemaCache(name="serializer_field_indexes"))
+
+
+def get_serializer_field_index(serializer) -> SerializerFieldIndex:
+    """Returns the field index of the serializer class and its field names. It is build once from the first passed
+    instance with these fields.
+
+    The field names are part of the key, cause serializers may build different fields per instance (sparse fieldsets
+    or context dependent `get_fields` for example). Fields with the same names, but different field classes or
+    options per instance are not detected.
+    """
+    return serializer_field_index_cache.get_or_set(
+        (serializer.__class__, tuple(serializer.fields)),
+        lambda: SerializerFieldIndex(serializer=serializer)
+    )
+
+
+class ModelRelationship(NamedTuple):
+    name: str
+    field: Union[Field, ForeignObjectRel]
+    many: bool
+    related_resource_type: str
+    related_pk_field: Field
+
+
+def _build_model_relationships(model) -> Tuple[ModelRelationship, ...]:
+    # only the model options are analyzed. Model instances are never created, cause model constructors may be expensive
+    related_fields = []
+
+    # local relation fields
+    for field in model._meta.fields:
+        if isinstance(field, (ForeignKey, OneToOneField, ManyToManyField)):
+            related_fields.append((field.name, field))
+
+    # reverse relations
+    for field_name, rel_type in model._meta.fields_map.items():
+        if isinstance(rel_type, (OneToOneRel, ManyToOneRel, ManyToManyRel)):
+            related_fields.append((field_name, rel_type))
+
+    return tuple(
+        ModelRelationship(
+            name=name,
+            field=field,
+            many=isinstance(
+                field, (ManyToManyField, ManyToOneRel, ManyToManyRel)),
+            related_resource_type=get_resource_type_from_model(
+                field.related_model),
+            related_pk_field=field.related_model._meta.pk
+        ) for name, field in related_fields
+    )
+
+
+model_relationships_cache = register_cache(
+    SchemaCache(name="model_relationships"))
+
+
+def get_model_relationships(model: Model) -> Tuple[ModelRelationship, ...]:
+    """Returns all local and reverse relations of the model class. They are resolved once per model class."""
+    return model_relationships_cache.get_or_set(
+        model,
+        lambda: _build_model_relationships(model=model)
+    )
+
+
+# lookups and transforms, which django-filter appends to the field path of generated filters (`title__icontains`)
+FILTER_LOOKUPS = frozenset(Field.get_lookups()) | frozenset(DateTimeField.get_lookups())
+
+# same member name characters as `rest_framework_json_api.django_filters.DjangoFilterBackend.filter_regex`
+_filter_parameter_pattern = re.compile(r"filter\[(?P<assoc>[\w.\-]+)\]")
+
+
+class FilterParameter(NamedTuple):
+    """Parsed `filter[field.lookup]` query parameter.
+
+    `name` is the filterset key of the parameter, `field_name` the same key without a trailing lookup.
+    """
+    name: str
+    field_name: str
+    lookup: Optional[str]
+
+
+def parse_filter_parameter_name(parameter_name: str) -> Optional[FilterParameter]:
+    """Parses a `filter[...]` parameter name the same way `DjangoFilterBackend` of json:api does it. Relationship
+    paths (`filter[album.title]`) are converted into django's `__` notation. Returns `None` for other parameters."""
+    match = _filter_parameter_pattern.fullmatch(parameter_name)
+    if match is None:
+        return None
+    name = undo_format_field_name(match.group("assoc").replace(".", "__"))
+    *path, last = name.split("__")
+    if path and last in FILTER_LOOKUPS:
+        return FilterParameter(name=name, field_name="__".join(path), lookup=last)
+    return FilterParameter(name=name, field_name=name, lookup=None)
+
+
+FilterTranslation = Tuple[Optional[str], Optional[str]]
+
+
+class FilterTranslationIndex:
+    """Title and description of every `filter[...]` parameter of a filterset class.
+
+    Only declared filters have a user defined title or description. Generated lookups of a declared filter
+    (`filter[title.contains]` of the declared filter `title`) get the translations of the declared filter.
+    """
+
+    __slots__ = ("translations", "_parameters")
+
+    def __init__(self, translations: Dict[str, FilterTranslation], filter_names: Iterable[str]) -> None:
+        self.translations = {name: translation for name, translation in translations.items() if any(translation)}
+        self._parameters: Dict[str, FilterTranslation] = {}
+        for name in filter_names:
+            for parameter_name in (f"filter[{name}]", f"filter[{name.replace('__', '.')}]"):
+                self._parameters[parameter_name] = self._resolve(parameter_name)
+
+    def _resolve(self, parameter_name: str) -> FilterTranslation:
+        parameter = parse_filter_parameter_name(parameter_name)
+        if parameter is None:
+            return None, None
+        return self.translations.get(parameter.name) or self.translations.get(parameter.field_name) or (None, None)
+
+    def get(self, parameter_name: str) -> FilterTranslation:
+        """Returns the title and description of the parameter. Parameter names, which are no filterset keys
+        (formatted names for example), are parsed once."""
+        translation = self._parameters.get(parameter_name)
+        if translation is None:
+            translation = self._parameters[parameter_name] = self._resolve(parameter_name)
+        return translation
+
+
+filter_translation_index_cache = register_cache(
+    SchemaCache(name="filter_translation_indexes"))
+
+
+def get_filter_translation_index(key, filterset_class, translations) -> FilterTranslationIndex:
+    """Returns the translation index of the filterset class. `translations` returns the title and description of all
+    declared filters by name and is only called on a miss. Titles and descriptions are translated, so the key must
+    contain the active language."""
+    return filter_translation_index_cache.get_or_set(
+        key,
+        lambda: FilterTranslationIndex(
+            translations=translations(), filter_names=getattr(filterset_class, "base_filters", {}))
+    )
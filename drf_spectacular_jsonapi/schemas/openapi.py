@@ -1,14 +1,18 @@
-from typing import Dict, List, Tuple
+from copy import copy
+from typing import Dict, List, Optional, Tuple
 
-from django.db.models.fields.related import (ForeignKey, ManyToManyField,
-                                             OneToOneField)
-from django.db.models.fields.reverse_related import (ManyToManyRel,
-                                                     ManyToOneRel, OneToOneRel)
+from django.utils.functional import Promise, lazy
 from django.utils.translation import gettext_lazy as _
 from drf_spectacular.contrib.django_filters import DjangoFilterExtension
+from drf_spectacular.drainage import get_override
 from drf_spectacular.openapi import AutoSchema
-from drf_spectacular.plumbing import (ResolvedComponent, build_array_type,
-                                      build_parameter_type, is_list_serializer)
+from drf_spectacular.plumbing import (ResolvedComponent,
+                                      assert_basic_serializer,
+                                      build_array_type, build_parameter_type,
+                                      build_serializer_context,
+                                      force_instance, get_view_model,
+                                      is_list_serializer, safe_ref)
+from rest_framework.schemas.utils import get_pk_description
 from rest_framework_json_api.serializers import (
     ResourceIdentifierObjectSerializer, SparseFieldsetsMixin)
 from rest_framework_json_api.utils import (format_field_name,
@@ -17,23 +21,70 @@ from rest_framework_json_api.utils import (format_field_name,
                                            get_resource_type_from_serializer)
 from rest_framework_json_api.views import RelationshipView
 
-from drf_spectacular_jsonapi.schemas.converters import JsonApiResourceObject
+from drf_spectacular_jsonapi.interning import gettext_once
+from drf_spectacular_jsonapi.localization import (FieldTitle,
+                                                  get_translation_key,
+                                                  is_keeping_lazy_strings,
+                                                  restore_lazy_descriptions)
+from drf_spectacular_jsonapi.schemas.cache import (filter_parameter_cache,
+                                                   resource_object_cache)
+from drf_spectacular_jsonapi.schemas.converters import (
+    RESOURCE_TYPE_DESCRIPTION, JsonApiResourceObject)
+from drf_spectacular_jsonapi.schemas.introspection import (
+    FilterTranslationIndex, get_filter_translation_index,
+    get_model_relationships, get_serializer_field_index)
 from drf_spectacular_jsonapi.schemas.plumbing import build_json_api_data_frame
-from drf_spectacular_jsonapi.schemas.utils import get_primary_key_of_serializer
+from drf_spectacular_jsonapi.schemas.utils import is_id_required_for_method
+from drf_spectacular_jsonapi.tracing import (traced, traced_operation,
+                                             traced_serializer)
 
 
 class DjangoJsonApiFilterExtension(DjangoFilterExtension):
+    """Renames the filter parameters into `filter[...]` parameters.
+
+    The resolved parameters of a filter are memoized per filterset, model, filter name and language, cause many views
+    share the same filterset class (nested routes for example). Every call returns a copy of the memoized parameters.
+    """
     target_class = 'rest_framework_json_api.django_filters.backends.DjangoFilterBackend'
     priority = 1
 
-    def resolve_filter_field(self, *args, **kwargs):
-        result = super().resolve_filter_field(*args, **kwargs)
-        for item in result:
-            name = item["name"]
-            if "filter[" not in name:
-                name = f"filter[{name}]"
-                item["name"] = name
-        return result
+    def resolve_filter_field(self, auto_schema, model, filterset_class, field_name, filter_field):
+        def resolve():
+            result = super(DjangoJsonApiFilterExtension, self).resolve_filter_field(
+                auto_schema, model, filterset_class, field_name, filter_field)
+            for item in result:
+                name = item["name"]
+                if "filter[" not in name:
+                    name = f"filter[{name}]"
+                    item["name"] = name
+            return result
+
+        key = self._get_filter_parameter_cache_key(
+            auto_schema=auto_schema, model=model, filterset_class=filterset_class, field_name=field_name)
+        if key is None:
+            return resolve()
+        return filter_parameter_cache.get_or_map(key=key, registry=auto_schema.registry, factory=resolve)
+
+    def _get_filterset_key(self, auto_schema, filterset_class):
+        if filterset_class is getattr(auto_schema.view, "filterset_class", None):
+            return filterset_class
+        # django-filter creates a new filterset class from the `filterset_fields` of the view on every call
+        filterset_fields = getattr(auto_schema.view, "filterset_fields", None)
+        if filterset_fields:
+            return self.target.filterset_base, repr(filterset_fields)
+        return None
+
+    def _get_filter_parameter_cache_key(self, auto_schema, model, filterset_class, field_name):
+        """Descriptions of the filters are translated, so the active language is part of the key. Returns `None`
+        for filtersets, which can not be identified."""
+        filterset_key = self._get_filterset_key(
+            auto_schema=auto_schema, filterset_class=filterset_class)
+        if filterset_key is None:
+            return None
+        return self.__class__, auto_schema.__class__, filterset_key, model, field_name, get_translation_key()
+
+
+get_lazy_pk_description = lazy(get_pk_description, str)
 
 
 class JsonApiAutoSchema(AutoSchema):
@@ -46,18 +97,32 @@ class JsonApiAutoSchema(AutoSchema):
 
     json_api_resource_object_converter_class = JsonApiResourceObject
 
+    def __get__(self, instance, owner):
+        # the schema keeps per call state (view, method, registry...). A schema instance, which is set on a view class,
+        # is shared by all view instances, so every view instance gets its own copy like with `DefaultSchema`.
+        # Otherwise concurrent schema generations would overwrite the state of each other.
+        if instance is None or instance in self.instance_schemas:
+            return super().__get__(instance, owner)
+        schema = copy(self)
+        schema.view = instance
+        return schema
+
     def get_json_api_resource_object_converter_class(self):
         return self.json_api_resource_object_converter_class
 
+    @traced_operation("get_operation")
     def get_operation(self, path, path_regex, path_prefix, method, registry):
         return super().get_operation(path, path_regex, path_prefix, method, registry)
 
+    @traced("filter_parameters")
     def _get_filter_parameters(self) -> Dict:
         """ JSON:API specific handling for sort parameter
 
         See also json:api docs: https://jsonapi.org/format/#fetching-sorting
         """
         parameters = super()._get_filter_parameters()
+        for filter_backend in self.get_filter_backends():
+            restore_lazy_descriptions(parameters=parameters, source=filter_backend)
 
         sort_param = next(
             (parameter for parameter in parameters if parameter["name"] == "sort"), None)
@@ -74,20 +139,30 @@ class JsonApiAutoSchema(AutoSchema):
 
         return parameters
 
+    def _get_pagination_parameters(self):
+        parameters = super()._get_pagination_parameters()
+        if parameters:
+            restore_lazy_descriptions(parameters=parameters, source=self._get_paginator())
+        return parameters
+
     def get_label_for_filter(self, filter_obj):
         # explcit title defined by user
         # cast to string to ensure django gettext_lazy is rendered correctly
-        return str(filter_obj.label) if filter_obj.label else None
+        if not filter_obj.label:
+            return None
+        return filter_obj.label if is_keeping_lazy_strings() else str(filter_obj.label)
 
     def get_help_text_for_filter(self, filter_obj):
         # explicit help_text defined by user
         # cast to string to ensure django gettext_lazy is rendered correctly
-        return str(filter_obj.help_text) if hasattr(filter_obj, "help_text") and filter_obj.help_text else None
+        if not getattr(filter_obj, "help_text", None):
+            return None
+        return filter_obj.help_text if is_keeping_lazy_strings() else str(filter_obj.help_text)
 
     def get_title_and_description_for_filter_parameter(self, field_name) -> Tuple[str, str]:
         title = None
         description = None
-        if hasattr(self.view, "filterset_class"):
+        if getattr(self.view, "filterset_class", None):
             # only in case of filterset classes there is a possibility,
             # that the user set the label or title expliciet to describe what this filter does.
             _filter = self.view.filterset_class.declared_filters.get(
@@ -101,22 +176,30 @@ class JsonApiAutoSchema(AutoSchema):
 
         return title, description
 
-    def _get_field_name_from_filter_parameter_name(self, parameter_name):
-        field_name = parameter_name.split("[")[1].split("]")[0]
-        if "_" in field_name:
-            field_name = field_name.split("_")[0]
-        if "." in field_name:
-            field_name = field_name.split(".")[0]
-        return field_name
+    def get_filter_translation_index(self) -> Optional[FilterTranslationIndex]:
+        """Index of the titles and descriptions of all filter parameters, built once per filterset class and
+        language"""
+        filterset_class = getattr(self.view, "filterset_class", None)
+        if filterset_class is None:
+            return None
+        return get_filter_translation_index(
+            key=(self.__class__, filterset_class, get_translation_key()),
+            filterset_class=filterset_class,
+            translations=lambda: {
+                name: self.get_title_and_description_for_filter_parameter(field_name=name)
+                for name in filterset_class.declared_filters
+            }
+        )
 
+    @traced("filter_translations")
     def _patch_translations_for_fields(self, parameters: Dict):
         """Patching all parameter descriptions with the django translations"""
+        translation_index = self.get_filter_translation_index()
+        if translation_index is None:
+            return
         for parameter in parameters:
             if "filter[" in parameter.get("name", ""):
-                field_name = self._get_field_name_from_filter_parameter_name(
-                    parameter_name=parameter["name"])
-                title, description = self.get_title_and_description_for_filter_parameter(
-                    field_name=field_name)
+                title, description = translation_index.get(parameter["name"])
                 if title:
                     parameter["title"] = title
                 if description:
@@ -124,12 +207,12 @@ class JsonApiAutoSchema(AutoSchema):
 
     def _patch_sort_param_schema(self, sort_param: Dict) -> None:
         """Patching all possible sortable columns as schema definition."""
-        serializer = self._get_serializer()
         enum = []
         if isinstance(self.view.ordering_fields, str) and self.view.ordering_fields == "__all__":
             # All fields can be used to sort
-            for field in serializer.fields.values():
-                field_name = format_field_name(field.field_name)
+            field_index = get_serializer_field_index(
+                serializer=self._get_serializer())
+            for field_name in field_index.field_names:
                 enum.append(field_name)
                 enum.append(f"-{field_name}")
         elif isinstance(self.view.ordering_fields, list):
@@ -150,10 +233,11 @@ class JsonApiAutoSchema(AutoSchema):
 
             # 1. get all possible related_field parameters
             # 2. based on the possible related_field parameters (json:api ressources) build the tag array
-            return [get_resource_type_from_model(field.related_model) for name, field in self._get_relationship_fields()] + ['RelationshipViews']
+            return [relationship.related_resource_type for relationship in self._get_model_relationships()] + ['RelationshipViews']
         else:
             return [get_resource_name(context={"view": self.view})]
 
+    @traced("include_parameter")
     def get_include_parameter(self):
         include_parameter = {}
         include_enum = []
@@ -172,6 +256,7 @@ class JsonApiAutoSchema(AutoSchema):
                 include_enum.append(format_field_name(field_name=field_name))
         return include_parameter
 
+    @traced("sparse_fieldset_parameters")
     def get_sparse_fieldset_parameters(self):
         serializer = self._get_serializer()
         fields_parameters = {}
@@ -187,10 +272,9 @@ class JsonApiAutoSchema(AutoSchema):
                 description=_(
                     "endpoint return only specific fields in the response on a per-type basis by including a fields[TYPE] query parameter."),
             )
-            # collect sparrse fieldset and exclude the json:api id field from this lookup
-            for field in list(filter(lambda field: (field.field_name != get_primary_key_of_serializer(serializer)), serializer.fields.values())):
-                fields_parameters[parameter_name, "query"]["schema"]["items"]["enum"].append(
-                    format_field_name(field.field_name))
+            # collect sparrse fieldset, the json:api id field is already excluded by the field index
+            fields_parameters[parameter_name, "query"]["schema"]["items"]["enum"].extend(
+                get_serializer_field_index(serializer=serializer).sparse_fieldset_names)
         # TODO: sparse fieldset values for included serializers are also needed
         return fields_parameters
 
@@ -216,17 +300,7 @@ class JsonApiAutoSchema(AutoSchema):
         if isinstance(serializer, ResourceIdentifierObjectSerializer):
             one_of = []
 
-            related_fields = self._get_relationship_fields()
-
-            for name, field in related_fields:
-                resource_name = get_resource_type_from_model(
-                    field.related_model)
-
-                related_model_instance = field.related_model()
-                fields = related_model_instance._meta.fields
-                pk_field = next((field for field in fields if field.name ==
-                                related_model_instance._meta.pk.name), fields)
-
+            for relationship in self._get_model_relationships():
                 schema = {
                     "type": "object",
                     "required": ["type"],
@@ -234,10 +308,10 @@ class JsonApiAutoSchema(AutoSchema):
                     "properties": {
                         "type": {
                             "type": "string",
-                            "description": _("The [type](https://jsonapi.org/format/#document-resource-object-identification) member is used to describe resource objects that share common attributes and relationships."),
-                            "enum": [resource_name]
+                            "description": gettext_once(RESOURCE_TYPE_DESCRIPTION),
+                            "enum": [relationship.related_resource_type]
                         },
-                        "id": self._map_model_field(pk_field, direction)
+                        "id": self._map_model_field(relationship.related_pk_field, direction)
                         # TODO:
                         # "links": {
                         #     "type": "object",
@@ -245,7 +319,7 @@ class JsonApiAutoSchema(AutoSchema):
                         # },
                     },
                 }
-                if isinstance(field, (ManyToManyField, ManyToOneRel, ManyToManyRel)):
+                if relationship.many:
                     one_of.append({
                         "type": "array",
                         "items": schema,
@@ -259,18 +333,75 @@ class JsonApiAutoSchema(AutoSchema):
 
         return super()._map_serializer(serializer, direction, bypass_extensions)
 
+    def _get_json_api_field_mapper(self, serializer, direction):
+        """Returns a callable which maps a single serializer field the same way as drf_spectacular does it inside
+        `_map_basic_serializer`, without building the intermediate flat object schema."""
+        exclude_fields = get_override(serializer, 'exclude_fields', [])
+        deprecate_fields = get_override(serializer, 'deprecate_fields', [])
+
+        def map_field(field):
+            if field.field_name in exclude_fields:
+                return None
+
+            schema = self._map_serializer_field(field, direction)
+            # skip field if there is no schema for the direction
+            if schema is None:
+                return None
+
+            self._insert_field_validators(field, schema)
+
+            if field.field_name in deprecate_fields:
+                schema['deprecated'] = True
+
+            return safe_ref(schema)
+
+        return map_field
+
+    @traced_serializer("map_resource_object")
     def _map_basic_serializer(self, serializer, direction):
-        # let drf_spectacular do the default drf_spectacular stuff first.
-        # It is an performace leak, but for now the only handy way without copy paste all the drf_spectacular code.
-        object_schema = super()._map_basic_serializer(
-            serializer=serializer, direction=direction)
-
-        json_api_resource_object_schema = self.get_json_api_resource_object_converter_class()(
-            serializer=serializer,
-            drf_spectactular_schema=object_schema,
-            method=self.method,
-        ).__dict__()
-        return json_api_resource_object_schema
+        assert_basic_serializer(serializer)
+        serializer = force_instance(serializer)
+        # serializers provided through @extend_schema will not receive the mock context
+        # via _get_serializer(). Establish behavioral symmetry for those use-cases.
+        if not serializer.context:
+            serializer.context.update(build_serializer_context(self.view))
+
+        def map_resource_object():
+            # the resource object is mapped directly from the serializer fields.
+            # Every field is passed only once to the drf_spectacular field mapping.
+            return self.get_json_api_resource_object_converter_class()(
+                serializer=serializer,
+                method=self.method,
+                field_mapper=self._get_json_api_field_mapper(
+                    serializer=serializer, direction=direction),
+                registry=self.registry,
+            ).__dict__()
+
+        return resource_object_cache.get_or_map(
+            key=self._get_resource_object_cache_key(
+                serializer=serializer, direction=direction),
+            registry=self.registry,
+            factory=map_resource_object
+        )
+
+    def _get_resource_object_cache_key(self, serializer, direction):
+        """The converted resource object only depends on the serializer class and its field names, the direction and
+        whether the `id` member is required for the current http method. Field titles are already rendered by
+        drf_spectacular, so the active language is part of the key as well."""
+        return (
+            self.__class__,
+            self.get_json_api_resource_object_converter_class(),
+            serializer.__class__,
+            tuple(serializer.fields),
+            direction,
+            is_id_required_for_method(
+                serializer=serializer,
+                method=self.method,
+                pk_name=get_serializer_field_index(
+                    serializer=serializer).pk_name
+            ),
+            get_translation_key(),
+        )
 
     def _postprocess_serializer_schema(self, schema, serializer, direction):
         schema = super()._postprocess_serializer_schema(schema, serializer, direction)
@@ -301,34 +432,43 @@ class JsonApiAutoSchema(AutoSchema):
             content["application/vnd.api+json"]["schema"] = response_component.ref
         return response
 
-    def _get_relationship_fields(self):
-        base_model_cls = self.view.queryset.model
-        base_model = base_model_cls()
-        related_fields = []
-
-        # local relation fields
-        for field in base_model._meta.fields:
-            if isinstance(field, (ForeignKey, OneToOneField, ManyToManyField)):
-                related_fields.append((field.name, field))
+    @traced("relationship_fields")
+    def _get_model_relationships(self):
+        return get_model_relationships(model=self.view.queryset.model)
 
-        # reverse relations
-        for field_name, rel_type in base_model._meta.fields_map.items():
-            if isinstance(rel_type, (OneToOneRel, ManyToOneRel, ManyToManyRel)):
-                related_fields.append((field_name, rel_type))
-
-        return related_fields
+    def _get_relationship_fields(self):
+        return [(relationship.name, relationship.field) for relationship in self._get_model_relationships()]
+
+    def _get_serializer_field_meta(self, field, direction):
+        meta = super()._get_serializer_field_meta(field, direction)
+        if not is_keeping_lazy_strings():
+            return meta
+        # drf-spectacular translates the title and description right away, see `drf_spectacular_jsonapi.localization`
+        if isinstance(field.label, Promise):
+            meta.pop("title", None)
+            meta["title"] = FieldTitle(label=field.label, field_name=field.field_name)
+        if "description" in meta:
+            description = meta.pop("description")
+            # the description follows the title like inside the meta of drf-spectacular
+            meta["description"] = field.help_text if isinstance(field.help_text, Promise) else description
+        return meta
 
     def _resolve_path_parameters(self, variables):
         params = super()._resolve_path_parameters(variables)
+        model = get_view_model(self.view, emit_warnings=False) if is_keeping_lazy_strings() else None
+        if model is not None:
+            # the primary key description is translated right away by django rest framework
+            description = get_pk_description(model, model._meta.pk)
+            for param in params:
+                if param.get("description") == description:
+                    param["description"] = get_lazy_pk_description(model, model._meta.pk)
         if isinstance(self.view, RelationshipView):
-            related_fields = self._get_relationship_fields()
-
             # TODO: there is a function `self.view.get_related_field_name` which returns the concrete name of the related_field
             # But it will only works if the view is initialized with correct kwargs.
             related_field_parameter = next(
                 (param for param in params if param["name"] == "related_field"), params)
             related_field_parameter["schema"]["enum"] = [
-                name for name, field in related_fields]
+                relationship.name for relationship in self._get_model_relationships()]
             related_field_parameter["description"] = _(
                 "Pass in one of the possible relation types to get all related objects.")
 
@@ -12,3 +12,17 @@ def get_primary_key_of_serializer(serializer) -> str | None:
         except StopIteration:
             pass
     warn(message="Can't resolve primary key for non model serializers.")
+
+
+def is_id_required_for_method(serializer, method: str, pk_name: str | None) -> bool:
+    """Decide if the `id` member is part of the resource object, based on the http method"""
+    # case 1: PATCH:
+    # The PATCH request MUST include a single resource object as primary data.
+    # The resource object MUST contain type and id members.
+
+    # case 2: "GET"
+    # If method == "GET" this resource object schema shall be build for an response body schema definition.
+    # id is required
+
+    # case 3: "POST" with client id see: https://jsonapi.org/format/#crud-creating-client-ids
+    return bool(method == "PATCH" or method == "GET" or pk_name and method == "POST" and not serializer.fields[pk_name].read_only)
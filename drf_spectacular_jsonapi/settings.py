@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.signals import setting_changed
+from rest_framework.settings import APISettings
+
+JSON_API_SPECTACULAR_DEFAULTS = {
+    # Register one component per related resource type and cardinality (for example `AlbumRelationshipToOne` and
+    # `AlbumRelationshipToMany`) and reference it from every relationship field instead of inlining the
+    # resource identifier object schema.
+    "RELATIONSHIP_COMPONENTS": False,
+    # Sort all lists with set semantics (enum, required, oneOf, anyOf) of the generated schema, so the same code
+    # always produces byte identical output. Needs `drf_spectacular_jsonapi.generators.JsonApiSchemaGenerator`.
+    "DETERMINISTIC_OUTPUT": False,
+    # Schema cache used by `drf_spectacular_jsonapi.views.JsonApiSpectacularAPIView` for public schemas,
+    # for example `drf_spectacular_jsonapi.cache.FileSchemaCache`. `None` disables the cache.
+    "SCHEMA_CACHE_CLASS": None,
+    # Directory of the `FileSchemaCache`. Defaults to a `drf_spectacular_jsonapi` directory inside the temp directory.
+    "SCHEMA_CACHE_DIR": None,
+    # Directory of the prebuilt schema artifacts, written by the `build_jsonapi_schema` management command and served
+    # by `drf_spectacular_jsonapi.views.JsonApiSchemaArtifactView`.
+    "SCHEMA_ARTIFACT_DIR": None,
+    # Number of worker processes of `drf_spectacular_jsonapi.generators.JsonApiSchemaGenerator`, which map the
+    # operations in parallel. `0` uses one worker per cpu, `None` and `1` disable the parallel generation.
+    "PARALLEL_WORKERS": None,
+    # Share equal fragments (objects, arrays and strings) of the generated schema instead of keeping thousands of
+    # equal copies in memory, see `drf_spectacular_jsonapi.interning.FragmentInterner`. Interned schemas must not be
+    # mutated. Needs `drf_spectacular_jsonapi.generators.JsonApiSchemaGenerator`.
+    "INTERN_FRAGMENTS": False,
+    # Generate the public schema inside a background thread as soon as the app is ready and serve it from process
+    # memory by `drf_spectacular_jsonapi.views.JsonApiSpectacularAPIView`, see `drf_spectacular_jsonapi.warmup`.
+    "SCHEMA_WARMUP": False,
+    # Seconds a schema request waits for a running warm-up, before it generates the schema itself.
+    "SCHEMA_WARMUP_TIMEOUT": 2.0,
+    # Language codes of the public schema served by `drf_spectacular_jsonapi.views.JsonApiSpectacularAPIView`. The
+    # schema is mapped once and only its lazy translation strings are translated per language, see
+    # `drf_spectacular_jsonapi.localization`. The language is selected by the `lang` query parameter or the
+    # `Accept-Language` header. The first language is the fallback.
+    "SCHEMA_LANGUAGES": None,
+}
+
+IMPORT_STRINGS = [
+    "SCHEMA_CACHE_CLASS",
+]
+
+
+class JsonApiSpectacularSettings(APISettings):
+    """Settings of this package, configured by the `SPECTACULAR_JSONAPI_SETTINGS` dict of the django settings."""
+
+    @property
+    def user_settings(self):
+        if not hasattr(self, '_user_settings'):
+            self._user_settings = getattr(
+                settings, 'SPECTACULAR_JSONAPI_SETTINGS', {})
+        return self._user_settings
+
+
+jsonapi_settings = JsonApiSpectacularSettings(
+    defaults=JSON_API_SPECTACULAR_DEFAULTS,
+    import_strings=IMPORT_STRINGS,
+)
+
+
+def reload_jsonapi_settings(*args, **kwargs):
+    if kwargs['setting'] == 'SPECTACULAR_JSONAPI_SETTINGS':
+        jsonapi_settings.reload()
+
+
+setting_changed.connect(reload_jsonapi_settings)
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import posixpath
+import re
+from typing import Dict
+
+from drf_spectacular_jsonapi.artifacts import _write_atomic, render_minified_json
+from drf_spectacular_jsonapi.references import COMPONENT_REF_PREFIX
+
+COMPONENT_DIR_NAME = "components"
+
+# length of the content hash inside the file names of the component files
+HASH_LENGTH = 16
+
+_unsafe_file_name_characters = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def render_split_file(content) -> bytes:
+    # sorted keys, so the content hash only depends on the content
+    return json.dumps(content, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def _rewrite_refs(obj, rewrite):
+    if isinstance(obj, dict):
+        rewritten = {key: _rewrite_refs(value, rewrite) for key, value in obj.items()}
+        ref = rewritten.get("$ref")
+        if isinstance(ref, str):
+            rewritten["$ref"] = rewrite(ref)
+        discriminator = rewritten.get("discriminator")
+        if isinstance(discriminator, dict) and isinstance(discriminator.get("mapping"), dict):
+            discriminator["mapping"] = {
+                key: rewrite(value) for key, value in discriminator["mapping"].items()}
+        return rewritten
+    if isinstance(obj, list):
+        return [_rewrite_refs(item, rewrite) for item in obj]
+    return obj
+
+
+def get_component_file_name(name: str, content: bytes) -> str:
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    return f"{_unsafe_file_name_characters.sub('_', name)}.{digest}.json"
+
+
+def split_schema(schema: Dict, index_name: str = "schema.json"):
+    """Splits the schema components into content addressed files.
+
+    Returns the root index and a dict of the component files by their relative path. The index is the schema itself,
+    but every schema component (resource objects, `...Response` frames, relationships, enums...) is an external
+    reference to its own file, which is named by the content hash. Operations keep their local references to the
+    components of the index.
+
+    References between components are rewritten to point to the components of the index (`../schema.json#/...`)
+    instead of the files directly. So a component file only changes if the component itself changes, also if
+    components reference each other in cycles.
+    """
+    components = schema.get("components", {}).get("schemas", {})
+    index_ref = posixpath.relpath(index_name, COMPONENT_DIR_NAME)
+
+    def rewrite(ref: str) -> str:
+        if ref.startswith(COMPONENT_REF_PREFIX):
+            return f"{index_ref}{ref}"
+        return ref
+
+    files = {}
+    external_components = {}
+    for name, component in components.items():
+        content = render_split_file(_rewrite_refs(component, rewrite))
+        path = posixpath.join(COMPONENT_DIR_NAME,
+                              get_component_file_name(name, content))
+        files[path] = content
+        external_components[name] = {"$ref": path}
+
+    index = dict(schema)
+    if components:
+        index["components"] = {
+            **schema["components"], "schemas": external_components}
+    return index, files
+
+
+def write_split_schema(schema: Dict, directory: str, index_name: str = "schema.json") -> Dict:
+    """Writes the split schema (see `split_schema`) into the directory and returns the index.
+
+    Existing component files are never written again, cause equal names mean equal contents. Component files of
+    previous schemas are kept, so clients with an older index can still resolve them. The index is written last.
+    """
+    index, files = split_schema(schema, index_name=index_name)
+    os.makedirs(os.path.join(directory, COMPONENT_DIR_NAME), exist_ok=True)
+    for path, content in files.items():
+        file_path = os.path.join(directory, *path.split("/"))
+        if not os.path.exists(file_path):
+            _write_atomic(file_path, content)
+    _write_atomic(os.path.join(directory, index_name),
+                  render_minified_json(index))
+    return index
+
+
+def bundle_schema(directory: str, index_name: str = "schema.json", verify: bool = True) -> Dict:
+    """Bundles a split schema back into a single document with local references.
+
+    If `verify` is set, the content hash of every component file is checked against its file name.
+    """
+    with open(os.path.join(directory, index_name), "rb") as index_file:
+        index = json.load(index_file)
+    index_ref = posixpath.relpath(index_name, COMPONENT_DIR_NAME)
+
+    def rewrite(ref: str) -> str:
+        if ref.startswith(f"{index_ref}#"):
+            return ref[len(index_ref):]
+        return ref
+
+    components = {}
+    for name, external in index.get("components", {}).get("schemas", {}).items():
+        path = external["$ref"]
+        with open(os.path.join(directory, *path.split("/")), "rb") as component_file:
+            content = component_file.read()
+        if verify and posixpath.basename(path) != get_component_file_name(name, content):
+            raise ValueError(f"content hash of {path} does not match")
+        components[name] = _rewrite_refs(json.loads(content), rewrite)
+
+    schema = dict(index)
+    if components:
+        schema["components"] = {**index["components"], "schemas": components}
+    return schema
@@ -0,0 +1,135 @@
+from typing import IO, Iterator, Optional, Union
+
+from drf_spectacular.renderers import (OpenApiJsonRenderer,
+                                       OpenApiJsonRenderer2,
+                                       OpenApiYamlRenderer,
+                                       OpenApiYamlRenderer2)
+from rest_framework.renderers import INDENT_SEPARATORS, LONG_SEPARATORS, SHORT_SEPARATORS
+
+# size of the chunks, which are yielded to the response or written to the file
+STREAMING_CHUNK_SIZE = 64 * 1024
+
+# nesting levels of the top level schema keys, which are rendered entry by entry: every path item and every component
+YAML_SPLIT_LEVELS = {"paths": 1, "components": 2}
+
+YAML_DOCUMENT_END = b"...\n"
+
+
+def iter_schema_entries(schema) -> Iterator:
+    """Yields the keys and values of the path items, the components and all other top level entries of the schema
+    in document order."""
+
+    def iter_entries(keys, value, levels):
+        if levels and isinstance(value, dict) and value:
+            for key, item in value.items():
+                yield from iter_entries(keys + (key,), item, levels - 1)
+        else:
+            yield keys, value
+
+    for key, value in schema.items():
+        yield from iter_entries((key,), value, YAML_SPLIT_LEVELS.get(key, 0))
+
+
+class StreamingOpenApiYamlRenderer(OpenApiYamlRenderer):
+    """`OpenApiYamlRenderer`, which can also render the schema in chunks with `iter_render`
+
+    Every path item and every component is rendered on its own by `OpenApiYamlRenderer.render`, nested inside its
+    parent keys, so it is indented like inside the complete document. The header lines of the parent keys are only
+    kept for the first entry. Block style yaml without aliases is the concatenation of these entries, so the chunks
+    equal the rendered document, while at most one entry is rendered at a time.
+    """
+
+    def iter_render(self, data, accepted_media_type=None, renderer_context=None,
+                    chunk_size: int = STREAMING_CHUNK_SIZE) -> Iterator[bytes]:
+        if not isinstance(data, dict) or not data:
+            yield self.render(data, accepted_media_type, renderer_context)
+            return
+        buffer = []
+        size = 0
+        parents = ()
+        document_end = b""
+        for keys, value in iter_schema_entries(data):
+            for key in reversed(keys):
+                value = {key: value}
+            content = self.render(value, accepted_media_type, renderer_context)
+            # the parent keys are rendered as one "key:" line each
+            shared = 0
+            while shared < len(parents) and shared < len(keys) - 1 and parents[shared] == keys[shared]:
+                shared += 1
+            if shared:
+                content = content.split(b"\n", shared)[shared]
+            parents = keys[:-1]
+            # an open ended scalar at the end of an entry adds a document end marker, which only the last one keeps
+            document_end = YAML_DOCUMENT_END if content.endswith(YAML_DOCUMENT_END) else b""
+            if document_end:
+                content = content[:-len(YAML_DOCUMENT_END)]
+            buffer.append(content)
+            size += len(content)
+            if size >= chunk_size:
+                yield b"".join(buffer)
+                buffer = []
+                size = 0
+        buffer.append(document_end)
+        if size or document_end:
+            yield b"".join(buffer)
+
+
+class StreamingOpenApiYamlRenderer2(StreamingOpenApiYamlRenderer):
+    media_type = OpenApiYamlRenderer2.media_type
+
+
+class StreamingOpenApiJsonRenderer(OpenApiJsonRenderer):
+    """`OpenApiJsonRenderer`, which can also render the schema in chunks with `iter_render`"""
+
+    def iter_render(self, data, accepted_media_type=None, renderer_context=None,
+                    chunk_size: int = STREAMING_CHUNK_SIZE) -> Iterator[bytes]:
+        # same encoder arguments as `JSONRenderer.render`
+        if data is None:
+            return
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if indent is None:
+            separators = SHORT_SEPARATORS if self.compact else LONG_SEPARATORS
+        else:
+            separators = INDENT_SEPARATORS
+        encoder = self.encoder_class(
+            indent=indent, ensure_ascii=self.ensure_ascii, allow_nan=not self.strict, separators=separators)
+
+        buffer = []
+        size = 0
+        for chunk in encoder.iterencode(data):
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= chunk_size:
+                yield self._encode_chunk(buffer)
+                buffer = []
+                size = 0
+        if buffer:
+            yield self._encode_chunk(buffer)
+
+    def _encode_chunk(self, buffer) -> bytes:
+        # we always fully escape \u2028 and \u2029 like `JSONRenderer.render`
+        return "".join(buffer).replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+
+class StreamingOpenApiJsonRenderer2(StreamingOpenApiJsonRenderer):
+    media_type = OpenApiJsonRenderer2.media_type
+
+
+STREAMING_RENDERERS = {
+    "yaml": StreamingOpenApiYamlRenderer,
+    "json": StreamingOpenApiJsonRenderer,
+}
+
+
+def write_schema(schema, file: Union[str, IO[bytes]], schema_format: str = "yaml",
+                 renderer_context: Optional[dict] = None) -> None:
+    """Writes the schema in chunks into the file (a path or a binary file object). The written content is the same as
+    the one of the non streaming renderers of drf-spectacular."""
+    chunks = STREAMING_RENDERERS[schema_format]().iter_render(
+        schema, renderer_context=renderer_context)
+    if isinstance(file, str):
+        with open(file, "wb") as schema_file:
+            schema_file.writelines(chunks)
+    else:
+        file.writelines(chunks)
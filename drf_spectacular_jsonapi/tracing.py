@@ -0,0 +1,154 @@
+import json
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+# the active tracer. If it is `None`, the traced functions are called directly without any measuring.
+_tracer = None
+
+
+class SchemaTracer(ABC):
+    """Interface of the tracers, which receive the measurements of the schema generation phases.
+
+    Implement `record` to forward the measurements to any other system (logging, metrics...). `start` is called right
+    before a traced phase starts, `record` right after it has finished.
+    """
+
+    def start(self, phase: str) -> None:
+        pass
+
+    @abstractmethod
+    def record(self, phase: str, duration: float, endpoint: Optional[str] = None,
+               serializer: Optional[str] = None) -> None:
+        pass
+
+
+class InMemoryTracer(SchemaTracer):
+    """Collects wall time and call counts per phase, per endpoint and per serializer.
+
+    Durations are inclusive, so the duration of a phase contains the durations of all phases called by it (for
+    example `get_operation` contains `map_resource_object`).
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.phases: Dict[str, Dict] = {}
+        self.endpoints: Dict[str, Dict[str, Dict]] = {}
+        self.serializers: Dict[str, Dict[str, Dict]] = {}
+
+    @staticmethod
+    def _add(stats: Dict[str, Dict], phase: str, duration: float) -> None:
+        phase_stats = stats.get(phase)
+        if phase_stats is None:
+            phase_stats = stats[phase] = {"count": 0, "total": 0.0}
+        phase_stats["count"] += 1
+        phase_stats["total"] += duration
+
+    def record(self, phase: str, duration: float, endpoint: Optional[str] = None,
+               serializer: Optional[str] = None) -> None:
+        with self._lock:
+            self._add(self.phases, phase, duration)
+            if endpoint:
+                self._add(self.endpoints.setdefault(
+                    endpoint, {}), phase, duration)
+            if serializer:
+                self._add(self.serializers.setdefault(
+                    serializer, {}), phase, duration)
+
+    def as_dict(self) -> Dict:
+        with self._lock:
+            return json.loads(json.dumps({
+                "phases": self.phases,
+                "endpoints": self.endpoints,
+                "serializers": self.serializers,
+            }))
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.as_dict(), indent=indent)
+
+
+def get_tracer() -> Optional[SchemaTracer]:
+    return _tracer
+
+
+@contextmanager
+def trace_schema_generation(tracer: Optional[SchemaTracer] = None) -> Iterator[SchemaTracer]:
+    """Activates the tracer (an `InMemoryTracer` by default) for all schema generations inside the block.
+
+    The tracer is process wide, so schemas generated concurrently by other threads are recorded as well.
+    """
+    global _tracer
+    tracer = tracer or InMemoryTracer()
+    previous = _tracer
+    _tracer = tracer
+    try:
+        yield tracer
+    finally:
+        _tracer = previous
+
+
+def _get_schema_context(args) -> Tuple[Optional[str], Optional[str]]:
+    # `method` and `path` are set by `AutoSchema.get_operation` of drf-spectacular
+    schema = args[0]
+    method = getattr(schema, "method", None)
+    path = getattr(schema, "path", None)
+    return (f"{method} {path}" if method and path else None), None
+
+
+def _get_serializer_context(args) -> Tuple[Optional[str], Optional[str]]:
+    endpoint, _ = _get_schema_context(args)
+    serializer = args[1]
+    serializer_class = serializer if isinstance(
+        serializer, type) else serializer.__class__
+    return endpoint, f"{serializer_class.__module__}.{serializer_class.__qualname__}"
+
+
+def _get_endpoint_context(args) -> Tuple[Optional[str], Optional[str]]:
+    # positional arguments of `AutoSchema.get_operation`
+    if len(args) < 5:
+        return _get_schema_context(args)
+    _, path, _, _, method = args[:5]
+    return f"{method} {path}", None
+
+
+def _get_no_context(args) -> Tuple[Optional[str], Optional[str]]:
+    return None, None
+
+
+def traced(phase: str, get_context: Callable = _get_schema_context):
+    """Measures every call of the decorated function as `phase`, if a tracer is active.
+
+    `get_context` returns the endpoint and the serializer of the call by the positional arguments.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return func(*args, **kwargs)
+            tracer.start(phase)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                duration = perf_counter() - start
+                endpoint, serializer = get_context(args)
+                tracer.record(phase, duration,
+                              endpoint=endpoint, serializer=serializer)
+        return wrapper
+    return decorator
+
+
+def traced_operation(phase: str):
+    return traced(phase, get_context=_get_endpoint_context)
+
+
+def traced_serializer(phase: str):
+    return traced(phase, get_context=_get_serializer_context)
+
+
+def traced_hook(phase: str):
+    return traced(phase, get_context=_get_no_context)
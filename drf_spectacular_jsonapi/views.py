@@ -0,0 +1,279 @@
+import os
+from typing import Dict, Optional
+
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from django.http.response import HttpResponseBase
+from django.utils import translation
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.views import View
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.views import SpectacularAPIView
+from rest_framework.exceptions import NotAcceptable, ValidationError
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from drf_spectacular_jsonapi.artifacts import read_manifest
+from drf_spectacular_jsonapi.cache import SharedSchemaCache, get_schema_cache
+from drf_spectacular_jsonapi.fingerprint import get_schema_fingerprint
+from drf_spectacular_jsonapi.generators import (JsonApiSchemaGenerator,
+                                                SchemaVariant,
+                                                generate_localized_schemas)
+from drf_spectacular_jsonapi.localization import (localized_schema_cache,
+                                                  select_language)
+from drf_spectacular_jsonapi.partial import parse_resources
+from drf_spectacular_jsonapi.renderers import get_schema_hash
+from drf_spectacular_jsonapi.settings import jsonapi_settings
+from drf_spectacular_jsonapi.streaming import (STREAMING_CHUNK_SIZE,
+                                               StreamingOpenApiJsonRenderer,
+                                               StreamingOpenApiJsonRenderer2,
+                                               StreamingOpenApiYamlRenderer,
+                                               StreamingOpenApiYamlRenderer2)
+from drf_spectacular_jsonapi.warmup import (get_generator_key,
+                                            get_schema_warmup)
+
+
+class JsonApiSpectacularAPIView(SpectacularAPIView):
+    """Schema view, which serves the schema with a strong `ETag` based on the schema content hash.
+
+    Requests with a matching `If-None-Match` header are answered with `304 Not Modified`. Public schemas are served
+    from the schema warm-up (`SCHEMA_WARMUP` setting) or the schema cache, if the `SCHEMA_CACHE_CLASS` setting is
+    configured.
+
+    The `resources` query parameter (`?resources=Album,Song`) selects a partial schema with the operations of these
+    resource types or tags only. It needs the `JsonApiSchemaGenerator`.
+
+    With `streaming = True` the schema is rendered in chunks into a `StreamingHttpResponse`, so the rendered document
+    is never held in memory completely. The schema itself is still generated completely before the first chunk.
+
+    With the `SharedSchemaCache` the rendered schema is streamed from the memory mapped cache file without rendering
+    it again, unless the request asks for media type parameters (`indent` for example).
+
+    With the `SCHEMA_LANGUAGES` setting the public schema is generated once for all these languages and kept in
+    process memory. The language is selected by the `lang` query parameter or the `Accept-Language` header.
+    """
+    renderer_classes = [StreamingOpenApiYamlRenderer, StreamingOpenApiYamlRenderer2,
+                        StreamingOpenApiJsonRenderer, StreamingOpenApiJsonRenderer2]
+    streaming = False
+
+    def get_generator(self, request):
+        # version specified as parameter to the view always takes precedence. after
+        # that we try to source version through the schema view's own versioning_class.
+        version = self.api_version or request.version or self._get_version_parameter(
+            request)
+        kwargs = {}
+        resources = parse_resources(request.query_params.get("resources"))
+        if resources:
+            if not issubclass(self.generator_class, JsonApiSchemaGenerator):
+                raise ValidationError(
+                    {"resources": "partial schemas need the JsonApiSchemaGenerator"})
+            kwargs["resources"] = resources
+        return self.generator_class(urlconf=self.urlconf, api_version=version, patterns=self.patterns, **kwargs)
+
+    def get_localized_schema(self, request, generator) -> Optional[Dict]:
+        languages = jsonapi_settings.SCHEMA_LANGUAGES
+        if not languages or not self.serve_public or generator.patterns is not None:
+            return None
+        languages = tuple(languages)
+        variant = SchemaVariant(api_version=generator.api_version, urlconf=generator.urlconf,
+                                resources=tuple(getattr(generator, "resources", None) or ()) or None)
+        # the fingerprint of the structural schema, which does not depend on the language of the request
+        with translation.override(None):
+            fingerprint = get_schema_fingerprint(generator)
+        schemas = localized_schema_cache.get_or_generate(
+            (get_generator_key(generator, language=None), languages), fingerprint,
+            lambda: generate_localized_schemas(languages, variant=variant, generator_class=generator.__class__))
+        return schemas[select_language(request, languages)]
+
+    def get_schema(self, request, generator):
+        schema = self.get_localized_schema(request, generator)
+        if schema is not None:
+            return schema
+        warmup = get_schema_warmup()
+        if warmup and self.serve_public:
+            schema = warmup.get_schema(
+                generator=generator, timeout=jsonapi_settings.SCHEMA_WARMUP_TIMEOUT)
+            if schema is not None:
+                return schema
+        schema_cache = get_schema_cache()
+        if schema_cache and self.serve_public:
+            return schema_cache.get_schema(generator=generator, request=request, public=self.serve_public)
+        return generator.get_schema(request=request, public=self.serve_public)
+
+    def get_schema_etag(self, request, schema) -> str:
+        # json and yaml are different representations of the same schema, so the format is part of the strong ETag
+        schema_format = self.perform_content_negotiation(
+            request, force=True)[0].format
+        return f'"{get_schema_hash(schema)}-{schema_format}"'
+
+    def get_content_type(self, renderer) -> str:
+        # same content type as a rendered `Response`
+        return f"{renderer.media_type}; charset={renderer.charset}" if renderer.charset else renderer.media_type
+
+    def get_streaming_response(self, request, schema) -> StreamingHttpResponse:
+        renderer = request.accepted_renderer
+        return StreamingHttpResponse(
+            renderer.iter_render(schema, request.accepted_media_type,
+                                 self.get_renderer_context()),
+            content_type=self.get_content_type(renderer),
+        )
+
+    def get_shared_format(self, request) -> Optional[str]:
+        """Returns the format of the shared schema, which equals the response of the accepted renderer"""
+        renderer = request.accepted_renderer
+        if request.accepted_media_type != renderer.media_type:
+            return None
+        if isinstance(renderer, OpenApiJsonRenderer):
+            return "json"
+        if isinstance(renderer, OpenApiYamlRenderer):
+            return "yaml"
+        return None
+
+    def get_shared_schema_response(self, request, generator) -> Optional[HttpResponseBase]:
+        schema_cache = get_schema_cache()
+        schema_format = self.get_shared_format(request)
+        if not isinstance(schema_cache, SharedSchemaCache) or not self.serve_public or schema_format is None:
+            return None
+        if jsonapi_settings.SCHEMA_LANGUAGES:
+            # the shared schema is generated in the active language only
+            return None
+
+        shared = schema_cache.get_shared_schema(
+            generator=generator, request=request, public=self.serve_public)
+        etag = f'"{shared.hash}-{request.accepted_renderer.format}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            content = shared.get_content(schema_format)
+            response = StreamingHttpResponse(
+                (content[start:start + STREAMING_CHUNK_SIZE]
+                 for start in range(0, len(content), STREAMING_CHUNK_SIZE)),
+                content_type=self.get_content_type(request.accepted_renderer),
+            )
+            response["Content-Length"] = str(len(content))
+            response["Content-Disposition"] = f'inline; filename="{self._get_filename(request, generator.api_version)}"'
+        response["ETag"] = etag
+        return response
+
+    def _get_schema_response(self, request):
+        generator = self.get_generator(request)
+        response = self.get_shared_schema_response(request, generator)
+        if response is not None:
+            return response
+
+        schema = self.get_schema(request=request, generator=generator)
+        etag = self.get_schema_etag(request, schema)
+        conditional_response = get_conditional_response(
+            request, etag=etag)
+        if conditional_response is not None:
+            conditional_response["ETag"] = etag
+            return self.patch_language_vary(conditional_response)
+
+        if self.streaming and hasattr(request.accepted_renderer, "iter_render"):
+            response = self.get_streaming_response(request, schema)
+        else:
+            response = Response(data=schema)
+        response["Content-Disposition"] = f'inline; filename="{self._get_filename(request, generator.api_version)}"'
+        response["ETag"] = etag
+        return self.patch_language_vary(response)
+
+    def patch_language_vary(self, response):
+        """Localized schemas are selected by the `Accept-Language` header, also for `304 Not Modified` responses"""
+        if jsonapi_settings.SCHEMA_LANGUAGES:
+            patch_vary_headers(response, ("Accept-Language",))
+        return response
+
+
+class JsonApiSpectacularYAMLAPIView(JsonApiSpectacularAPIView):
+    renderer_classes = [StreamingOpenApiYamlRenderer,
+                        StreamingOpenApiYamlRenderer2]
+
+
+class JsonApiSpectacularJSONAPIView(JsonApiSpectacularAPIView):
+    renderer_classes = [StreamingOpenApiJsonRenderer,
+                        StreamingOpenApiJsonRenderer2]
+
+
+class JsonApiSchemaArtifactView(View):
+    """Serves the prebuilt schema artifacts of the `build_jsonapi_schema` management command.
+
+    The artifact files are streamed as they are, without parsing or rendering the schema. The gzip variant is served
+    with `Content-Encoding: gzip` to clients accepting it. The strong `ETag` is read from the manifest, so
+    `If-None-Match` requests are answered with `304 Not Modified` without touching the artifact files.
+    """
+    artifact_dir = None
+    default_format = "yaml"
+    renderer_classes = SpectacularAPIView.renderer_classes
+    content_negotiation_class = DefaultContentNegotiation
+
+    def get_artifact_dir(self) -> str:
+        artifact_dir = self.artifact_dir or jsonapi_settings.SCHEMA_ARTIFACT_DIR
+        if not artifact_dir:
+            raise Http404("no schema artifacts configured")
+        return artifact_dir
+
+    def get_manifest(self, artifact_dir: str):
+        try:
+            return read_manifest(artifact_dir)
+        except (OSError, ValueError):
+            raise Http404("schema artifacts are not built")
+
+    def get_format(self, request, manifest) -> str:
+        """Selects the format by the `format` query parameter or the `Accept` header with the content negotiation of
+        DRF and the renderers of `SpectacularAPIView`, like the schema view does it. Instead of `406 Not Acceptable`,
+        the requested or the default format is served."""
+        renderers = sorted(
+            (renderer_class() for renderer_class in self.renderer_classes
+             if renderer_class.format in manifest["formats"]),
+            key=lambda renderer: renderer.format != self.default_format)
+        try:
+            renderer, _ = self.content_negotiation_class().select_renderer(Request(request), renderers)
+        except NotAcceptable:
+            return request.GET.get("format") or self.default_format
+        return renderer.format
+
+    def get_encoding_qualities(self, request) -> Dict[str, float]:
+        """Returns the quality values of the `Accept-Encoding` header by coding. Invalid quality values refuse the
+        coding."""
+        qualities = {}
+        for encoding in request.headers.get("Accept-Encoding", "").split(","):
+            coding, *parameters = [part.strip() for part in encoding.split(";")]
+            if not coding:
+                continue
+            quality = 1.0
+            for parameter in parameters:
+                name, _, value = parameter.partition("=")
+                if name.strip().lower() == "q":
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            qualities[coding.lower()] = quality
+        return qualities
+
+    def accepts_gzip(self, request) -> bool:
+        # `gzip;q=0` refuses gzip, the `*` wildcard applies to codings without an own entry
+        qualities = self.get_encoding_qualities(request)
+        return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+    def get(self, request, *args, **kwargs):
+        artifact_dir = self.get_artifact_dir()
+        manifest = self.get_manifest(artifact_dir)
+        schema_format = self.get_format(request, manifest)
+        artifact = manifest["formats"][schema_format]
+        encoding = "gzip" if self.accepts_gzip(request) else "identity"
+
+        etag = f'"{manifest["hash"]}-{schema_format}' + \
+            ('-gzip"' if encoding == "gzip" else '"')
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            artifact_file = artifact[encoding]
+            response = FileResponse(
+                open(os.path.join(artifact_dir, artifact_file["file"]), "rb"),
+                content_type=artifact["media_type"],
+            )
+            if encoding == "gzip":
+                response["Content-Encoding"] = "gzip"
+            response["Content-Disposition"] = f'inline; filename="schema.{schema_format}"'
+        response["ETag"] = etag
+        patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+        return response
@@ -0,0 +1,206 @@
+import logging
+import os
+import sys
+import time
+from threading import Event, Lock, Thread
+from typing import Dict, List, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.utils import translation
+from drf_spectacular.settings import spectacular_settings
+
+from drf_spectacular_jsonapi.cache import get_schema_cache
+from drf_spectacular_jsonapi.settings import jsonapi_settings
+
+logger = logging.getLogger(__name__)
+
+# seconds the warm-up waits for all apps to be ready before it gives up
+APPS_READY_TIMEOUT = 60.0
+
+# management commands, which serve requests. All other commands, like `migrate`, don't start the warm-up.
+SERVER_COMMANDS = ("runserver", "runserver_plus", "testserver")
+
+
+def get_generator_key(generator, language: Optional[str]):
+    """Identifies the schema a generator generates. Only generators with the same key get the warmed up schema."""
+    return (
+        generator.__class__,
+        repr(generator.urlconf),
+        generator.api_version,
+        generator.patterns is None,
+        tuple(sorted(getattr(generator, "resources", None) or ())),
+        language,
+    )
+
+
+class SchemaWarmup:
+    """Generates the public schema of the default url conf inside a background thread.
+
+    The result is kept in process memory and served by `JsonApiSpectacularAPIView` to all requests, which would
+    generate the same schema (same generator class, url conf, api version and language). If the schema cache is
+    configured, the warm-up goes through it, so an up to date cached schema is only read.
+    """
+
+    def __init__(self, generator_class=None, language: Optional[str] = None) -> None:
+        self.generator_class = generator_class or spectacular_settings.DEFAULT_GENERATOR_CLASS
+        self.language = language or settings.LANGUAGE_CODE
+        self.key = None
+        self.schema: Optional[Dict] = None
+        self.duration: Optional[float] = None
+        self.error: Optional[BaseException] = None
+        self.finished = Event()
+        self.pid: Optional[int] = None
+        self._lock = Lock()
+        self._thread: Optional[Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and not self.finished.is_set()
+
+    def is_usable(self) -> bool:
+        """A warm-up inherited by a forked process is only usable, if it was finished before the fork. Its thread
+        does not exist inside the forked process."""
+        return self.pid in (None, os.getpid()) or self.finished.is_set()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.pid = os.getpid()
+            self._thread = Thread(
+                target=self.run, name="schema-warmup", daemon=True)
+            self._thread.start()
+
+    def wait_for_apps(self) -> bool:
+        # the warm-up is started by `AppConfig.ready()`, but the url conf may import the apps, which are not ready yet
+        deadline = time.monotonic() + APPS_READY_TIMEOUT
+        while not apps.ready:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def run(self) -> None:
+        try:
+            if not self.wait_for_apps():
+                logger.warning("schema warm-up aborted, the apps are not ready after %.0f seconds",
+                               APPS_READY_TIMEOUT)
+                return
+            logger.info("schema warm-up started (%s, language %s)",
+                        self.generator_class.__name__, self.language)
+            start = time.perf_counter()
+            with translation.override(self.language):
+                generator = self.generator_class()
+                schema_cache = get_schema_cache()
+                if schema_cache:
+                    schema = schema_cache.get_schema(
+                        generator=generator, request=None, public=True)
+                else:
+                    schema = generator.get_schema(request=None, public=True)
+                key = get_generator_key(generator, self.language)
+            self.duration = time.perf_counter() - start
+            self.key, self.schema = key, schema
+            logger.info("schema warm-up finished in %.3f seconds (%d paths, %d components)",
+                        self.duration, len(schema.get("paths", {})),
+                        sum(len(section) for section in schema.get("components", {}).values()))
+        except Exception as exc:
+            self.error = exc
+            logger.exception("schema warm-up failed")
+        finally:
+            self.finished.set()
+
+    def get_schema(self, generator, timeout: float = 0.0) -> Optional[Dict]:
+        """Returns the warmed up schema, if the generator would generate the same one.
+
+        If the warm-up is still running, it waits up to `timeout` seconds for it. `None` is returned, if the warm-up
+        did not finish in time, failed or generated another schema.
+        """
+        if self._thread is None or not self.is_usable():
+            return None
+        if not self.finished.wait(timeout):
+            logger.info(
+                "schema warm-up still running after %.3f seconds, generating the schema", timeout)
+            return None
+        if self.schema is None or self.key != get_generator_key(generator, translation.get_language()):
+            return None
+        return self.schema
+
+
+_warmup: Optional[SchemaWarmup] = None
+# arguments of the last started warm-up, which is started again after it was invalidated or inherited by a fork
+_warmup_kwargs: Optional[Dict] = None
+_warmup_lock = Lock()
+
+
+def _reset_lock_after_fork() -> None:
+    # another thread may have held the lock while the process was forked
+    global _warmup_lock
+    _warmup_lock = Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_lock_after_fork)
+
+
+def start_schema_warmup(generator_class=None, language: Optional[str] = None) -> SchemaWarmup:
+    """Starts the process wide schema warm-up. It is only started once per process, a warm-up inherited from the
+    parent process of a fork is replaced."""
+    global _warmup, _warmup_kwargs
+    with _warmup_lock:
+        _warmup_kwargs = {"generator_class": generator_class, "language": language}
+        if _warmup is None or not _warmup.is_usable():
+            _warmup = SchemaWarmup(**_warmup_kwargs)
+        _warmup.start()
+        return _warmup
+
+
+def is_warmup_process(argv: Optional[List[str]] = None) -> bool:
+    """Decides, if the warm-up is started inside this process.
+
+    Processes started by wsgi or asgi servers always start it. Management commands only start it, if they serve
+    requests. The `runserver` autoreloader starts the server inside a child process, so the warm-up is skipped inside
+    the watching parent process.
+    """
+    argv = sys.argv if argv is None else argv
+    program = os.path.basename(argv[0]) if argv else ""
+    if program not in ("manage.py", "django-admin", "django-admin.py", "__main__.py"):
+        return True
+    command = argv[1] if len(argv) > 1 else None
+    if command not in SERVER_COMMANDS:
+        return False
+    if command != "testserver" and "--noreload" not in argv and os.environ.get("RUN_MAIN") != "true":
+        return False
+    return True
+
+
+def get_schema_warmup() -> Optional[SchemaWarmup]:
+    """Returns the schema warm-up of this process.
+
+    Preforking servers (gunicorn `--preload`, uwsgi without `lazy-apps`) call `ready()` inside the master process.
+    The forked workers inherit its warm-up, but not the thread running it. So an unfinished warm-up of another
+    process, or one invalidated by `invalidate_schema_warmup`, is started again, as long as the `SCHEMA_WARMUP`
+    setting is enabled.
+    """
+    warmup = _warmup
+    if warmup is not None and warmup.is_usable():
+        return warmup
+    if _warmup_kwargs is None or not jsonapi_settings.SCHEMA_WARMUP:
+        return None
+    return start_schema_warmup(**_warmup_kwargs)
+
+
+def invalidate_schema_warmup() -> None:
+    """Forgets the warmed up schema. The next `get_schema_warmup` warms it up again (changed settings,
+    `clear_caches`)."""
+    global _warmup
+    with _warmup_lock:
+        _warmup = None
+
+
+def reset_schema_warmup() -> None:
+    """Forgets the warm-up, so it is only started again by `start_schema_warmup`"""
+    global _warmup, _warmup_kwargs
+    with _warmup_lock:
+        _warmup = None
+        _warmup_kwargs = None
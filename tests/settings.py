@@ -1,6 +1,8 @@
 INSTALLED_APPS = (
     'tests',
-    'drf_spectacular'
+    'rest_framework',
+    'drf_spectacular',
+    'drf_spectacular_jsonapi',
 )
 
 REST_FRAMEWORK = {
@@ -19,7 +21,9 @@ REST_FRAMEWORK = {
     "SEARCH_PARAM": "filter[search]",
     "DEFAULT_RENDERER_CLASSES": (
         "rest_framework_json_api.renderers.JSONRenderer",
-    )
+    ),
+    # django.contrib.auth is not installed
+    "UNAUTHENTICATED_USER": None,
 
 }
 
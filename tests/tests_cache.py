@@ -0,0 +1,321 @@
+import json
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from django.test.testcases import SimpleTestCase
+from django.test.utils import override_settings
+from drf_spectacular.contrib.django_filters import DjangoFilterExtension
+from drf_spectacular.generators import SchemaGenerator
+from drf_spectacular.plumbing import ComponentRegistry, ResolvedComponent
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from rest_framework.test import APIRequestFactory
+from rest_framework_json_api.django_filters import DjangoFilterBackend
+
+from drf_spectacular_jsonapi.cache import FileSchemaCache, SharedSchemaCache
+from drf_spectacular_jsonapi.fingerprint import get_schema_fingerprint
+from drf_spectacular_jsonapi.generators import JsonApiSchemaGenerator
+from drf_spectacular_jsonapi.renderers import get_schema_hash
+from drf_spectacular_jsonapi.schemas.cache import (ResourceObjectCache,
+                                                   filter_parameter_cache,
+                                                   clear_caches,
+                                                   get_cache_stats,
+                                                   reset_cache_stats,
+                                                   resource_object_cache)
+from drf_spectacular_jsonapi.schemas.openapi import \
+    DjangoJsonApiFilterExtension
+from drf_spectacular_jsonapi.views import JsonApiSpectacularAPIView
+
+from .views import AlbumModelViewset
+
+
+class TestResourceObjectCache(SimpleTestCase):
+
+    def setUp(self) -> None:
+        resource_object_cache.clear()
+        reset_cache_stats()
+
+    def test_second_schema_generation_is_served_from_cache(self):
+        first = SchemaGenerator().get_schema(request=None, public=True)
+        first_stats = get_cache_stats()["resource_objects"]
+        self.assertGreater(first_stats["misses"], 0)
+
+        second = SchemaGenerator().get_schema(request=None, public=True)
+        second_stats = get_cache_stats()["resource_objects"]
+        self.assertEqual(second_stats["misses"], first_stats["misses"])
+        self.assertEqual(
+            second_stats["hits"], first_stats["hits"] + first_stats["misses"] + first_stats["hits"])
+
+        self.assertEqual(first, second)
+
+    def test_cached_schemas_are_not_shared(self):
+        first = SchemaGenerator().get_schema(request=None, public=True)
+        first["components"]["schemas"]["Album"]["properties"]["attributes"]["properties"].clear()
+
+        second = SchemaGenerator().get_schema(request=None, public=True)
+        self.assertIn(
+            "title", second["components"]["schemas"]["Album"]["properties"]["attributes"]["properties"])
+
+    def test_mapped_schema_is_not_shared_with_the_first_caller(self):
+        cache = ResourceObjectCache(name="test")
+        registry = ComponentRegistry()
+        first = cache.get_or_map(key="first", registry=registry, factory=lambda: {"type": "object", "enum": ["a"]})
+        first["enum"].append("b")
+
+        second = cache.get_or_map(key="first", registry=registry, factory=lambda: self.fail("mapped again"))
+        self.assertEqual(second, {"type": "object", "enum": ["a"]})
+
+    def test_hits_register_components_of_earlier_mappings(self):
+        cache = ResourceObjectCache(name="test")
+        nested = ResolvedComponent(name="Nested", type=ResolvedComponent.SCHEMA,
+                                   schema={"type": "object", "properties": {"leaf": {"$ref": "#/components/schemas/Leaf"}}},
+                                   object="Nested")
+        leaf = ResolvedComponent(name="Leaf", type=ResolvedComponent.SCHEMA, schema={"type": "string"}, object="Leaf")
+
+        def map_first():
+            registry.register_on_missing(leaf)
+            registry.register_on_missing(nested)
+            return {"$ref": nested.ref["$ref"]}
+
+        registry = ComponentRegistry()
+        cache.get_or_map(key="first", registry=registry, factory=map_first)
+        # the second mapping only references the component, which the first one registered
+        cache.get_or_map(key="second", registry=registry, factory=lambda: {"$ref": nested.ref["$ref"]})
+
+        registry = ComponentRegistry()
+        cache.get_or_map(key="second", registry=registry, factory=lambda: self.fail("mapped again"))
+        self.assertEqual(set(registry._components), {("Nested", "schemas"), ("Leaf", "schemas")})
+
+    def test_cache_is_cleared_on_setting_changed(self):
+        SchemaGenerator().get_schema(request=None, public=True)
+        self.assertGreater(len(resource_object_cache), 0)
+
+        with override_settings(JSON_API_FORMAT_FIELD_NAMES="dasherize"):
+            self.assertEqual(len(resource_object_cache), 0)
+
+
+class TestFilterParameterCache(SimpleTestCase):
+
+    def setUp(self) -> None:
+        filter_parameter_cache.clear()
+        reset_cache_stats()
+
+    def get_album_list_schema(self):
+        auto_schema = AlbumModelViewset(action="list").schema
+        auto_schema.registry = ComponentRegistry()
+        auto_schema.method = "GET"
+        return auto_schema
+
+    def test_second_schema_generation_resolves_filters_from_cache(self):
+        first = SchemaGenerator().get_schema(request=None, public=True)
+        self.assertEqual(get_cache_stats()["filter_parameters"]["misses"], 2)
+
+        second = SchemaGenerator().get_schema(request=None, public=True)
+        stats = get_cache_stats()["filter_parameters"]
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["hit_rate"], 0.5)
+        self.assertEqual(first, second)
+
+    def test_cached_parameters_are_copies(self):
+        extension = DjangoJsonApiFilterExtension(DjangoFilterBackend())
+        first = extension.get_schema_operation_parameters(self.get_album_list_schema())
+        first[0]["name"] = "changed"
+        first[0]["schema"].clear()
+
+        second = extension.get_schema_operation_parameters(self.get_album_list_schema())
+        self.assertEqual([parameter["name"] for parameter in second], ["filter[genre]", "filter[title__contains]"])
+        self.assertEqual(second[0]["schema"]["type"], "string")
+        self.assertEqual(filter_parameter_cache.get_stats()["hits"], 2)
+
+    def test_hits_register_referenced_components(self):
+        genre = ResolvedComponent(name="Genre", type=ResolvedComponent.SCHEMA, schema={"enum": ["rock", "pop"]},
+                                  object="Genre")
+
+        def resolve_filter_field(extension, auto_schema, model, filterset_class, field_name, filter_field):
+            # like an enum, which was already registered by a serializer before the filter was resolved
+            auto_schema.registry.register_on_missing(genre)
+            return [{"name": field_name, "in": "query", "schema": genre.ref}]
+
+        extension = DjangoJsonApiFilterExtension(DjangoFilterBackend())
+        with mock.patch.object(DjangoFilterExtension, "resolve_filter_field", resolve_filter_field):
+            first_schema = self.get_album_list_schema()
+            first_schema.registry.register(genre)
+            extension.get_schema_operation_parameters(first_schema)
+
+            second_schema = self.get_album_list_schema()
+            second = extension.get_schema_operation_parameters(second_schema)
+
+        self.assertEqual(filter_parameter_cache.get_stats()["hits"], 2)
+        self.assertEqual(second[0]["schema"], genre.ref)
+        self.assertEqual(second_schema.registry[genre].schema, genre.schema)
+
+
+class TestFileSchemaCache(SimpleTestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.cache = FileSchemaCache(directory=self.directory)
+
+    def test_miss_then_hit(self):
+        first = self.cache.get_schema(generator=JsonApiSchemaGenerator())
+        second = self.cache.get_schema(generator=JsonApiSchemaGenerator())
+
+        self.assertEqual(first, second)
+        stats = self.cache.get_stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["regenerations"], 1)
+        self.assertGreater(stats["regeneration_duration_last"], 0)
+
+    def test_fingerprint_depends_on_settings(self):
+        fingerprint = get_schema_fingerprint(
+            generator=JsonApiSchemaGenerator())
+        self.assertEqual(fingerprint, get_schema_fingerprint(
+            generator=JsonApiSchemaGenerator()))
+
+        with override_settings(JSON_API_FORMAT_FIELD_NAMES="dasherize"):
+            self.assertNotEqual(fingerprint, get_schema_fingerprint(
+                generator=JsonApiSchemaGenerator()))
+
+    def test_fingerprint_is_memoized(self):
+        clear_caches()
+        fingerprint = get_schema_fingerprint(generator=JsonApiSchemaGenerator())
+
+        with mock.patch("drf_spectacular_jsonapi.fingerprint.describe_view", side_effect=AssertionError("described")):
+            self.assertEqual(get_schema_fingerprint(generator=JsonApiSchemaGenerator()), fingerprint)
+            clear_caches()
+            with self.assertRaises(AssertionError):
+                get_schema_fingerprint(generator=JsonApiSchemaGenerator())
+
+    def test_background_regeneration_has_no_request(self):
+        generator = JsonApiSchemaGenerator()
+        slot = self.cache.get_slot(generator=generator, public=True)
+        self.cache.write(slot=slot, fingerprint="outdated", schema={"stale": True})
+        request = APIRequestFactory().get("/schema/")
+
+        with mock.patch.object(JsonApiSchemaGenerator, "get_schema", return_value={"fresh": True}) as get_schema:
+            self.assertEqual(self.cache.get_schema(generator=generator, request=request), {"stale": True})
+            self.cache.wait_for_regenerations(timeout=30)
+
+        get_schema.assert_called_once_with(request=None, public=True)
+
+    def test_stale_schema_is_served_while_revalidating(self):
+        generator = JsonApiSchemaGenerator()
+        slot = self.cache.get_slot(generator=generator, public=True)
+        self.cache.write(slot=slot, fingerprint="outdated",
+                         schema={"stale": True})
+
+        self.assertEqual(self.cache.get_schema(
+            generator=generator), {"stale": True})
+        self.cache.wait_for_regenerations(timeout=30)
+
+        stats = self.cache.get_stats()
+        self.assertEqual(stats["stale_hits"], 1)
+        self.assertEqual(stats["regenerations"], 1)
+        self.assertIn("paths", self.cache.get_schema(
+            generator=JsonApiSchemaGenerator()))
+        self.assertEqual(self.cache.get_stats()["hits"], 1)
+
+
+class TestSharedSchemaCache(SimpleTestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_other_processes_map_the_generated_schema(self):
+        cache = SharedSchemaCache(directory=self.directory)
+        shared = cache.get_shared_schema(generator=JsonApiSchemaGenerator())
+        schema = JsonApiSchemaGenerator().get_schema(request=None, public=True)
+
+        self.assertIsInstance(shared.get_content("json"), memoryview)
+        self.assertEqual(bytes(shared.get_content("json")), OpenApiJsonRenderer().render(schema))
+        self.assertEqual(bytes(shared.get_content("yaml")), OpenApiYamlRenderer().render(schema))
+        self.assertEqual(shared.hash, get_schema_hash(schema))
+        self.assertIs(cache.get_shared_schema(generator=JsonApiSchemaGenerator()), shared)
+
+        # a new cache instance behaves like another worker process
+        other_cache = SharedSchemaCache(directory=self.directory)
+        with mock.patch.object(JsonApiSchemaGenerator, "get_schema", side_effect=AssertionError("generated again")):
+            self.assertEqual(other_cache.get_schema(generator=JsonApiSchemaGenerator()), schema)
+        self.assertEqual(cache.get_stats()["misses"], 1)
+        self.assertEqual(cache.get_stats()["hits"], 1)
+        self.assertEqual(other_cache.get_stats()["misses"], 0)
+        self.assertEqual(other_cache.get_stats()["mapped"], 1)
+
+    def test_changed_fingerprint_replaces_the_schema(self):
+        cache = SharedSchemaCache(directory=self.directory)
+        generator = JsonApiSchemaGenerator()
+        slot = cache.get_slot(generator=generator, public=True)
+        cache.write(slot=slot, fingerprint="outdated", schema={"stale": True})
+        outdated = cache.read_shared(slot)
+
+        # the stale schema is served while another process holds the lock of the slot
+        with SharedSchemaCache(directory=self.directory).lock(slot):
+            stale = cache.get_shared_schema(generator=generator)
+            self.assertEqual(stale.fingerprint, "outdated")
+        cache.wait_for_regenerations(timeout=30)
+        shared = cache.get_shared_schema(generator=generator)
+
+        self.assertIn("paths", cache.get_schema(generator=JsonApiSchemaGenerator()))
+        self.assertNotEqual(shared.fingerprint, "outdated")
+        self.assertEqual(cache.get_stats()["stale_hits"], 1)
+        self.assertEqual(cache.get_stats()["regenerations"], 1)
+        # already mapped contents stay valid
+        self.assertEqual(json.loads(bytes(outdated.get_content("json"))), {"stale": True})
+
+    def test_unmappable_schema_is_served_from_memory(self):
+        cache = SharedSchemaCache(directory=self.directory)
+        with mock.patch.object(SharedSchemaCache, "read_shared", return_value=None):
+            with self.assertLogs("drf_spectacular_jsonapi.cache", level="WARNING"):
+                shared = cache.get_shared_schema(generator=JsonApiSchemaGenerator())
+
+        schema = JsonApiSchemaGenerator().get_schema(request=None, public=True)
+        self.assertEqual(bytes(shared.get_content("json")), OpenApiJsonRenderer().render(schema))
+        self.assertEqual(shared.hash, get_schema_hash(schema))
+
+    def test_schema_is_generated_once_by_concurrent_workers(self):
+        calls = []
+        get_schema = JsonApiSchemaGenerator.get_schema
+
+        def counting_get_schema(generator, *args, **kwargs):
+            calls.append(generator)
+            return get_schema(generator, *args, **kwargs)
+
+        caches = [SharedSchemaCache(directory=self.directory) for _ in range(4)]
+        with mock.patch.object(JsonApiSchemaGenerator, "get_schema", counting_get_schema):
+            threads = [threading.Thread(target=cache.get_shared_schema, kwargs={"generator": JsonApiSchemaGenerator()})
+                       for cache in caches]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(60)
+
+        self.assertEqual(len(calls), 1)
+        contents = {bytes(cache.get_shared_schema(generator=JsonApiSchemaGenerator()).get_content("json"))
+                    for cache in caches}
+        self.assertEqual(len(contents), 1)
+
+    def test_view_serves_the_mapped_schema(self):
+        factory = APIRequestFactory()
+        view = JsonApiSpectacularAPIView.as_view(authentication_classes=[], permission_classes=[])
+        response = view(factory.get("/schema/"))
+        response.render()
+
+        with override_settings(SPECTACULAR_JSONAPI_SETTINGS={
+                "SCHEMA_CACHE_CLASS": "drf_spectacular_jsonapi.cache.SharedSchemaCache",
+                "SCHEMA_CACHE_DIR": self.directory}):
+            shared_response = view(factory.get("/schema/"))
+            not_modified = view(factory.get("/schema/", HTTP_IF_NONE_MATCH=response["ETag"]))
+            indented = view(factory.get("/schema/?format=openapi-json", HTTP_ACCEPT="application/vnd.oai.openapi+json; indent=2"))
+
+        self.assertTrue(shared_response.streaming)
+        self.assertEqual(b"".join(shared_response.streaming_content), response.content)
+        self.assertEqual(shared_response["ETag"], response["ETag"])
+        self.assertEqual(shared_response["Content-Type"], response["Content-Type"])
+        self.assertEqual(shared_response["Content-Length"], str(len(response.content)))
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertFalse(indented.streaming)
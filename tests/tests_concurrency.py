@@ -0,0 +1,89 @@
+import json
+from copy import deepcopy
+
+from django.test.testcases import SimpleTestCase
+
+from drf_spectacular_jsonapi.generators import (SchemaVariant,
+                                                generate_schema,
+                                                generate_schemas)
+from drf_spectacular_jsonapi.schemas.converters import (
+    JsonApiRelationshipObject, JsonApiResourceObject)
+from drf_spectacular_jsonapi.schemas.openapi import JsonApiAutoSchema
+
+from .serializers import SongSerializer
+from .views import SongModelViewset
+
+
+class TestConvertersDoNotMutateInputs(SimpleTestCase):
+
+    def test_relationship_object(self):
+        field_schema = {
+            "type": "string",
+            "title": "Created By",
+            "description": "The user which created this song",
+            "readOnly": True,
+            "nullable": True,
+        }
+        original = deepcopy(field_schema)
+
+        relationship = JsonApiRelationshipObject(
+            field=SongSerializer().fields["created_by"],
+            drf_spectactular_field_schema=field_schema,
+        ).__dict__()
+
+        self.assertEqual(field_schema, original)
+        self.assertEqual(relationship["description"],
+                         "The user which created this song")
+        self.assertTrue(relationship["readOnly"])
+        self.assertTrue(relationship["nullable"])
+        self.assertEqual(relationship["properties"]["data"]["properties"]["id"]["type"], "string")
+        self.assertNotIn("readOnly", relationship["properties"]["data"]["properties"]["id"])
+
+    def test_resource_object(self):
+        serializer = SongSerializer()
+        schema = {
+            "type": "object",
+            "properties": {
+                "id": {"type": "string", "format": "uuid", "readOnly": True},
+                "title": {"type": "string"},
+                "length": {"type": "integer"},
+                "album": {"type": "string", "format": "uuid", "title": "Album"},
+                "created_by": {"type": "string", "readOnly": True},
+            },
+        }
+        original = deepcopy(schema)
+
+        JsonApiResourceObject(serializer=serializer,
+                              drf_spectactular_schema=schema, method="GET").__dict__()
+
+        self.assertEqual(schema, original)
+
+
+class TestSharedSchemaInstance(SimpleTestCase):
+
+    def test_every_view_instance_gets_its_own_schema(self):
+        view_class = type("SharedSchemaViewset", (SongModelViewset,), {
+                          "schema": JsonApiAutoSchema()})
+        first, second = view_class(), view_class()
+
+        self.assertIsNot(first.schema, second.schema)
+        self.assertIs(first.schema.view, first)
+        self.assertIs(second.schema.view, second)
+
+
+class TestConcurrentGeneration(SimpleTestCase):
+
+    def test_concurrent_schemas_match_serial_schemas(self):
+        languages = ("en", "de")
+        expected = {
+            language: json.dumps(generate_schema(SchemaVariant(language=language)))
+            for language in languages
+        }
+        self.assertNotEqual(expected["en"], expected["de"])
+
+        variants = [SchemaVariant(language=language) for language in languages] * 8
+        schemas = generate_schemas(variants, max_workers=8)
+
+        self.assertEqual(len(schemas), len(variants))
+        for variant, schema in zip(variants, schemas):
+            self.assertEqual(json.dumps(schema), expected[variant.language])
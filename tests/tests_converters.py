@@ -0,0 +1,192 @@
+from unittest.mock import patch
+
+from django.test.testcases import SimpleTestCase
+from django_filters import rest_framework as filters
+from drf_spectacular.generators import SchemaGenerator
+from drf_spectacular.openapi import AutoSchema
+from drf_spectacular.plumbing import ComponentRegistry
+from drf_spectacular.settings import spectacular_settings
+from rest_framework_json_api.serializers import \
+    ResourceIdentifierObjectSerializer
+
+from drf_spectacular_jsonapi.schemas.converters import JsonApiResourceObject
+from drf_spectacular_jsonapi.schemas.introspection import (
+    FilterParameter, RelationshipField, filter_translation_index_cache,
+    get_model_relationships, get_serializer_field_index,
+    model_relationships_cache, parse_filter_parameter_name)
+from drf_spectacular_jsonapi.schemas.openapi import JsonApiAutoSchema
+
+from .models import Album, Song
+from .serializers import AlbumSerializer, SongSerializer
+from .views import AlbumModelViewset
+
+
+class JsonApiAutoSchemaTestCase(SimpleTestCase):
+
+    def get_auto_schemas(self):
+        """Returns all (auto_schema, serializer) tuples of the test project, prepared as drf_spectacular does it."""
+        generator = SchemaGenerator()
+        generator._initialise_endpoints()
+        registry = ComponentRegistry()
+        prepared = []
+        for path, path_regex, method, view in generator._get_paths_and_endpoints():
+            view.request = spectacular_settings.GET_MOCK_REQUEST(
+                method, path, view, None)
+            auto_schema = view.schema
+            auto_schema.registry = registry
+            auto_schema.path = path
+            auto_schema.path_regex = path_regex
+            auto_schema.path_prefix = ""
+            auto_schema.method = method.upper()
+            serializer = auto_schema._get_serializer()
+            if isinstance(serializer, ResourceIdentifierObjectSerializer):
+                continue
+            prepared.append((auto_schema, serializer))
+        return prepared
+
+
+class TestNativeResourceObjectMapping(JsonApiAutoSchemaTestCase):
+
+    def test_native_mapping_matches_converted_drf_spectacular_schema(self):
+        for auto_schema, serializer in self.get_auto_schemas():
+            for direction in ("request", "response"):
+                with self.subTest(path=auto_schema.path, method=auto_schema.method, direction=direction):
+                    legacy = JsonApiResourceObject(
+                        serializer=serializer,
+                        drf_spectactular_schema=AutoSchema._map_basic_serializer(
+                            auto_schema, serializer=serializer, direction=direction),
+                        method=auto_schema.method
+                    ).__dict__()
+                    native = auto_schema._map_basic_serializer(
+                        serializer=serializer, direction=direction)
+
+                    self.assertEqual(legacy, native)
+
+
+class TestSerializerFieldIndex(SimpleTestCase):
+
+    def test_album_serializer_index(self):
+        index = get_serializer_field_index(serializer=AlbumSerializer())
+
+        self.assertEqual(index.pk_name, "id")
+        self.assertEqual(index.field_names,
+                         ("id", "songs", "title", "genre", "year", "released"))
+        self.assertEqual(index.sparse_fieldset_names,
+                         ("songs", "title", "genre", "year", "released"))
+        self.assertEqual([attribute.name for attribute in index.attributes],
+                         ["title", "genre", "year", "released"])
+        self.assertEqual(index.required_attributes,
+                         ("title", "genre", "year", "released"))
+        self.assertEqual(index.relationships, (RelationshipField(
+            field_name="songs", name="songs", required=False, many=True, related_resource_type="Song"),))
+        self.assertEqual(index.required_relationships, ())
+
+    def test_index_is_build_once_per_serializer_class(self):
+        self.assertIs(
+            get_serializer_field_index(serializer=SongSerializer()),
+            get_serializer_field_index(serializer=SongSerializer())
+        )
+
+
+class DynamicAlbumSerializer(AlbumSerializer):
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.context.get("short"):
+            fields.pop("year")
+        return fields
+
+
+class TestDynamicSerializerFields(JsonApiAutoSchemaTestCase):
+
+    def test_index_depends_on_field_names(self):
+        self.assertIn("year", get_serializer_field_index(
+            serializer=DynamicAlbumSerializer()).field_names)
+        self.assertNotIn("year", get_serializer_field_index(
+            serializer=DynamicAlbumSerializer(context={"short": True})).field_names)
+
+    def test_resource_object_depends_on_field_names(self):
+        auto_schema = next(auto_schema for auto_schema, serializer in self.get_auto_schemas()
+                           if auto_schema.method == "GET")
+
+        full = auto_schema._map_basic_serializer(serializer=DynamicAlbumSerializer(), direction="response")
+        short = auto_schema._map_basic_serializer(
+            serializer=DynamicAlbumSerializer(context={"short": True}), direction="response")
+
+        self.assertIn("year", full["properties"]["attributes"]["properties"])
+        self.assertNotIn("year", short["properties"]["attributes"]["properties"])
+
+
+class TestModelRelationships(SimpleTestCase):
+
+    def test_song_relationships(self):
+        relationships = get_model_relationships(model=Song)
+
+        self.assertEqual(
+            [(relationship.name, relationship.many, relationship.related_resource_type)
+             for relationship in relationships],
+            [("album", False, "Album"), ("created_by", False, "User")]
+        )
+        self.assertEqual(relationships[0].related_pk_field, Album._meta.pk)
+
+    def test_reverse_relationships(self):
+        relationships = get_model_relationships(model=Album)
+
+        self.assertEqual(
+            [(relationship.name, relationship.many, relationship.related_resource_type)
+             for relationship in relationships],
+            [("single", True, "Song")]
+        )
+
+    def test_models_are_not_instantiated(self):
+        model_relationships_cache.clear()
+        with patch.object(Album, "__init__", side_effect=AssertionError("model instantiated")), \
+                patch.object(Song, "__init__", side_effect=AssertionError("model instantiated")):
+            SchemaGenerator().get_schema(request=None, public=True)
+
+
+class AlbumFilterSet(filters.FilterSet):
+    title = filters.CharFilter(label="Album title")
+    release_year = filters.NumberFilter(field_name="year", label="Release year")
+
+    class Meta:
+        model = Album
+        fields = {"title": ["exact", "icontains"], "genre": ["exact"]}
+
+
+class FilteredAlbumModelViewset(AlbumModelViewset):
+    filterset_class = AlbumFilterSet
+
+
+class TestFilterTranslationIndex(SimpleTestCase):
+
+    def test_parse_filter_parameter_name(self):
+        self.assertEqual(parse_filter_parameter_name("filter[release_year]"),
+                         FilterParameter(name="release_year", field_name="release_year", lookup=None))
+        self.assertEqual(parse_filter_parameter_name("filter[title__icontains]"),
+                         FilterParameter(name="title__icontains", field_name="title", lookup="icontains"))
+        self.assertEqual(parse_filter_parameter_name("filter[album.release_year.gte]"),
+                         FilterParameter(name="album__release_year__gte", field_name="album__release_year", lookup="gte"))
+        self.assertIsNone(parse_filter_parameter_name("filter"))
+        self.assertIsNone(parse_filter_parameter_name("sort"))
+
+    def test_declared_filters_are_translated(self):
+        filter_translation_index_cache.clear()
+        auto_schema = JsonApiAutoSchema()
+        auto_schema.view = FilteredAlbumModelViewset()
+        parameters = [{"name": name} for name in (
+            "filter[release_year]", "filter[title]", "filter[title__icontains]", "filter[title.icontains]",
+            "filter[genre]", "filter[search]")]
+
+        auto_schema._patch_translations_for_fields(parameters=parameters)
+        auto_schema._patch_translations_for_fields(parameters=[{"name": "filter[title]"}])
+
+        self.assertEqual(parameters, [
+            {"name": "filter[release_year]", "title": "Release year"},
+            {"name": "filter[title]", "title": "Album title"},
+            {"name": "filter[title__icontains]", "title": "Album title"},
+            {"name": "filter[title.icontains]", "title": "Album title"},
+            {"name": "filter[genre]"},
+            {"name": "filter[search]"},
+        ])
+        self.assertEqual(filter_translation_index_cache.get_stats()["misses"], 1)
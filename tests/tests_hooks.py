@@ -0,0 +1,61 @@
+from unittest.mock import patch
+
+from django.test.testcases import SimpleTestCase
+
+from drf_spectacular_jsonapi.hooks import fix_nested_path_parameters
+
+from .views import AlbumModelViewset, NestedSongModelViewset, UserModelViewset
+
+
+class TestFixNestedPathParameters(SimpleTestCase):
+
+    def setUp(self) -> None:
+        self.album_list = AlbumModelViewset.as_view({"get": "list"})
+        self.user_list = UserModelViewset.as_view({"get": "list"})
+        self.song_list = NestedSongModelViewset.as_view({"get": "list"})
+
+    def test_parent_paths_are_looked_up_in_the_endpoints(self):
+        endpoints = [
+            ("/albums/", "^albums/$", "GET", self.album_list),
+            ("/albums/{parent_lookup_album}/songs/",
+             "^albums/(?P<parent_lookup_album>[^/.]+)/songs/$", "GET", self.song_list),
+            ("/albums/{parent_lookup_album}/songs/",
+             "^albums/(?P<parent_lookup_album>[^/.]+)/songs/$", "HEAD", self.song_list),
+        ]
+        with patch("drf_spectacular_jsonapi.hooks.resolve") as resolve:
+            fixed = fix_nested_path_parameters(endpoints)
+        resolve.assert_not_called()
+        self.assertEqual(
+            [path for path, path_regex, method, callback in fixed],
+            ["/albums/", "/albums/{AlbumId}/songs/", "/albums/{AlbumId}/songs/"]
+        )
+        # the regex and callbacks are left untouched
+        self.assertEqual(fixed[1][1:], endpoints[1][1:])
+
+    def test_multiple_nesting_levels(self):
+        endpoints = [
+            ("/users/", "^users/$", "GET", self.user_list),
+            ("/users/{parent_lookup_created_by}/albums/",
+             "^users/(?P<parent_lookup_created_by>[^/.]+)/albums/$", "GET", self.album_list),
+            ("/users/{parent_lookup_created_by}/albums/{parent_lookup_album}/songs/",
+             "^users/(?P<parent_lookup_created_by>[^/.]+)/albums/(?P<parent_lookup_album>[^/.]+)/songs/$",
+             "GET", self.song_list),
+        ]
+        fixed = fix_nested_path_parameters(endpoints)
+        self.assertEqual(fixed[2][0], "/users/{UserId}/albums/{AlbumId}/songs/")
+
+    def test_unknown_parent_paths_are_resolved_with_the_url_conf(self):
+        endpoints = [
+            ("/albums/{parent_lookup_album}/songs/",
+             "^albums/(?P<parent_lookup_album>[^/.]+)/songs/$", "GET", self.song_list),
+        ]
+        self.assertEqual(fix_nested_path_parameters(endpoints)[0][0], "/albums/{AlbumId}/songs/")
+
+    def test_unresolvable_parent_paths_are_kept(self):
+        endpoints = [
+            ("/unknown/{parent_lookup_album}/songs/",
+             "^unknown/(?P<parent_lookup_album>[^/.]+)/songs/$", "GET", self.song_list),
+        ]
+        with self.assertWarns(UserWarning):
+            fixed = fix_nested_path_parameters(endpoints)
+        self.assertEqual(fixed[0][0], "/unknown/{parent_lookup_album}/songs/")
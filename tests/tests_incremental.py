@@ -0,0 +1,72 @@
+import json
+from unittest.mock import patch
+
+from django.test.testcases import SimpleTestCase
+
+from drf_spectacular_jsonapi.generators import (IncrementalSchemaGenerator,
+                                                JsonApiSchemaGenerator)
+from drf_spectacular_jsonapi.incremental import IncrementalSchemaState
+
+from .urls import urlpatterns
+from .views import AlbumModelViewset
+
+
+def dump(schema):
+    return json.dumps(schema, sort_keys=True, default=str)
+
+
+class TestIncrementalSchemaGenerator(SimpleTestCase):
+
+    def setUp(self) -> None:
+        self.state = IncrementalSchemaState()
+
+    def generate(self, **kwargs):
+        generator = IncrementalSchemaGenerator(state=self.state, **kwargs)
+        return generator.get_schema(request=None, public=True), generator.report
+
+    def test_first_generation_is_complete(self):
+        schema, report = self.generate()
+
+        self.assertTrue(report.full_regeneration)
+        self.assertEqual(report.reused, ())
+        self.assertEqual(len(report.added), len(self.state.endpoints))
+        self.assertEqual(dump(schema), dump(
+            JsonApiSchemaGenerator().get_schema(request=None, public=True)))
+
+    def test_unchanged_endpoints_are_reused(self):
+        first, _ = self.generate()
+        second, report = self.generate()
+
+        self.assertFalse(report.full_regeneration)
+        self.assertEqual(report.added + report.changed + report.removed, ())
+        self.assertEqual(report.recomputed_components, ())
+        self.assertEqual(dump(first), dump(second))
+
+    def test_only_changed_endpoints_are_recomputed(self):
+        self.generate()
+        with patch.object(AlbumModelViewset, "ordering_fields", ["id"]):
+            schema, report = self.generate()
+            expected = JsonApiSchemaGenerator().get_schema(request=None, public=True)
+
+        self.assertFalse(report.full_regeneration)
+        self.assertTrue(report.changed)
+        self.assertTrue(all(path.startswith("/albums/")
+                        for path, _, _ in report.changed))
+        self.assertTrue(report.reused)
+        self.assertEqual(
+            schema["paths"]["/albums/"]["get"]["parameters"], expected["paths"]["/albums/"]["get"]["parameters"])
+        self.assertEqual(dump(schema), dump(expected))
+
+    def test_removed_endpoints_and_their_components_are_dropped(self):
+        self.generate()
+        patterns = [pattern for pattern in urlpatterns
+                    if not str(pattern.pattern).startswith("^users")]
+        schema, report = self.generate(patterns=patterns)
+
+        self.assertFalse(report.full_regeneration)
+        self.assertTrue(report.removed)
+        self.assertEqual(report.added + report.changed, ())
+        self.assertIn(("User", "schemas"), report.removed_components)
+        self.assertNotIn("User", schema["components"]["schemas"])
+        self.assertEqual(dump(schema), dump(
+            JsonApiSchemaGenerator(patterns=patterns).get_schema(request=None, public=True)))
@@ -0,0 +1,76 @@
+import json
+
+from django.test import override_settings
+from django.test.testcases import SimpleTestCase
+from django.utils import translation
+
+from drf_spectacular_jsonapi.generators import JsonApiSchemaGenerator
+from drf_spectacular_jsonapi.interning import (FragmentInterner, gettext_once,
+                                               translation_cache)
+from drf_spectacular_jsonapi.schemas.converters import \
+    RESOURCE_TYPE_DESCRIPTION
+
+
+class TestGettextOnce(SimpleTestCase):
+
+    def test_translated_once_per_language(self):
+        translation_cache.clear()
+        translation_cache.reset_stats()
+        with translation.override("en"):
+            english = gettext_once(RESOURCE_TYPE_DESCRIPTION)
+            self.assertIs(gettext_once(RESOURCE_TYPE_DESCRIPTION), english)
+        with translation.override("de"):
+            german = gettext_once(RESOURCE_TYPE_DESCRIPTION)
+
+        self.assertEqual(english, str(RESOURCE_TYPE_DESCRIPTION))
+        self.assertIsInstance(german, str)
+        self.assertEqual(translation_cache.get_stats()["misses"], 2)
+        self.assertEqual(translation_cache.get_stats()["hits"], 1)
+
+
+class TestFragmentInterner(SimpleTestCase):
+
+    def test_equal_fragments_are_shared(self):
+        schema = {
+            "a": {"type": "string", "enum": ["x"]},
+            "b": {"type": "string", "enum": ["x"]},
+            "c": {"enum": ["x"], "type": "string"},
+            "d": [{"minimum": 0.0}, {"minimum": -0.0}, {"minimum": 0}],
+        }
+
+        interner = FragmentInterner()
+        interned = interner.intern(schema)
+
+        self.assertIs(interned["a"], interned["b"])
+        # same content, but another key order renders differently
+        self.assertIsNot(interned["a"], interned["c"])
+        self.assertIs(interned["a"]["enum"], interned["c"]["enum"])
+        self.assertIsNot(interned["d"][0], interned["d"][1])
+        self.assertIsNot(interned["d"][0], interned["d"][2])
+        self.assertEqual(json.dumps(interned), json.dumps(schema))
+        self.assertEqual(interner.get_stats()["shared"], 3)
+
+    @override_settings(SPECTACULAR_JSONAPI_SETTINGS={"INTERN_FRAGMENTS": True})
+    def test_generator_interns_fragments(self):
+        generator = JsonApiSchemaGenerator()
+        interned = generator.get_schema(request=None, public=True)
+        with override_settings(SPECTACULAR_JSONAPI_SETTINGS={}):
+            plain_generator = JsonApiSchemaGenerator()
+            schema = plain_generator.get_schema(request=None, public=True)
+
+        self.assertEqual(json.dumps(interned), json.dumps(schema))
+        self.assertEqual(generator.schema_hash, plain_generator.schema_hash)
+        types = []
+
+        def collect_type_members(obj):
+            if isinstance(obj, dict):
+                if obj.get("allOf") == [{"$ref": "#/components/schemas/AlbumTypeEnum"}]:
+                    types.append(obj)
+                obj = obj.values()
+            if isinstance(obj, (list, type({}.values()))):
+                for value in obj:
+                    collect_type_members(value)
+
+        collect_type_members(interned)
+        self.assertGreater(len(types), 1)
+        self.assertTrue(all(fragment is types[0] for fragment in types))
@@ -0,0 +1,116 @@
+import json
+from unittest import mock
+
+from django.test.testcases import SimpleTestCase
+from django.test.utils import override_settings
+from django.utils import translation
+from django.utils.functional import Promise
+from rest_framework.test import APIRequestFactory
+
+from drf_spectacular_jsonapi.generators import (JsonApiSchemaGenerator,
+                                                SchemaVariant,
+                                                generate_localized_schemas,
+                                                generate_schema)
+from drf_spectacular_jsonapi.localization import (FieldTitle,
+                                                  is_keeping_lazy_strings,
+                                                  keep_lazy_strings,
+                                                  localize_schema,
+                                                  localized_schema_cache)
+from drf_spectacular_jsonapi.schemas.cache import (clear_caches,
+                                                   reset_cache_stats)
+from drf_spectacular_jsonapi.views import JsonApiSpectacularAPIView
+
+
+class TestLocalizedSchemas(SimpleTestCase):
+
+    def setUp(self):
+        clear_caches()
+        reset_cache_stats()
+
+    def test_localized_schemas_equal_generated_schemas(self):
+        schemas = generate_localized_schemas(["en", "de"], generator_class=JsonApiSchemaGenerator)
+
+        for language in ("en", "de"):
+            self.assertEqual(
+                json.dumps(schemas[language], sort_keys=True),
+                json.dumps(generate_schema(SchemaVariant(language=language), generator_class=JsonApiSchemaGenerator),
+                           sort_keys=True)
+            )
+        search = schemas["de"]["paths"]["/albums/"]["get"]["parameters"]
+        self.assertIn("Ein Suchbegriff.", [parameter.get("description") for parameter in search])
+
+    def test_structural_schema_keeps_lazy_strings(self):
+        generator = JsonApiSchemaGenerator(workers=1)
+        with keep_lazy_strings():
+            self.assertIsNone(translation.get_language())
+            structure = generator.get_structural_schema(request=None, public=True)
+        self.assertFalse(is_keeping_lazy_strings())
+
+        lazy_strings = []
+
+        def collect(obj):
+            if isinstance(obj, dict):
+                obj = list(obj.values())
+            if isinstance(obj, list):
+                for value in obj:
+                    collect(value)
+            elif isinstance(obj, Promise):
+                lazy_strings.append(obj)
+
+        collect(structure)
+        self.assertTrue(any(isinstance(value, FieldTitle) for value in lazy_strings))
+        with translation.override("de"):
+            self.assertIn("Ein Suchbegriff.", [str(value) for value in lazy_strings])
+
+    def test_field_titles_are_decided_per_language(self):
+        title = FieldTitle(label=translation.gettext_lazy("Email address"), field_name="email_address")
+        structure = {"properties": {"email_address": {"type": "string", "title": title}}}
+
+        self.assertEqual(localize_schema(structure, "en"), {"properties": {"email_address": {"type": "string"}}})
+        self.assertEqual(localize_schema(structure, "de"),
+                         {"properties": {"email_address": {"type": "string", "title": "E-Mail-Adresse"}}})
+
+    def test_lazy_schemas_are_not_cached_for_other_generations(self):
+        with translation.override(None):
+            translated = generate_schema(SchemaVariant(language=None))
+        with keep_lazy_strings():
+            JsonApiSchemaGenerator(workers=1).get_structural_schema(request=None, public=True)
+        with translation.override(None):
+            self.assertEqual(JsonApiSchemaGenerator().get_schema(request=None, public=True), translated)
+
+    @override_settings(SPECTACULAR_JSONAPI_SETTINGS={"SCHEMA_LANGUAGES": ["en", "de"]})
+    def test_view_selects_language(self):
+        factory = APIRequestFactory()
+        view = JsonApiSpectacularAPIView.as_view(
+            authentication_classes=[], permission_classes=[])
+
+        german = view(factory.get("/schema/", HTTP_ACCEPT_LANGUAGE="de-DE,de;q=0.9"))
+        english = view(factory.get("/schema/", HTTP_ACCEPT_LANGUAGE="fr"))
+        german_by_parameter = view(factory.get("/schema/", {"lang": "de"}))
+
+        self.assertIn("Accept-Language", german["Vary"])
+        self.assertIs(german.data, german_by_parameter.data)
+        self.assertIsNot(german.data, english.data)
+        self.assertIn("Ein UUID-String, der album identifiziert.", json.dumps(german.data, ensure_ascii=False))
+        self.assertNotEqual(german["ETag"], english["ETag"])
+        self.assertEqual(localized_schema_cache.get_stats()["misses"], 1)
+
+        not_modified = view(factory.get("/schema/", HTTP_ACCEPT_LANGUAGE="de", HTTP_IF_NONE_MATCH=german["ETag"]))
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertIn("Accept-Language", not_modified["Vary"])
+
+    @override_settings(SPECTACULAR_JSONAPI_SETTINGS={"SCHEMA_LANGUAGES": ["en", "de"]})
+    def test_changed_fingerprint_replaces_schemas(self):
+        factory = APIRequestFactory()
+        view = JsonApiSpectacularAPIView.as_view(
+            authentication_classes=[], permission_classes=[])
+
+        with mock.patch("drf_spectacular_jsonapi.views.get_schema_fingerprint", side_effect=["a", "a", "b"]):
+            first = view(factory.get("/schema/", {"lang": "de"}))
+            cached = view(factory.get("/schema/", {"lang": "de"}))
+            changed = view(factory.get("/schema/", {"lang": "de"}))
+
+        self.assertIs(first.data, cached.data)
+        self.assertIsNot(first.data, changed.data)
+        self.assertEqual(localized_schema_cache.get_stats()["misses"], 2)
+        self.assertEqual(len(localized_schema_cache), 1)
@@ -0,0 +1,119 @@
+import json
+from unittest import mock, skipUnless
+
+from django.test.testcases import SimpleTestCase
+from django.test.utils import override_settings
+from drf_spectacular.plumbing import ComponentRegistry, ResolvedComponent
+
+from drf_spectacular_jsonapi.generators import JsonApiSchemaGenerator
+from drf_spectacular_jsonapi.parallel import (MappedChunk, get_chunks,
+                                              get_component_origin,
+                                              get_unreferenced_components,
+                                              is_parallel_generation_supported,
+                                              merge_components,
+                                              rename_relationship_variants)
+from drf_spectacular_jsonapi.schemas.converters import (
+    JsonApiRelationshipObject, get_variant_component_name)
+
+from .serializers import AlbumSerializer, SongSerializer
+
+
+class TestParallelGeneration(SimpleTestCase):
+
+    def test_chunks_cover_all_endpoints_in_order(self):
+        self.assertEqual(get_chunks(10, 2), [
+                         (0, 1), (1, 2), (2, 3), (3, 5), (5, 6), (6, 7), (7, 8), (8, 10)])
+        self.assertEqual(get_chunks(3, 4), [(0, 1), (1, 2), (2, 3)])
+        self.assertEqual(get_chunks(0, 4), [])
+
+    def test_merge_components_keeps_first_registration(self):
+        registry = ComponentRegistry()
+        registry.register_on_missing(ResolvedComponent(
+            name="Album", type=ResolvedComponent.SCHEMA, schema={"type": "object"}, object=AlbumSerializer))
+
+        discarded = merge_components(registry, [
+            ("Album", ResolvedComponent.SCHEMA, {"type": "object"},
+             get_component_origin(AlbumSerializer())),
+            ("Song", ResolvedComponent.SCHEMA, {"type": "object"},
+             get_component_origin(SongSerializer)),
+        ])
+
+        self.assertEqual(discarded, set())
+        self.assertIs(registry[("Album", ResolvedComponent.SCHEMA)].object, AlbumSerializer)
+        self.assertEqual(registry[("Song", ResolvedComponent.SCHEMA)].schema, {"type": "object"})
+
+    def test_merge_components_keeps_first_schema(self):
+        registry = ComponentRegistry()
+        registry.register_on_missing(ResolvedComponent(
+            name="Album", type=ResolvedComponent.SCHEMA, schema={"type": "object", "readOnly": True},
+            object=AlbumSerializer))
+
+        discarded = merge_components(registry, [
+            ("Album", ResolvedComponent.SCHEMA, {"type": "object"}, get_component_origin(AlbumSerializer)),
+        ])
+
+        self.assertEqual(discarded, set())
+        self.assertEqual(registry[("Album", ResolvedComponent.SCHEMA)].schema, {"type": "object", "readOnly": True})
+
+    def test_merge_components_detects_conflicts(self):
+        registry = ComponentRegistry()
+        registry.register_on_missing(ResolvedComponent(
+            name="Album", type=ResolvedComponent.SCHEMA, schema={"type": "object"}, object=AlbumSerializer))
+
+        with mock.patch("drf_spectacular_jsonapi.parallel.warn") as warn:
+            discarded = merge_components(registry, [
+                ("Song", ResolvedComponent.SCHEMA, {"type": "object"}, get_component_origin(SongSerializer)),
+                ("Album", ResolvedComponent.SCHEMA, {"$ref": "#/components/schemas/Song"},
+                 get_component_origin(AlbumSerializer)),
+                ("Album", ResolvedComponent.SCHEMA, {"type": "object"},
+                 get_component_origin(SongSerializer)),
+            ])
+
+        self.assertEqual(discarded, {("Song", ResolvedComponent.SCHEMA)})
+        self.assertEqual(warn.call_count, 1)
+        self.assertEqual(registry[("Album", ResolvedComponent.SCHEMA)].schema, {"type": "object"})
+        self.assertEqual(get_unreferenced_components(registry, {}, discarded, registered={}),
+                         [("Song", ResolvedComponent.SCHEMA)])
+        self.assertEqual(get_unreferenced_components(
+            registry, {"/songs/": {"$ref": "#/components/schemas/Song"}}, discarded, registered={}), [])
+
+    def test_relationship_variants_are_renamed_in_endpoint_order(self):
+        first, second = {"type": "object"}, {"type": "object", "readOnly": True}
+        registry = ComponentRegistry()
+        registry.register_on_missing(ResolvedComponent(
+            name="UserRelationshipToOne", type=ResolvedComponent.SCHEMA, schema=first,
+            object=JsonApiRelationshipObject))
+        variant = get_variant_component_name("UserRelationshipToOne", second)
+        chunk = MappedChunk(
+            paths={"/songs/": {"$ref": "#/components/schemas/UserRelationshipToOne"}},
+            components=[("UserRelationshipToOne", ResolvedComponent.SCHEMA, second,
+                         get_component_origin(JsonApiRelationshipObject))],
+            warnings={}, errors={}, relationships=["UserRelationshipToOne"])
+
+        with mock.patch("drf_spectacular_jsonapi.parallel.warn"):
+            renamed = rename_relationship_variants(registry, chunk)
+
+        self.assertEqual(renamed.paths, {"/songs/": {"$ref": f"#/components/schemas/{variant}"}})
+        self.assertEqual(renamed.components[0][0], variant)
+
+    @skipUnless(is_parallel_generation_supported(), "needs the fork start method")
+    def test_output_is_identical_to_serial_generation(self):
+        serial = JsonApiSchemaGenerator(workers=1).get_schema(request=None, public=True)
+        generator = JsonApiSchemaGenerator(workers=2)
+        with self.assertNoLogs("drf_spectacular_jsonapi.generators", level="WARNING"):
+            parallel = generator.get_schema(request=None, public=True)
+        self.assertEqual(generator.parallel_fallbacks, 0)
+        self.assertEqual(json.dumps(serial, default=str),
+                         json.dumps(parallel, default=str))
+
+    @skipUnless(is_parallel_generation_supported(), "needs the fork start method")
+    @override_settings(SPECTACULAR_JSONAPI_SETTINGS={"PARALLEL_WORKERS": 2, "RELATIONSHIP_COMPONENTS": True})
+    def test_workers_setting(self):
+        generator = JsonApiSchemaGenerator()
+        self.assertEqual(generator.get_workers(), 2)
+        with self.assertNoLogs("drf_spectacular_jsonapi.generators", level="WARNING"):
+            parallel = generator.get_schema(request=None, public=True)
+        self.assertEqual(generator.parallel_fallbacks, 0)
+        serial = JsonApiSchemaGenerator(workers=1).get_schema(request=None, public=True)
+        self.assertEqual(json.dumps(serial, default=str),
+                         json.dumps(parallel, default=str))
@@ -0,0 +1,74 @@
+import json
+
+from django.test.testcases import SimpleTestCase
+from rest_framework.test import APIRequestFactory
+
+from drf_spectacular_jsonapi.cache import FileSchemaCache
+from drf_spectacular_jsonapi.generators import JsonApiSchemaGenerator
+from drf_spectacular_jsonapi.partial import parse_resources
+from drf_spectacular_jsonapi.views import JsonApiSpectacularJSONAPIView
+
+
+class TestPartialSchema(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.full = JsonApiSchemaGenerator().get_schema(request=None, public=True)
+
+    def test_parse_resources(self):
+        self.assertEqual(parse_resources("Album, song,"),
+                         frozenset({"album", "song"}))
+        self.assertEqual(parse_resources(["User"]), frozenset({"user"}))
+        self.assertIsNone(parse_resources(""))
+        self.assertIsNone(parse_resources(None))
+
+    def test_only_matching_operations_are_generated(self):
+        schema = JsonApiSchemaGenerator(resources=["album"]).get_schema(
+            request=None, public=True)
+
+        operations = {
+            (path, method): operation
+            for path, path_item in schema["paths"].items() for method, operation in path_item.items()
+        }
+        self.assertTrue(operations)
+        self.assertIn(("/albums/", "get"), operations)
+        self.assertNotIn(("/users/", "get"), operations)
+        for (path, method), operation in operations.items():
+            self.assertIn("Album", operation["tags"])
+            # the path prefix is estimated from all endpoints, so the operations are the same as in the full schema
+            self.assertEqual(json.dumps(operation, sort_keys=True, default=str),
+                             json.dumps(self.full["paths"][path][method], sort_keys=True, default=str))
+
+    def test_only_reachable_components_are_generated(self):
+        schema = JsonApiSchemaGenerator(resources="User").get_schema(
+            request=None, public=True)
+
+        components = schema["components"]["schemas"]
+        self.assertIn("User", components)
+        self.assertNotIn("Album", components)
+        self.assertNotIn("SongRequest", components)
+        for name, component in components.items():
+            self.assertEqual(component, self.full["components"]["schemas"][name])
+
+    def test_subsets_are_cached_separately(self):
+        cache = FileSchemaCache(directory="/nonexistent")
+        self.assertNotEqual(
+            cache.get_slot(JsonApiSchemaGenerator(resources="Album"), public=True),
+            cache.get_slot(JsonApiSchemaGenerator(resources="Song"), public=True),
+        )
+        self.assertEqual(
+            cache.get_slot(JsonApiSchemaGenerator(resources="Album,Song"), public=True),
+            cache.get_slot(JsonApiSchemaGenerator(resources="song,album"), public=True),
+        )
+
+    def test_view_resources_parameter(self):
+        view = JsonApiSpectacularJSONAPIView.as_view(
+            authentication_classes=[], permission_classes=[], generator_class=JsonApiSchemaGenerator)
+        factory = APIRequestFactory()
+
+        response = view(factory.get("/schema/", {"resources": "Song"}))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("/songs/", response.data["paths"])
+        self.assertNotIn("/users/", response.data["paths"])
+        self.assertNotEqual(response["ETag"], view(factory.get("/schema/"))["ETag"])
@@ -0,0 +1,76 @@
+from django.test.testcases import SimpleTestCase
+from drf_spectacular.settings import patched_settings
+from drf_spectacular.validation import validate_schema
+
+from drf_spectacular_jsonapi.generators import JsonApiSchemaGenerator
+from drf_spectacular_jsonapi.postprocessing import (
+    optimize_schema, prune_unreachable_components, strip_metadata)
+
+
+class TestPostprocessing(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.schema = JsonApiSchemaGenerator().get_schema(request=None, public=True)
+
+    def test_prune_unreachable_components(self):
+        schema = {
+            "paths": {"/albums/": {"get": {
+                "security": [{"cookieAuth": []}],
+                "responses": {"200": {"content": {"application/json": {
+                    "schema": {"$ref": "#/components/schemas/AlbumResponse"}}}}},
+            }}},
+            "components": {
+                "schemas": {
+                    "AlbumResponse": {"properties": {"data": {"$ref": "#/components/schemas/Album"}}},
+                    "Album": {"type": "object"},
+                    "AlbumRequest": {"type": "object"},
+                },
+                "securitySchemes": {"cookieAuth": {"type": "apiKey"}, "basicAuth": {"type": "http"}},
+                "parameters": {"Unused": {"name": "unused"}},
+            },
+        }
+
+        pruned = prune_unreachable_components(schema)
+
+        self.assertEqual(list(pruned["components"]), ["schemas", "securitySchemes"])
+        self.assertEqual(list(pruned["components"]["schemas"]), ["AlbumResponse", "Album"])
+        self.assertEqual(list(pruned["components"]["securitySchemes"]), ["cookieAuth"])
+        self.assertIn("AlbumRequest", schema["components"]["schemas"])
+
+    def test_generated_components_are_reachable(self):
+        self.assertEqual(prune_unreachable_components(self.schema), self.schema)
+
+    def test_strip_metadata(self):
+        stripped = strip_metadata(self.schema)
+
+        album = stripped["components"]["schemas"]["Album"]
+        attributes = album["properties"]["attributes"]["properties"]
+        # the attribute `title` is a property name and not metadata
+        self.assertEqual(attributes["title"], {"type": "string", "maxLength": 100})
+        self.assertNotIn("description", album["properties"]["relationships"]["properties"]["songs"])
+        self.assertEqual(stripped["paths"]["/albums/"]["get"]["responses"]["200"]["description"], "")
+        self.assertEqual(stripped["info"], self.schema["info"])
+        validate_schema(stripped)
+
+    def test_optimize_schema_reports_saved_bytes(self):
+        optimized, report = optimize_schema(self.schema, prune=True, minify=True)
+
+        self.assertEqual([step.step for step in report], [
+                         "indentation", "prune_unreachable_components", "strip_metadata"])
+        self.assertTrue(all(step.bytes_saved >= 0 for step in report))
+        self.assertGreater(report[-1].bytes_saved, 0)
+        self.assertEqual(report[1].bytes_after, report[2].bytes_before)
+
+    def test_postprocessing_hooks(self):
+        with patched_settings({
+            "POSTPROCESSING_HOOKS": [
+                "drf_spectacular.hooks.postprocess_schema_enums",
+                "drf_spectacular_jsonapi.hooks.postprocess_prune_components",
+                "drf_spectacular_jsonapi.hooks.postprocess_minify_schema",
+            ],
+        }):
+            schema = JsonApiSchemaGenerator().get_schema(request=None, public=True)
+
+        self.assertEqual(schema, strip_metadata(self.schema))
@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+import tracemalloc
+from io import StringIO
+
+from django.core.management import call_command
+from django.test.testcases import SimpleTestCase
+
+from drf_spectacular_jsonapi.generators import JsonApiSchemaGenerator
+from drf_spectacular_jsonapi.profiling import (profile_schema_memory,
+                                               rank_duplicated_fragments)
+from drf_spectacular_jsonapi.schemas.cache import clear_caches
+from drf_spectacular_jsonapi.tracing import get_tracer
+
+
+class TestMemoryProfiling(SimpleTestCase):
+
+    def test_report_ranks_retained_memory(self):
+        clear_caches()
+        with profile_schema_memory() as profiler:
+            schema = JsonApiSchemaGenerator().get_schema(request=None, public=True)
+        self.assertIsNone(get_tracer())
+        self.assertFalse(tracemalloc.is_tracing())
+
+        report = profiler.get_report(schema=schema)
+        self.assertIn("map_resource_object", [item["phase"] for item in report["phases"]])
+        self.assertIn("tests.serializers.AlbumSerializer", [item["serializer"] for item in report["serializers"]])
+        self.assertTrue(report["allocation_sites"])
+        self.assertTrue(report["components"])
+        for ranked in ("phases", "endpoints", "serializers"):
+            retained = [item["retained"] for item in report[ranked]]
+            self.assertEqual(retained, sorted(retained, reverse=True))
+        json.dumps(report)
+
+    def test_duplicated_fragments(self):
+        fragment = {"type": "object", "properties": {"id": {"type": "string", "description": "x" * 300}}}
+        schema = {"a": dict(fragment), "b": {"nested": dict(fragment)}, "c": {"type": "string"}}
+
+        duplicated = rank_duplicated_fragments(schema)
+
+        self.assertEqual(duplicated[0]["pointer"], "#/a")
+        self.assertEqual(duplicated[0]["count"], 2)
+        self.assertEqual(duplicated[0]["wasted"], duplicated[0]["size"])
+
+    def test_duplicated_fragment_size_is_minified_json_size(self):
+        fragment = {"b": [1, "ü", None, {"c": True}], "a": {"description": "x" * 300}}
+        schema = {"paths": [dict(fragment), {"nested": dict(fragment)}], "reordered": dict(reversed(fragment.items()))}
+
+        duplicated = rank_duplicated_fragments(schema)
+
+        self.assertEqual(duplicated[0]["pointer"], "#/paths/0")
+        self.assertEqual(duplicated[0]["count"], 3)
+        self.assertEqual(duplicated[0]["size"], len(json.dumps(fragment, sort_keys=True, separators=(",", ":"))))
+
+    def test_build_command_writes_memory_profile(self):
+        with tempfile.TemporaryDirectory() as directory:
+            profile_path = os.path.join(directory, "memory.json")
+            trace_path = os.path.join(directory, "trace.json")
+            call_command("build_jsonapi_schema", output_dir=directory, profile_memory=profile_path,
+                         trace=trace_path, stdout=StringIO())
+            with open(profile_path) as profile_file:
+                report = json.load(profile_file)
+            with open(trace_path) as trace_file:
+                trace = json.load(trace_file)
+
+        self.assertIn("duplicated_fragments", report)
+        self.assertIn("get_operation", trace["phases"])
@@ -2,9 +2,19 @@ import json
 
 import rest_framework_json_api
 from django.test.testcases import SimpleTestCase
+from django.test.utils import override_settings
 from drf_spectacular.generators import SchemaGenerator
+from drf_spectacular.plumbing import ComponentRegistry, ResolvedComponent
 from drf_spectacular.validation import validate_schema
 
+from drf_spectacular_jsonapi.generators import JsonApiSchemaGenerator
+from drf_spectacular_jsonapi.references import get_references
+from drf_spectacular_jsonapi.schemas.converters import \
+    JsonApiRelationshipObject
+
+from . import urls
+from .serializers import SongSerializer
+
 
 class SimpleSchemaTestCase(SimpleTestCase):
 
@@ -173,7 +183,9 @@ class TestSchemaOutputForSimpleModelSerializer(SimpleSchemaTestCase):
                                         "type": "object",
                                         "properties": {
                                             "id": {
-                                                "type": "string"
+                                                "type": "string",
+                                                "title": "Resource Identifier",
+                                                "description": "The identifier of the related object."
                                             },
                                             "type": {
                                                 "type": "string",
@@ -193,7 +205,7 @@ class TestSchemaOutputForSimpleModelSerializer(SimpleSchemaTestCase):
                                 "required": [
                                     "data"
                                 ],
-                                "description": "The identifier of the related object.",
+                                "description": "The user which created this song",
                                 "title": "Created By",
                                 "readOnly": True
                             },
@@ -205,7 +217,9 @@ class TestSchemaOutputForSimpleModelSerializer(SimpleSchemaTestCase):
                                         "properties": {
                                             "id": {
                                                 "type": "string",
-                                                "format": "uuid"
+                                                "format": "uuid",
+                                                "title": "Resource Identifier",
+                                                "description": "The identifier of the related object."
                                             },
                                             "type": {
                                                 "type": "string",
@@ -225,7 +239,7 @@ class TestSchemaOutputForSimpleModelSerializer(SimpleSchemaTestCase):
                                 "required": [
                                     "data"
                                 ],
-                                "description": "The identifier of the related object.",
+                                "description": "A related resource object from type Album",
                                 "title": "Album"
                             }
                         },
@@ -485,6 +499,8 @@ class TestSchemaOutputForSimpleModelSerializer(SimpleSchemaTestCase):
                                                     "id": {
                                                         "type": "string",
                                                         "format": "uuid",
+                                                        "title": "Resource Identifier",
+                                                        "description": "The identifier of the related object."
                                                     },
                                                     "type": {
                                                         "type": "string",
@@ -498,7 +514,7 @@ class TestSchemaOutputForSimpleModelSerializer(SimpleSchemaTestCase):
                                         },
                                         "required": ["data"],
                                         "title": "Album",
-                                        "description": "The identifier of the related object.",
+                                        "description": "A related resource object from type Album",
                                     },
                                     "created_by": {
                                         "type": "object",
@@ -509,6 +525,8 @@ class TestSchemaOutputForSimpleModelSerializer(SimpleSchemaTestCase):
                                                     "id": {
                                                         "type": "string",
                                                         "minLength": 1,
+                                                        "title": "Resource Identifier",
+                                                        "description": "The identifier of the related object."
                                                     },
                                                     "type": {
                                                         "type": "string",
@@ -522,7 +540,7 @@ class TestSchemaOutputForSimpleModelSerializer(SimpleSchemaTestCase):
                                         },
                                         "required": ["data"],
                                         "title": "Created By",
-                                        "description": "The identifier of the related object.",
+                                        "description": "The user which created this song",
                                         "readOnly": True,
                                     }
                                 },
@@ -830,3 +848,88 @@ class TestSchemaOutputForRelationshipView(SimpleSchemaTestCase):
                   ('type', 'array')]])]
         )
         self.assertEqual(expected, calculated)
+
+
+@override_settings(SPECTACULAR_JSONAPI_SETTINGS={"RELATIONSHIP_COMPONENTS": True})
+class TestSchemaOutputForRelationshipComponents(SimpleSchemaTestCase):
+
+    def test_relationship_is_referenced(self):
+        self.assertEqual(
+            self.schema["components"]["schemas"]["Album"]["properties"]["relationships"]["properties"]["songs"],
+            {
+                "allOf": [{"$ref": "#/components/schemas/SongRelationshipToMany"}],
+                "title": "Nice Songs",
+                "description": "The songs which are part of this album.",
+            }
+        )
+        created_by = self.schema["components"]["schemas"]["Song"]["properties"]["relationships"]["properties"]["created_by"]
+        self.assertEqual(
+            created_by["allOf"], [{"$ref": "#/components/schemas/UserRelationshipToOne"}])
+        self.assertEqual(created_by["title"], "Created By")
+        self.assertTrue(created_by["readOnly"])
+        self.assertNotIn("readOnly", str(
+            self.schema["components"]["schemas"]["UserRelationshipToOne"]))
+
+    def test_subset_after_full_generation_references_registered_components(self):
+        # the full generation of `setUp` memoized the resource objects, the subset is served from the cache
+        patterns = [pattern for pattern in urls.router.urls if pattern.name.startswith("song-post")]
+        schema = JsonApiSchemaGenerator(patterns=patterns).get_schema(request=None, public=True)
+
+        references = get_references(schema)
+        self.assertIn(("AlbumRelationshipToOne", "schemas"), references)
+        self.assertIn(("UserRelationshipToOne", "schemas"), references)
+        self.assertLessEqual(
+            references, {(name, component_type) for component_type, components in schema["components"].items()
+                         for name in components})
+
+    def test_conflicting_relationship_component_gets_variant_name(self):
+        registry = ComponentRegistry()
+        registry.register(ResolvedComponent(
+            name="UserRelationshipToOne", type=ResolvedComponent.SCHEMA, schema={"type": "object"}, object="other"))
+
+        references = [
+            JsonApiRelationshipObject(
+                field=SongSerializer().fields["created_by"],
+                drf_spectactular_field_schema={"type": "string", "readOnly": True},
+                registry=registry,
+            ).__dict__()["allOf"][0]["$ref"]
+            for _ in range(2)
+        ]
+
+        self.assertEqual(references[0], references[1])
+        self.assertRegex(references[0], r"^#/components/schemas/UserRelationshipToOne\w{6}$")
+        self.assertEqual(registry["UserRelationshipToOne", ResolvedComponent.SCHEMA].schema, {"type": "object"})
+
+    def test_relationship_component(self):
+        calculated = self.ordered(
+            self.schema["components"]["schemas"]["SongRelationshipToMany"])
+        expected = self.ordered(
+            {
+                "type": "object",
+                "properties": {
+                    "data": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "id": {
+                                    "type": "string",
+                                    "format": "uuid",
+                                    "title": "Resource Identifier",
+                                    "description": "The identifier of the related object."
+                                },
+                                "type": {
+                                    "type": "string",
+                                    "description": "The [type](https://jsonapi.org/format/#document-resource-object-identification) member is used to describe resource objects that share common attributes and relationships.",
+                                    "enum": ["Song"],
+                                    "title": "Resource Type Name"
+                                }
+                            },
+                            "required": ["id", "type"],
+                        },
+                    }
+                },
+                "required": ["data"],
+            }
+        )
+        self.assertEqual(expected, calculated)
@@ -0,0 +1,62 @@
+import json
+import os
+import shutil
+import tempfile
+from copy import deepcopy
+
+from django.test.testcases import SimpleTestCase
+
+from drf_spectacular_jsonapi.generators import JsonApiSchemaGenerator
+from drf_spectacular_jsonapi.split import (bundle_schema, split_schema,
+                                           write_split_schema)
+
+
+def dump(schema):
+    return json.dumps(schema, sort_keys=True, default=str)
+
+
+class TestSplitSchema(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.schema = json.loads(dump(JsonApiSchemaGenerator().get_schema(request=None, public=True)))
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_components_are_external_references(self):
+        index, files = split_schema(self.schema)
+
+        self.assertEqual(index["paths"], self.schema["paths"])
+        album_ref = index["components"]["schemas"]["Album"]["$ref"]
+        self.assertRegex(album_ref, r"^components/Album\.[0-9a-f]{16}\.json$")
+        album = json.loads(files[album_ref])
+        self.assertEqual(album["properties"]["type"]["allOf"][0]["$ref"],
+                         "../schema.json#/components/schemas/AlbumTypeEnum")
+        self.assertEqual(len(files), len(self.schema["components"]["schemas"]))
+
+    def test_bundle_restores_the_schema(self):
+        write_split_schema(self.schema, self.directory)
+        self.assertEqual(dump(bundle_schema(self.directory)), dump(self.schema))
+
+    def test_unchanged_components_keep_their_file(self):
+        index, _ = split_schema(self.schema)
+        changed = deepcopy(self.schema)
+        changed["components"]["schemas"]["Song"]["properties"]["attributes"]["properties"]["title"]["maxLength"] = 5
+        changed_index, _ = split_schema(changed)
+
+        for name, external in index["components"]["schemas"].items():
+            if name == "Song":
+                self.assertNotEqual(external, changed_index["components"]["schemas"][name])
+            else:
+                self.assertEqual(external, changed_index["components"]["schemas"][name])
+
+    def test_bundle_verifies_content_hashes(self):
+        index = write_split_schema(self.schema, self.directory)
+        with open(os.path.join(self.directory, index["components"]["schemas"]["Album"]["$ref"]), "wb") as album_file:
+            album_file.write(b"{}")
+
+        with self.assertRaises(ValueError):
+            bundle_schema(self.directory)
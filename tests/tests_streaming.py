@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from decimal import Decimal
+from io import BytesIO
+
+from django.test.testcases import SimpleTestCase
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from rest_framework.test import APIRequestFactory
+
+from drf_spectacular_jsonapi.generators import JsonApiSchemaGenerator
+from drf_spectacular_jsonapi.streaming import (StreamingOpenApiJsonRenderer,
+                                               StreamingOpenApiYamlRenderer,
+                                               write_schema)
+from drf_spectacular_jsonapi.views import JsonApiSpectacularAPIView
+
+
+class TestStreamingRenderers(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.schema = JsonApiSchemaGenerator().get_schema(request=None, public=True)
+
+    def test_yaml_chunks_equal_rendered_schema(self):
+        chunks = list(StreamingOpenApiYamlRenderer().iter_render(self.schema, chunk_size=1024))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b"".join(chunks), OpenApiYamlRenderer().render(self.schema))
+
+    def test_json_chunks_equal_rendered_schema(self):
+        chunks = list(StreamingOpenApiJsonRenderer().iter_render(self.schema, chunk_size=1024))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b"".join(chunks), OpenApiJsonRenderer().render(self.schema))
+        self.assertEqual(
+            b"".join(StreamingOpenApiJsonRenderer().iter_render(
+                self.schema, "application/vnd.oai.openapi+json; indent=2")),
+            OpenApiJsonRenderer().render(self.schema, "application/vnd.oai.openapi+json; indent=2"))
+
+    def test_write_schema(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "schema.yaml")
+
+        write_schema(self.schema, path)
+        with open(path, "rb") as schema_file:
+            self.assertEqual(schema_file.read(), OpenApiYamlRenderer().render(self.schema))
+
+        schema_file = BytesIO()
+        write_schema(self.schema, schema_file, schema_format="json")
+        self.assertEqual(schema_file.getvalue(), OpenApiJsonRenderer().render(self.schema))
+
+    def test_yaml_entries_are_rendered_like_the_document(self):
+        schema = {
+            "openapi": "3.0.3",
+            "info": OrderedDict(title="Test", description="first line\nsecond line\n"),
+            "paths": {"/a/": {"get": {"x-order": Decimal("1.0")}}, "/b/": {}},
+            "components": {"schemas": {"A": {"enum": [Decimal("2")]}}, "parameters": {}, "responses": {"B": {}}},
+            "tags": [],
+        }
+        chunks = list(StreamingOpenApiYamlRenderer().iter_render(schema, chunk_size=1))
+
+        self.assertEqual(len(chunks), 8)
+        self.assertEqual(b"".join(chunks), OpenApiYamlRenderer().render(schema))
+        self.assertEqual(b"".join(StreamingOpenApiYamlRenderer().iter_render({})), OpenApiYamlRenderer().render({}))
+
+    def test_streaming_view(self):
+        factory = APIRequestFactory()
+        view = JsonApiSpectacularAPIView.as_view(authentication_classes=[], permission_classes=[])
+        streaming_view = JsonApiSpectacularAPIView.as_view(
+            authentication_classes=[], permission_classes=[], streaming=True)
+
+        response = view(factory.get("/schema/"))
+        response.render()
+        streaming_response = streaming_view(factory.get("/schema/"))
+
+        self.assertTrue(streaming_response.streaming)
+        self.assertEqual(b"".join(streaming_response.streaming_content), response.content)
+        self.assertEqual(streaming_response["Content-Type"], response["Content-Type"])
+        self.assertEqual(streaming_response["ETag"], response["ETag"])
+        self.assertEqual(streaming_response["Content-Disposition"], response["Content-Disposition"])
@@ -0,0 +1,55 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test.testcases import SimpleTestCase
+
+from drf_spectacular_jsonapi.generators import JsonApiSchemaGenerator
+from drf_spectacular_jsonapi.schemas.cache import clear_caches
+from drf_spectacular_jsonapi.tracing import (SchemaTracer, get_tracer,
+                                             trace_schema_generation)
+
+
+class TestTracing(SimpleTestCase):
+
+    def test_phases_are_recorded(self):
+        clear_caches()
+        with trace_schema_generation() as tracer:
+            JsonApiSchemaGenerator().get_schema(request=None, public=True)
+        self.assertIsNone(get_tracer())
+
+        report = json.loads(tracer.to_json())
+        for phase in ("preprocessing_hook", "get_operation", "map_resource_object", "filter_parameters",
+                      "filter_translations", "include_parameter", "sparse_fieldset_parameters",
+                      "relationship_fields"):
+            self.assertIn(phase, report["phases"])
+            self.assertGreater(report["phases"][phase]["count"], 0)
+        self.assertEqual(report["phases"]["preprocessing_hook"]["count"], 1)
+        self.assertEqual(report["endpoints"]["GET /albums/"]["get_operation"]["count"], 1)
+        self.assertIn("filter_parameters", report["endpoints"]["GET /albums/"])
+        self.assertIn("map_resource_object", report["serializers"]["tests.serializers.AlbumSerializer"])
+
+    def test_custom_tracer(self):
+        class RecordingTracer(SchemaTracer):
+            def __init__(self):
+                self.records = []
+
+            def record(self, phase, duration, endpoint=None, serializer=None):
+                self.records.append((phase, endpoint))
+
+        with trace_schema_generation(RecordingTracer()) as tracer:
+            JsonApiSchemaGenerator().get_schema(request=None, public=True)
+
+        self.assertIn(("get_operation", "DELETE /users/{username}/"), tracer.records)
+
+    def test_build_command_writes_trace(self):
+        with tempfile.TemporaryDirectory() as directory:
+            trace_path = os.path.join(directory, "trace.json")
+            call_command("build_jsonapi_schema", output_dir=directory,
+                         trace=trace_path, stdout=StringIO())
+            with open(trace_path) as trace_file:
+                report = json.load(trace_file)
+
+        self.assertIn("get_operation", report["phases"])
@@ -0,0 +1,176 @@
+import gzip
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.http import Http404
+from django.test.testcases import SimpleTestCase
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory
+
+from drf_spectacular_jsonapi.generators import JsonApiSchemaGenerator
+from drf_spectacular_jsonapi.renderers import (canonicalize_schema,
+                                               get_schema_hash)
+from drf_spectacular_jsonapi.views import (JsonApiSchemaArtifactView,
+                                           JsonApiSpectacularAPIView)
+
+
+class TestDeterministicOutput(SimpleTestCase):
+
+    def test_canonicalize_schema_sorts_unordered_lists(self):
+        self.assertEqual(
+            canonicalize_schema({
+                "required": ["type", "id"],
+                "properties": {"sort": {"enum": ["title", "-title", "id"]}},
+                "parameters": [{"name": "b"}, {"name": "a"}],
+            }),
+            {
+                "required": ["id", "type"],
+                "properties": {"sort": {"enum": ["-title", "id", "title"]}},
+                "parameters": [{"name": "b"}, {"name": "a"}],
+            }
+        )
+
+    def test_schema_hash_ignores_key_order(self):
+        self.assertEqual(
+            get_schema_hash({"a": 1, "b": {"c": [1, 2]}}),
+            get_schema_hash({"b": {"c": [1, 2]}, "a": 1})
+        )
+        self.assertNotEqual(
+            get_schema_hash({"a": 1}),
+            get_schema_hash({"a": 2})
+        )
+
+    @override_settings(SPECTACULAR_JSONAPI_SETTINGS={"DETERMINISTIC_OUTPUT": True})
+    def test_generator_produces_stable_hash(self):
+        first = JsonApiSchemaGenerator()
+        first_schema = first.get_schema(request=None, public=True)
+        second = JsonApiSchemaGenerator()
+        second.get_schema(request=None, public=True)
+
+        self.assertEqual(first.schema_hash, second.schema_hash)
+        self.assertEqual(
+            first_schema["paths"]["/albums/"]["get"]["parameters"][-1]["schema"]["items"]["enum"],
+            ["-id", "-title", "id", "title"]
+        )
+
+
+class TestSchemaViewETag(SimpleTestCase):
+
+    def setUp(self) -> None:
+        self.factory = APIRequestFactory()
+        self.view = JsonApiSpectacularAPIView.as_view(
+            authentication_classes=[], permission_classes=[])
+
+    def test_etag_is_set(self):
+        response = self.view(self.factory.get("/schema/"))
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response["ETag"], r'^"[0-9a-f]{64}-yaml"$')
+
+    def test_not_modified(self):
+        etag = self.view(self.factory.get("/schema/"))["ETag"]
+
+        response = self.view(self.factory.get(
+            "/schema/", HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertFalse(response.content)
+
+    def test_etag_depends_on_format(self):
+        yaml_etag = self.view(self.factory.get("/schema/"))["ETag"]
+        json_etag = self.view(self.factory.get(
+            "/schema/", HTTP_ACCEPT="application/vnd.oai.openapi+json"))["ETag"]
+        self.assertNotEqual(yaml_etag, json_etag)
+
+
+class TestSchemaArtifacts(SimpleTestCase):
+
+    def setUp(self) -> None:
+        self.artifact_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.artifact_dir.cleanup)
+        call_command("build_jsonapi_schema",
+                     output_dir=self.artifact_dir.name, stdout=StringIO())
+        self.factory = APIRequestFactory()
+        self.view = JsonApiSchemaArtifactView.as_view(
+            artifact_dir=self.artifact_dir.name)
+
+    def get_manifest(self):
+        with open(os.path.join(self.artifact_dir.name, "manifest.json")) as manifest_file:
+            return json.load(manifest_file)
+
+    def test_artifacts_are_written(self):
+        manifest = self.get_manifest()
+        schema = JsonApiSchemaGenerator().get_schema(request=None, public=True)
+        self.assertEqual(manifest["hash"], get_schema_hash(schema))
+
+        with open(os.path.join(self.artifact_dir.name, "schema.json"), "rb") as json_file:
+            content = json_file.read()
+        with open(os.path.join(self.artifact_dir.name, "schema.json.gz"), "rb") as gzip_file:
+            self.assertEqual(gzip.decompress(gzip_file.read()), content)
+        self.assertEqual(json.loads(content), schema)
+        self.assertNotIn(b"\n", content)
+        self.assertEqual(manifest["formats"]["json"]
+                         ["identity"]["size"], len(content))
+
+    def test_artifacts_are_reproducible(self):
+        with open(os.path.join(self.artifact_dir.name, "schema.yaml.gz"), "rb") as gzip_file:
+            first = gzip_file.read()
+        call_command("build_jsonapi_schema",
+                     output_dir=self.artifact_dir.name, stdout=StringIO())
+        with open(os.path.join(self.artifact_dir.name, "schema.yaml.gz"), "rb") as gzip_file:
+            self.assertEqual(gzip_file.read(), first)
+
+    def test_serve_gzip_variant(self):
+        response = self.view(self.factory.get(
+            "/schema/", HTTP_ACCEPT_ENCODING="br, gzip;q=0.8"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Type"],
+                         "application/vnd.oai.openapi")
+        self.assertEqual(
+            response["ETag"], f'"{self.get_manifest()["hash"]}-yaml-gzip"')
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertTrue(gzip.decompress(
+            b"".join(response.streaming_content)).startswith(b"openapi:"))
+
+    def test_refused_gzip_is_not_served(self):
+        for accept_encoding in ("gzip;q=0", "br, gzip; q=0.0", "*;q=0", "gzip;q=invalid", "*, gzip;q=0"):
+            with self.subTest(accept_encoding=accept_encoding):
+                response = self.view(self.factory.get(
+                    "/schema/", HTTP_ACCEPT_ENCODING=accept_encoding))
+                self.assertFalse(response.has_header("Content-Encoding"))
+
+        response = self.view(self.factory.get("/schema/", HTTP_ACCEPT_ENCODING="br;q=1, *;q=0.5"))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+    def test_serve_json_without_compression(self):
+        response = self.view(self.factory.get("/schema/", {"format": "json"}))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response["ETag"],
+                         f'"{self.get_manifest()["hash"]}-json"')
+        self.assertIn("openapi", json.loads(
+            b"".join(response.streaming_content)))
+
+    def test_format_is_negotiated(self):
+        for accept, schema_format in (("application/yaml, application/json;q=0", "yaml"),
+                                      ("application/json", "json"),
+                                      ("application/vnd.oai.openapi+json", "json"),
+                                      ("text/html", "yaml")):
+            with self.subTest(accept=accept):
+                response = self.view(self.factory.get("/schema/", HTTP_ACCEPT=accept))
+                self.assertEqual(response["Content-Disposition"], f'inline; filename="schema.{schema_format}"')
+
+        response = self.view(self.factory.get("/schema/", {"format": "json"}, HTTP_ACCEPT="application/yaml"))
+        self.assertEqual(response["Content-Disposition"], 'inline; filename="schema.json"')
+        with self.assertRaises(Http404):
+            self.view(self.factory.get("/schema/", {"format": "xml"}))
+
+    def test_not_modified(self):
+        etag = f'"{self.get_manifest()["hash"]}-yaml"'
+        response = self.view(self.factory.get(
+            "/schema/", HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
@@ -0,0 +1,127 @@
+import os
+import threading
+from unittest import mock, skipUnless
+
+from django.apps import apps
+from django.test.testcases import SimpleTestCase
+from django.test.utils import override_settings
+from drf_spectacular.generators import SchemaGenerator
+from rest_framework.test import APIRequestFactory
+
+from drf_spectacular_jsonapi.schemas.cache import clear_caches
+from drf_spectacular_jsonapi.views import JsonApiSpectacularAPIView
+from drf_spectacular_jsonapi.warmup import (SchemaWarmup, get_schema_warmup,
+                                            is_warmup_process,
+                                            reset_schema_warmup,
+                                            start_schema_warmup)
+
+
+class SlowSchemaGenerator(SchemaGenerator):
+    release = threading.Event()
+
+    def get_schema(self, request=None, public=False):
+        self.release.wait(5)
+        return super().get_schema(request=request, public=public)
+
+
+class TestSchemaWarmup(SimpleTestCase):
+
+    def setUp(self):
+        self.addCleanup(reset_schema_warmup)
+        self.factory = APIRequestFactory()
+        self.view = JsonApiSpectacularAPIView.as_view(
+            authentication_classes=[], permission_classes=[])
+
+    @override_settings(SPECTACULAR_JSONAPI_SETTINGS={"SCHEMA_WARMUP": True})
+    @mock.patch("sys.argv", ["gunicorn", "tests.wsgi"])
+    def test_ready_starts_warmup(self):
+        with self.assertLogs("drf_spectacular_jsonapi.warmup", level="INFO") as logs:
+            apps.get_app_config("drf_spectacular_jsonapi").ready()
+            warmup = get_schema_warmup()
+            self.assertTrue(warmup.finished.wait(30))
+
+        self.assertIsNone(warmup.error)
+        self.assertIn("/albums/", warmup.schema["paths"])
+        self.assertGreater(warmup.duration, 0)
+        self.assertIn("schema warm-up finished", logs.output[-1])
+
+        with mock.patch.object(SchemaGenerator, "get_schema", side_effect=AssertionError("generated again")):
+            response = self.view(self.factory.get("/schema/"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIs(response.data, warmup.schema)
+
+    @override_settings(SPECTACULAR_JSONAPI_SETTINGS={"SCHEMA_WARMUP": True})
+    @mock.patch("sys.argv", ["manage.py", "migrate"])
+    def test_management_commands_skip_warmup(self):
+        apps.get_app_config("drf_spectacular_jsonapi").ready()
+        self.assertIsNone(get_schema_warmup())
+
+        self.assertTrue(is_warmup_process(["manage.py", "runserver", "--noreload"]))
+        self.assertFalse(is_warmup_process(["manage.py", "runserver"]))
+        with mock.patch.dict("os.environ", {"RUN_MAIN": "true"}):
+            self.assertTrue(is_warmup_process(["manage.py", "runserver"]))
+
+    @override_settings(SPECTACULAR_JSONAPI_SETTINGS={"SCHEMA_WARMUP": True})
+    def test_clear_caches_restarts_warmup(self):
+        warmup = start_schema_warmup()
+        self.assertTrue(warmup.finished.wait(30))
+
+        clear_caches()
+        restarted = get_schema_warmup()
+        self.assertIsNot(restarted, warmup)
+        self.assertTrue(restarted.finished.wait(30))
+        self.assertIn("/albums/", restarted.schema["paths"])
+
+        reset_schema_warmup()
+        self.assertIsNone(get_schema_warmup())
+
+    @skipUnless(hasattr(os, "fork"), "needs os.fork")
+    @override_settings(SPECTACULAR_JSONAPI_SETTINGS={"SCHEMA_WARMUP": True})
+    def test_forked_process_restarts_unfinished_warmup(self):
+        SlowSchemaGenerator.release.clear()
+        self.addCleanup(SlowSchemaGenerator.release.set)
+        warmup = start_schema_warmup(generator_class=SlowSchemaGenerator)
+        self.assertTrue(warmup.running)
+
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            # like a worker forked by a preloading master, the thread of the inherited warm-up does not exist here
+            try:
+                restarted = get_schema_warmup()
+                result = restarted is not warmup and restarted.pid == os.getpid() and restarted.running
+                os.write(write_end, b"1" if result else b"0")
+            finally:
+                os._exit(0)
+        os.close(write_end)
+        with os.fdopen(read_end, "rb") as pipe:
+            result = pipe.read()
+        os.waitpid(pid, 0)
+
+        self.assertEqual(result, b"1")
+        self.assertIs(get_schema_warmup(), warmup)
+        SlowSchemaGenerator.release.set()
+        self.assertTrue(warmup.finished.wait(30))
+
+    def test_other_schemas_are_generated(self):
+        warmup = SchemaWarmup(language="de")
+        warmup.start()
+        self.assertTrue(warmup.finished.wait(30))
+
+        self.assertIsNone(warmup.get_schema(SchemaGenerator()))
+        self.assertIsNone(warmup.get_schema(SchemaGenerator(api_version="v2")))
+
+    def test_view_falls_back_while_warmup_is_running(self):
+        SlowSchemaGenerator.release.clear()
+        self.addCleanup(SlowSchemaGenerator.release.set)
+        with override_settings(SPECTACULAR_JSONAPI_SETTINGS={"SCHEMA_WARMUP_TIMEOUT": 0.05}):
+            warmup = SchemaWarmup(generator_class=SlowSchemaGenerator)
+            with mock.patch("drf_spectacular_jsonapi.views.get_schema_warmup", return_value=warmup):
+                warmup.start()
+                self.assertTrue(warmup.running)
+                response = self.view(self.factory.get("/schema/"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("/albums/", response.data["paths"])
+        SlowSchemaGenerator.release.set()
+        self.assertTrue(warmup.finished.wait(30))